@@ -0,0 +1,131 @@
+import threading
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+SCORE_BINS = np.linspace(0, 100, 11)
+# What engine.build_result writes instead of an empty skill list
+PLACEHOLDERS = {"No matched skills found.", "No missing skills found."}
+
+
+def skill_list(value):
+    """Skills from a list or a ``", "``-joined string; NaN and placeholders give ``[]``."""
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if not isinstance(value, str) or value in PLACEHOLDERS:
+        return []
+    return [skill.strip() for skill in value.split(",") if skill.strip()]
+
+
+class SkillAnalytics:
+    """Dashboard aggregates over a set of candidate rows, kept up to date incrementally.
+
+    ``columns`` maps a kind ("matched", "missing", ...) to the row field
+    holding that candidate's skills. Skills are interned once; each kind
+    keeps per-skill counts (a skill counts once per candidate, see
+    :meth:`frequencies`) plus the exploded (candidate, skill) codes behind
+    :meth:`exploded`. Scores in
+    ``score_columns`` are binned into fixed ``bins`` on the way in, so
+    adding CVs to a run only touches the new rows.
+    """
+
+    def __init__(self, columns, score_columns=(), key="Candidate", bins=SCORE_BINS):
+        self.columns = dict(columns)
+        self.score_columns = list(score_columns)
+        self.key = key
+        self.bins = np.asarray(bins, dtype=np.float64)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.candidates = []
+        self._seen = {}
+        self.skills = []
+        self._skill_ids = {}
+        self._counts = {kind: np.zeros(0, dtype=np.int64) for kind in self.columns}
+        self._pairs = {kind: ([], []) for kind in self.columns}
+        self._histograms = {column: np.zeros(len(self.bins) - 1, dtype=np.int64) for column in self.score_columns}
+        self._sums = dict.fromkeys(self.score_columns, 0.0)
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def update(self, records):
+        """Bring the aggregates in line with ``records``; returns how many rows were added.
+
+        Rows whose key was seen before are skipped. If a previously seen
+        candidate is no longer in ``records`` everything is rebuilt.
+        """
+        records = list(records)
+        with self._lock:
+            keys = {record[self.key] for record in records}
+            if any(key not in keys for key in self._seen):
+                self._reset()
+            new = list({record[self.key]: record for record in records if record[self.key] not in self._seen}.values())
+            if new:
+                self._add(new)
+            return len(new)
+
+    def _add(self, records):
+        first = len(self.candidates)
+        for row, record in enumerate(records, first):
+            self._seen[record[self.key]] = row
+            self.candidates.append(record[self.key])
+        for kind, column in self.columns.items():
+            lists = [skill_list(record.get(column)) for record in records]
+            flat = list(chain.from_iterable(lists))
+            for skill in set(flat).difference(self._skill_ids):
+                self._skill_ids[skill] = len(self.skills)
+                self.skills.append(skill)
+            rows = np.repeat(np.arange(first, len(self.candidates)), [len(skills) for skills in lists])
+            codes = np.fromiter(map(self._skill_ids.__getitem__, flat), dtype=np.int64, count=len(flat))
+            # Drop a skill listed twice for one candidate. Rows are already in order and skill
+            # lists usually sorted, so the stable sort (timsort) is close to a linear pass
+            pairs = np.sort(rows * len(self.skills) + codes, kind="stable")
+            pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+            rows, codes = pairs // len(self.skills), pairs % len(self.skills)
+            self._pairs[kind][0].append(rows)
+            self._pairs[kind][1].append(codes)
+            counts = np.bincount(codes, minlength=len(self.skills))
+            counts[:len(self._counts[kind])] += self._counts[kind]
+            self._counts[kind] = counts
+        for column in self.score_columns:
+            scores = np.array([record[column] for record in records], dtype=np.float64)
+            self._sums[column] += scores.sum()
+            # np.histogram's edges (the last bin includes its right edge); out-of-range scores go to the end bins
+            bins = np.clip(np.searchsorted(self.bins, scores, side="right") - 1, 0, len(self.bins) - 2)
+            self._histograms[column] += np.bincount(bins, minlength=len(self.bins) - 1)
+
+    def exploded(self, kind):
+        """One row per (candidate, skill) of ``kind``, both columns categorical."""
+        rows, codes = (np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64) for parts in self._pairs[kind])
+        return pd.DataFrame({
+            "Candidate": pd.Categorical.from_codes(rows, categories=self.candidates),
+            "Skill": pd.Categorical.from_codes(codes, categories=self.skills),
+        })
+
+    def frequencies(self, kind):
+        """``{skill: number of candidates}`` for every skill of ``kind``."""
+        counts = self._counts[kind]
+        return {self.skills[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def top(self, kind, n=None):
+        """Candidates per skill of ``kind``, most common first (ties by name)."""
+        items = sorted(self.frequencies(kind).items(), key=lambda item: (-item[1], item[0]))[:n]
+        return pd.Series(dict(items), name="Candidates", dtype=np.int64)
+
+    def coverage(self, kind, skills=None):
+        """Percentage of candidates with each skill (all skills of ``kind`` by default)."""
+        frequencies = self.frequencies(kind)
+        counts = self.top(kind) if skills is None else pd.Series(
+            {skill: frequencies.get(skill, 0) for skill in skills}, name="Candidates", dtype=np.int64
+        )
+        return (counts / max(len(self), 1) * 100).round(2).rename("% of CVs")
+
+    def histogram(self, column):
+        """``(counts, bin_edges)`` of a score column over the fixed ``bins``."""
+        return self._histograms[column].copy(), self.bins
+
+    def mean(self, column):
+        return self._sums[column] / len(self) if len(self) else float("nan")
@@ -0,0 +1,187 @@
+"""Headless Smart-Sync matcher.
+
+Streams every CV in a directory or zip through the myapp.py pipeline and
+writes the rows to disk as it goes:
+
+    python batch_match.py --cvs resumes.zip --jd job.pdf --out results.csv
+    python batch_match.py --cvs resumes/ --jd job.txt --out results.jsonl --resume
+
+Progress is checkpointed after every chunk in ``<out>.state.jsonl``. With
+``--resume`` a crashed run truncates any half-written chunk and carries on
+with the CVs that were not committed yet.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+
+import engine
+from parse_cache import CACHE_PATH, ParseCache
+
+logger = logging.getLogger("batch_match")
+
+COLUMNS = ['Candidate', 'Email', 'Matched Skills', 'Missing Skills', 'Matched Count', 'Phone Present']
+
+
+class CsvWriter:
+    def __init__(self, path, offset):
+        if os.path.exists(path):
+            os.truncate(path, offset)
+        self.file = open(path, "a", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        if offset == 0:
+            self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def commit(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return os.fstat(self.file.fileno()).st_size
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlWriter(CsvWriter):
+    def __init__(self, path, offset):
+        if os.path.exists(path):
+            os.truncate(path, offset)
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class ParquetWriter:
+    # Parquet files can't be appended to, so the output is a directory of
+    # part files, one per committed chunk; the part number is the offset.
+    def __init__(self, path, offset):
+        import pyarrow  # noqa: F401 - fail early when the optional dependency is missing
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            # Drop parts from a previous run that were never checkpointed
+            if name.startswith("part-") and int(name[5:10]) >= offset:
+                os.remove(os.path.join(path, name))
+        self.path = path
+        self.part = offset
+        self.rows = []
+
+    def write(self, rows):
+        self.rows.extend(rows)
+
+    def commit(self):
+        import pandas as pd
+        if self.rows:
+            final = os.path.join(self.path, f"part-{self.part:05d}.parquet")
+            tmp = final + ".tmp"
+            pd.DataFrame(self.rows, columns=COLUMNS).to_parquet(tmp, index=False)
+            os.replace(tmp, final)
+            self.rows = []
+            self.part += 1
+        return self.part
+
+    def close(self):
+        pass
+
+
+WRITERS = {".csv": CsvWriter, ".jsonl": JsonlWriter, ".parquet": ParquetWriter}
+
+
+def load_state(state_path):
+    # Returns (last committed offset, names already written)
+    offset, done = 0, set()
+    if not os.path.exists(state_path):
+        return offset, done
+    with open(state_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn final line from a crash
+            offset = entry["offset"]
+            done.update(entry["done"])
+    return offset, done
+
+
+def run(cvs_path, jd_path, out_path, threshold=0.5, chunk_size=64, resume=False, workers=1, cache_path=CACHE_PATH):
+    extension = os.path.splitext(out_path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported output format {extension!r}; use one of {sorted(WRITERS)}")
+
+    state_path = out_path + ".state.jsonl"
+    if resume:
+        offset, done = load_state(state_path)
+    else:
+        offset, done = 0, set()
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        if os.path.isfile(out_path):
+            os.remove(out_path)
+
+    with open(jd_path, "rb") as f:
+        jd_text = engine.extract_text(jd_path, f.read())
+    jd_phrases = engine.jd_phrases_from_text(jd_text)
+    logger.info("JD: %d phrases, %d CVs already done", len(jd_phrases), len(done))
+
+    cache = ParseCache(cache_path) if cache_path else None
+    writer = WRITERS[extension](out_path, offset)
+    batch, total = [], len(done)
+    try:
+        with open(state_path, "a", encoding="utf-8") as state:
+            results = engine.iter_results(
+                engine.iter_cv_sources(cvs_path), jd_phrases,
+                threshold=threshold, chunk_size=chunk_size, skip=done, workers=workers, cache=cache,
+            )
+            for row in results:
+                batch.append(row)
+                if len(batch) >= chunk_size:
+                    total += _commit(writer, state, batch)
+                    batch = []
+                    logger.info("%d CVs written", total)
+            if batch:
+                total += _commit(writer, state, batch)
+    finally:
+        writer.close()
+    logger.info("Finished: %d CVs in %s", total, out_path)
+    if cache is not None:
+        stats = cache.stats()
+        # Worker processes keep their own counters; these are the parent's
+        logger.info("Parse cache: %d hits, %d misses, %d entries", stats["hits"], stats["misses"], stats["entries"])
+    return total
+
+
+def _commit(writer, state, rows):
+    writer.write(rows)
+    offset = writer.commit()
+    state.write(json.dumps({"offset": offset, "done": [r["Candidate"] for r in rows]}) + "\n")
+    state.flush()
+    os.fsync(state.fileno())
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match a directory or zip of CVs against a job description.")
+    parser.add_argument("--cvs", required=True, help="Directory or .zip of PDF/TXT CVs")
+    parser.add_argument("--jd", required=True, help="Job description (PDF or TXT)")
+    parser.add_argument("--out", required=True, help="Output file: .csv, .jsonl or .parquet (directory of parts)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="TF-IDF cosine threshold for a matched phrase")
+    parser.add_argument("--chunk-size", type=int, default=64, help="CVs parsed, matched and written per chunk")
+    parser.add_argument("--resume", action="store_true", help="Continue a previous run instead of starting over")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for PDF parsing and spaCy (1 = serial)")
+    parser.add_argument("--parse-cache", default=CACHE_PATH, help="SQLite parse cache shared across runs")
+    parser.add_argument("--no-parse-cache", action="store_true", help="Parse every CV from scratch")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    run(args.cvs, args.jd, args.out, args.threshold, args.chunk_size, args.resume, args.workers,
+        None if args.no_parse_cache else args.parse_cache)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
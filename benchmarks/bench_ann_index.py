@@ -0,0 +1,112 @@
+"""Recall@K and latency of the IVF talent-pool index against exact brute force.
+
+    python benchmarks/bench_ann_index.py --cvs 200000 --queries 200
+
+Embeddings are synthetic: unit vectors drawn around a two-level hierarchy
+of topics (roles within job families), so neighbours are spread over
+several clusters, as with real MiniLM CV embeddings. Brute force is the
+exact ``vectors @ query`` scan over the whole pool.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vector_index import CandidateIndex, _normalize  # noqa: E402
+
+
+def synthetic_embeddings(rng, count, dim, families=40, roles=25, spread=2.5):
+    family_centers = rng.normal(size=(families, dim))
+    role_centers = family_centers[:, None, :] + 0.7 * rng.normal(size=(families, roles, dim))
+    role_centers = role_centers.reshape(-1, dim)
+
+    def sample(n):
+        picks = rng.integers(0, len(role_centers), n)
+        return _normalize(role_centers[picks] + spread * rng.normal(size=(n, dim)))
+    return sample(count), sample
+
+
+def recall(approx, exact, k):
+    return np.mean([len({key for key, _ in a[:k]} & {key for key, _ in e[:k]}) / k for a, e in zip(approx, exact)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--inserts", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors, sample = synthetic_embeddings(rng, args.cvs, args.dim)
+    ids = [f"cv{i}" for i in range(args.cvs)]
+    queries = sample(args.queries)
+
+    index = CandidateIndex(args.dim)
+    start = time.perf_counter()
+    index.add(ids, vectors)
+    add_time = time.perf_counter() - start
+    start = time.perf_counter()
+    index.train()
+    train_time = time.perf_counter() - start
+    print(f"{args.cvs} vectors x {args.dim}: bulk add {add_time:.2f}s, train {train_time:.2f}s "
+          f"({len(index._centroids)} lists)")
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "index")
+        start = time.perf_counter()
+        index.save(path)
+        save_time = time.perf_counter() - start
+        start = time.perf_counter()
+        index = CandidateIndex.load(path)
+        index.search(queries[0], 10)
+        load_time = time.perf_counter() - start
+        print(f"save {save_time:.2f}s, load (mmap) + first query {load_time * 1000:.0f} ms")
+
+        start = time.perf_counter()
+        for i in range(args.inserts):
+            index.add([f"new{i}"], sample(1))
+        insert_time = time.perf_counter() - start
+        index.search(queries[0], 10)
+        removed = [key for key, _ in index.search(queries[0], 5)]
+        index.remove(removed)
+        still_found = set(removed) & {key for key, _ in index.search(queries[0], 50)}
+        print(f"{args.inserts} single inserts: {insert_time / args.inserts * 1000:.2f} ms each; "
+              f"deleted ids returned afterwards: {len(still_found)}")
+
+        start = time.perf_counter()
+        index.save(path)
+        delta_time = time.perf_counter() - start
+        reloaded = CandidateIndex.load(path)
+        same = all(reloaded.search(q, 50) == index.search(q, 50) for q in queries[:20])
+        print(f"save after the inserts and deletes: {delta_time * 1000:.0f} ms (delta segment, full save "
+              f"{save_time:.2f}s); reloaded index returns the same results: {same}")
+
+        start = time.perf_counter()
+        exact = [index.search(q, 100, nprobe=10 ** 9) for q in queries]
+        brute_ms = (time.perf_counter() - start) / len(queries) * 1000
+        print(f"brute force: {brute_ms:.2f} ms/query")
+        print(f"{'nprobe':>6} {'p50 ms':>8} {'p95 ms':>8} {'recall@10':>10} {'recall@50':>10}")
+        for nprobe in (4, 8, 16, 32, 64):
+            timings, results = [], []
+            for q in queries:
+                start = time.perf_counter()
+                results.append(index.search(q, 50, nprobe=nprobe))
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{nprobe:>6} {np.percentile(timings, 50):>8.2f} {np.percentile(timings, 95):>8.2f} "
+                  f"{recall(results, exact, 10):>10.3f} {recall(results, exact, 50):>10.3f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 1 if still_found or not same else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Course assignment for a large candidate CSV: ``iterrows`` loop vs. chunked, vectorized join.
+
+    python benchmarks/bench_candidate_courses.py --candidates 100000 --courses 20000
+
+The legacy path is the original myapps2.py code: ``pd.read_csv`` of the
+whole export, ``iterrows`` to split the skills, ``CourseIndex.top_courses``
+for the distinct skills and a per-candidate loop that strips and dedups
+course keys. The new path is ``candidate_courses.recommend``. Both get the
+same catalogue index; wall time and peak RSS of each run in its own
+process, and the summaries and report records must be identical. A CSV
+whose skills match no course must come back with every skill unmatched.
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import candidate_courses  # noqa: E402
+from bench_course_index import write_catalogue  # noqa: E402
+from course_index import CourseIndex  # noqa: E402
+
+
+def legacy_recommend(csv_path, course_index):
+    candidates_df = pd.read_csv(csv_path)
+    missing_skills_per_candidate = {}
+    for _, row in candidates_df.iterrows():
+        candidate_id = row['Candidate']
+        raw = row['Missing Skills']
+        if pd.notnull(raw):
+            skills = [s.strip() for s in str(raw).split(',') if s.strip()]
+            if skills:
+                missing_skills_per_candidate[candidate_id] = skills
+    unique_skills = set(skill for skills in missing_skills_per_candidate.values() for skill in skills)
+    skill_to_courses = course_index.top_courses(unique_skills, top_n=1)
+    final_summary_data = []
+    records_per_candidate = {}
+    for candidate, skills in missing_skills_per_candidate.items():
+        matched = 0
+        seen_courses = set()
+        records_for_pdf = []
+        for skill in skills:
+            for title, url, _ in skill_to_courses.get(skill, []):
+                course_key = (title.strip(), url.strip())
+                if course_key not in seen_courses:
+                    records_for_pdf.append((skill, title, url))
+                    seen_courses.add(course_key)
+                    matched += 1
+                    break
+        records_per_candidate[candidate] = records_for_pdf
+        final_summary_data.append({
+            "Candidate Name": candidate, "Missing Skills Count": len(skills), "Recommended Courses Count": matched,
+        })
+    return pd.DataFrame(final_summary_data), records_per_candidate
+
+
+def write_candidates(path, n_candidates, words, seed):
+    rng = np.random.default_rng(seed)
+    # Skills are 1-2 catalogue words, so many share their best course within a candidate
+    vocabulary = [" ".join(rng.choice(words[:3000], rng.integers(1, 3))) for _ in range(5000)]
+    rows = []
+    for i in range(n_candidates):
+        skills = [vocabulary[j] for j in rng.zipf(1.3, rng.integers(0, 15)) % len(vocabulary)]
+        missing = ", ".join(skills) if skills or rng.random() < 0.5 else None
+        rows.append((f"cand_{i % (n_candidates - 50)}", missing, "x" * 200))  # a few repeated candidates
+    pd.DataFrame(rows, columns=["Candidate", "Missing Skills", "Notes"]).to_csv(path, index=False)
+
+
+def peak_rss_mb():
+    # VmHWM restarts at exec, unlike ru_maxrss, which keeps the parent's peak
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) / 1024
+
+
+def child(mode, csv_path, index_path, out_path):
+    course_index = CourseIndex.load(index_path)
+    course_index.course_keys  # part of loading the catalogue, not of the run
+    start = time.perf_counter()
+    if mode == "legacy":
+        summary, records = legacy_recommend(csv_path, course_index)
+    else:
+        with open(csv_path, "rb") as f:
+            summary, records = candidate_courses.recommend(f, course_index)
+    elapsed = time.perf_counter() - start
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "seconds": elapsed, "peak_mb": peak_rss_mb(),
+            "summary": summary.astype(str).values.tolist(), "records": [[c, r] for c, r in records.items()],
+        }, f)
+
+
+def unmatched_only(index_path):
+    # No skill shares a term with the catalogue, so no chunk has a single course option
+    csv = io.BytesIO(b'Candidate,Missing Skills\nalice,"kubernetes, terraform"\nbob,\n')
+    summary, records = candidate_courses.recommend(csv, CourseIndex.load(index_path))
+    return summary.values.tolist() == [["alice", 2, 0]] and records == {"alice": []}
+
+
+def run(mode, csv_path, index_path, work_dir):
+    out_path = os.path.join(work_dir, f"{mode}.json")
+    subprocess.run([sys.executable, __file__, "--child", mode, csv_path, index_path, out_path], check=True)
+    with open(out_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--courses", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--child", nargs=4, metavar=("MODE", "CSV", "INDEX", "OUT"))
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return 0
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        courses_path = os.path.join(work_dir, "courses.csv")
+        words = write_catalogue(courses_path, args.courses, args.seed)
+        csv_path = os.path.join(work_dir, "candidates.csv")
+        write_candidates(csv_path, args.candidates, words, args.seed)
+        size_mb = os.path.getsize(csv_path) / 1e6
+        index_path = os.path.join(work_dir, "index")
+        CourseIndex.build(courses_path).save(index_path)
+        legacy = run("legacy", csv_path, index_path, work_dir)
+        chunked = run("chunked", csv_path, index_path, work_dir)
+        no_courses = unmatched_only(index_path)
+
+    same = legacy["summary"] == chunked["summary"] and legacy["records"] == chunked["records"]
+    print(f"{args.candidates} candidates ({size_mb:.0f} MB CSV), {len(legacy['summary'])} with missing skills, "
+          f"{args.courses} courses")
+    for label, result in (("iterrows loop", legacy), ("chunked join", chunked)):
+        print(f"{label:<14}: {result['seconds']:7.2f} s, peak RSS {result['peak_mb']:6.0f} MB")
+    print(f"speedup: {legacy['seconds'] / chunked['seconds']:.1f}x; identical summary and records: {same}")
+    print(f"skills matching no course come back unmatched: {no_courses}")
+    return 0 if same and no_courses else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Accuracy vs. latency of chunked long-document embedding.
+
+    python benchmarks/bench_chunked_embedding.py --cvs 60 --windows 0 64 128 160
+
+Half of the synthetic CVs are relevant to the JD, but their relevant
+section sits after a long generic preamble, past the 256 word-piece limit
+where whole-document encoding truncates. Accuracy is the ROC AUC of the
+BERT score separating relevant from irrelevant CVs; window 0 is the
+original truncated single embedding. No embedding cache is used.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scoring  # noqa: E402
+from models import load_bert  # noqa: E402
+
+PREAMBLE = (
+    "I am a motivated professional with strong communication skills who enjoys working with people, "
+    "meeting deadlines and learning new things in a fast-paced environment. "
+)
+JD = (
+    "We are hiring a machine learning engineer to build recommendation models in Python with PyTorch, "
+    "deploy them on Kubernetes, and monitor data pipelines in Spark and Airflow."
+)
+RELEVANT = [
+    "Built recommendation models in PyTorch and served them on Kubernetes.",
+    "Maintained Spark and Airflow data pipelines feeding machine learning features.",
+    "Wrote Python services for model training and monitoring.",
+]
+IRRELEVANT = [
+    "Managed retail store inventory and staff rotas.",
+    "Organised community events and handled supplier invoices.",
+    "Answered customer phone calls and resolved billing complaints.",
+]
+
+
+def corpus(count, preamble_repeats, seed):
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for i in range(count):
+        relevant = i % 2 == 0
+        body = " ".join(rng.sample(RELEVANT if relevant else IRRELEVANT, 3))
+        texts.append(PREAMBLE * preamble_repeats + body)
+        labels.append(relevant)
+    return texts, np.array(labels)
+
+
+def roc_auc(scores, labels):
+    pos, neg = scores[labels], scores[~labels]
+    return float((pos[:, None] > neg[None, :]).mean() + 0.5 * (pos[:, None] == neg[None, :]).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=60)
+    parser.add_argument("--preamble-repeats", type=int, default=12)
+    parser.add_argument("--windows", type=int, nargs="+", default=[0, 64, 128, 160])
+    parser.add_argument("--pooling", choices=["max", "mean"], default="max")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts, labels = corpus(args.cvs, args.preamble_repeats, args.seed)
+    load_bert()
+    print(f"{args.cvs} CVs, ~{len(texts[0].split())} words each")
+    print(f"{'window':>7} {'windows':>8} {'ms/CV':>8} {'AUC':>6}")
+    for window in args.windows:
+        start = time.perf_counter()
+        if window:
+            scores = scoring.chunked_bert_scores(texts, JD, window, window // 5, args.pooling)
+            n_windows = sum(len(scoring.chunk_text(t, window, window // 5)) for t in texts)
+        else:
+            scores = scoring.bert_scores(texts, JD)
+            n_windows = len(texts)
+        elapsed = time.perf_counter() - start
+        label = window or "full"
+        print(f"{label:>7} {n_windows:>8} {elapsed * 1000 / len(texts):>8.1f} {roc_auc(scores, labels):>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
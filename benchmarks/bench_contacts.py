@@ -0,0 +1,137 @@
+"""Contact/feature extraction: correctness cases and throughput vs. the old regexes.
+
+    python benchmarks/bench_contacts.py --cvs 2000
+
+The legacy path is the original code: ``re.findall`` with the myapp.py
+email and phone patterns, plus project.py's ``detect_features``, which
+recompiled its (double-escaped) patterns on every call. Exits non-zero
+when a correctness case fails.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import contacts  # noqa: E402
+
+# (text, expected subset of extract_contacts output)
+CASES = [
+    ("Jane Doe\njane.doe@example.com | +1 (555) 123-4567",
+     {"emails": ["jane.doe@example.com"], "phones": ["+1 (555) 123-4567"]}),
+    ("Phone: 555-123-4567. Email: J.Smith+cv@Mail.Co.UK.",
+     {"emails": ["J.Smith+cv@Mail.Co.UK"], "phones": ["555-123-4567"]}),
+    ("Mobile +91 98765 43210", {"phones": ["+91 98765 43210"]}),
+    ("Phone: 9876543210", {"phones": ["9876543210"]}),
+    ("Mobile: +91 9876543210", {"phones": ["+91 9876543210"]}),
+    ("Tel: +919876543210", {"phones": ["+919876543210"]}),
+    ("Call 5551234567 after 6pm", {"phones": ["5551234567"]}),
+    ("Order 12345678901234567890 shipped", {"phones": []}),
+    ("(020) 7946 0958", {"phones": ["(020) 7946 0958"]}),
+    ("Tel 0044.20.7946.0958", {"phones": ["0044.20.7946.0958"]}),
+    ("2018 - 2021 Data Analyst, 2021-2023 ML Engineer", {"phones": []}),
+    ("Joined 2019-04-01, GPA 3.85, 12 projects", {"phones": []}),
+    ("Reach me at 1234567890123@numbers.io", {"emails": ["1234567890123@numbers.io"], "phones": []}),
+    ("linkedin.com/in/jane-doe-123 and https://www.linkedin.com/in/jdoe",
+     {"linkedin": ["linkedin.com/in/jane-doe-123", "https://www.linkedin.com/in/jdoe"], "portfolio": []}),
+    ("Code: https://github.com/janedoe, site: https://janedoe.dev/portfolio.",
+     {"github": ["https://github.com/janedoe"], "portfolio": ["https://janedoe.dev/portfolio"]}),
+    ("www.example.org/work/2023-10-05/item?id=5551234567",
+     {"portfolio": ["www.example.org/work/2023-10-05/item?id=5551234567"], "phones": []}),
+    ("GitHub.com/Jane-Doe", {"github": ["GitHub.com/Jane-Doe"]}),
+    ("PROFESSIONAL EXPERIENCE\nAcme Corp", {"experience": ["professional experience"]}),
+    ("Summer Internship at Acme; Work  Experience below",
+     {"experience": ["internship", "work experience"]}),
+    ("Experienced leader", {"experience": []}),
+    ("No contact details here, just skills: python, sql.",
+     {"emails": [], "phones": [], "linkedin": [], "github": [], "portfolio": [], "experience": []}),
+    ("a@b.co, a@b.co; 555 123 4567, 555 123 4567", {"emails": ["a@b.co"], "phones": ["555 123 4567"]}),
+    ("", {"emails": [], "phones": []}),
+]
+
+
+def legacy_extract(text):
+    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', text)
+    phones = re.findall(r'\(?\+?[0-9]*\)?[0-9_\- \(\)]*', text)
+    return emails, phones
+
+
+def legacy_detect_features(text):
+    text = text.lower()
+    re.purge()  # the original compiled on every call; keep the cache from hiding that
+    found = [
+        re.search(r"linkedin\\.com/in/[\\w\\d-]+", text),
+        re.search(r"github\\.com/[\\w\\d-]+", text),
+        re.search(r"\\b[\\w\\.-]+@[\\w\\.-]+\\.\\w{2,4}\\b", text),
+        re.search(r"(\\+?\\d[\\d\\s().-]{8,}\\d)", text),
+        re.search(r"https?://[^\"\\s]+", text),
+    ]
+    keywords = ["experience", "work experience", "internship", "employment history",
+                "professional experience", "roles and responsibilities", "career timeline"]
+    return found, any(k in text for k in keywords)
+
+
+def check_cases():
+    failures = 0
+    for text, expected in CASES:
+        got = contacts.extract_contacts(text)
+        for key, value in expected.items():
+            if got[key] != value:
+                failures += 1
+                print(f"FAIL {text[:50]!r}: {key} = {got[key]!r}, expected {value!r}")
+    print(f"{len(CASES)} cases, {failures} failures")
+    return failures
+
+
+def synthetic_cv(rng, words=600):
+    vocab = ["python", "sql", "managed", "team", "built", "pipelines", "2019", "-", "2021", "data",
+             "analysis", "experience", "projects", "3.9", "gpa", "cloud", "aws", "led", "12", "users"]
+    body = " ".join(rng.choice(vocab) for _ in range(words))
+    name = f"user{rng.randrange(10000)}"
+    header = (f"{name}@example.com | +1 ({rng.randrange(200, 999)}) {rng.randrange(100, 999)}-"
+              f"{rng.randrange(1000, 9999)} | linkedin.com/in/{name} | https://github.com/{name}\n")
+    return header + "WORK EXPERIENCE\n" + body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    failures = check_cases()
+
+    rng = random.Random(args.seed)
+    texts = [synthetic_cv(rng) for _ in range(args.cvs)]
+    chars = sum(map(len, texts))
+
+    start = time.perf_counter()
+    legacy_phone_items = 0
+    for text in texts:
+        _, phones = legacy_extract(text)
+        legacy_phone_items += len(phones)
+        legacy_detect_features(text)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts:
+        contacts.feature_flags(contacts.extract_contacts(text))
+    new_time = time.perf_counter() - start
+
+    legacy_flags = [legacy_detect_features(t) for t in texts[:50]]
+    new_flags = [contacts.extract_contacts(t) for t in texts[:50]]
+    print(f"{args.cvs} CVs, {chars / len(texts):.0f} chars avg")
+    print(f"legacy: {legacy_time:.3f}s ({chars / legacy_time / 1e6:.1f} MB/s), "
+          f"{legacy_phone_items / len(texts):.0f} 'phone numbers' per CV from the old pattern, "
+          f"LinkedIn found in {sum(f[0][0] is not None for f in legacy_flags)}/50")
+    print(f"single scan: {new_time:.3f}s ({chars / new_time / 1e6:.1f} MB/s), "
+          f"{sum(len(c['phones']) for c in new_flags) / 50:.1f} phones per CV, "
+          f"LinkedIn found in {sum(bool(c['linkedin']) for c in new_flags)}/50")
+    print(f"speedup: {legacy_time / new_time:.1f}x")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Recommendation reports for every candidate: disk + base64 vs. in-memory streaming.
+
+    python benchmarks/bench_course_reports.py --candidates 5000 --workers 4
+
+The legacy path is the original myapps2.py code: ``generate_pdf`` writes
+each report to ``pdf_reports/``, every file is read back and
+base64-inlined into the HTML table, and read a third time into the ZIP.
+The new path renders with ``course_reports.render_reports`` and streams
+the archive with ``iter_zip``. Each mode runs in its own process so peak
+RSS is measured separately; both archives must hold the same PDFs.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from course_reports import PDF, iter_zip, render_reports  # noqa: E402
+
+CREATION_DATE = re.compile(rb"/CreationDate \(D:\d+\)")
+
+
+def make_jobs(n_candidates, seed):
+    rng = random.Random(seed)
+    words = [f"topic{i}" for i in range(2000)]
+    jobs = []
+    for i in range(n_candidates):
+        records = [
+            (" ".join(rng.sample(words, 2)), " ".join(rng.sample(words, 5)).title(), f"https://courses.example/{rng.randrange(100000)}")
+            for _ in range(rng.randint(3, 12))
+        ]
+        jobs.append((f"candidate_{i:05d}.pdf", records))
+    return jobs
+
+
+def legacy_reports(jobs, workdir):
+    os.chdir(workdir)
+
+    def generate_pdf(candidate_name, records):
+        if not os.path.exists("pdf_reports"):
+            os.makedirs("pdf_reports")
+        pdf = PDF()
+        pdf.add_page()
+        pdf.set_font("Arial", size=12)
+        pdf.course_table(records)
+        filename = f"pdf_reports/{candidate_name[:25].replace('/', '-')}_recommendation.pdf"
+        pdf.output(filename)
+        return os.path.abspath(filename)
+
+    paths = [generate_pdf(candidate, records) for candidate, records in jobs]
+    table_rows = []
+    for (candidate, records), pdf_path in zip(jobs, paths):
+        with open(pdf_path, "rb") as f:
+            b64 = base64.b64encode(f.read()).decode()
+        href = f'<a href="data:application/octet-stream;base64,{b64}" download="{os.path.basename(pdf_path)}">📄 Download PDF</a>'
+        table_rows.append([candidate, len(records), len(records), href])
+    df_display = pd.DataFrame(table_rows, columns=["Candidate Name", "Missing Skills Count", "Recommended Courses Count", "Download PDF"])
+    html = df_display.to_html(escape=False, index=False)
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w") as zip_file:
+        for pdf_path in paths:
+            zip_file.write(pdf_path, arcname=os.path.basename(pdf_path))
+    return zip_buffer.getvalue(), len(html)
+
+
+def archive_digest(zip_bytes):
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(io.BytesIO(zip_bytes)) as archive:
+        for name in archive.namelist():
+            digest.update(name.encode())
+            digest.update(CREATION_DATE.sub(b"", archive.read(name)))
+    return digest.hexdigest()
+
+
+def run_mode(args):
+    jobs = make_jobs(args.candidates, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        if args.mode == "legacy":
+            zip_bytes, html_bytes = legacy_reports(jobs, tmp)
+        else:
+            zip_bytes, html_bytes = b"".join(iter_zip(render_reports(jobs, args.workers))), 0
+        seconds = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": seconds,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "zip_mb": len(zip_bytes) / 2**20,
+        "html_mb": html_bytes / 2**20,
+        "digest": archive_digest(zip_bytes),
+    }))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mode", choices=["legacy", "streamed"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        return run_mode(args)
+
+    results = {}
+    for mode in ("legacy", "streamed"):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode, "--candidates", str(args.candidates),
+             "--workers", str(args.workers), "--seed", str(args.seed)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    same = results["legacy"]["digest"] == results["streamed"]["digest"]
+    print(f"{args.candidates} candidate reports, {args.workers} workers")
+    for mode, r in results.items():
+        print(f"{mode:9s}: {r['seconds']:7.2f} s  peak RSS {r['rss_mb']:7.1f} MB (workers {r['worker_rss_mb']:6.1f} MB)"
+              f"  zip {r['zip_mb']:6.1f} MB  inline HTML {r['html_mb']:6.1f} MB")
+    print(f"same PDFs in both archives: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
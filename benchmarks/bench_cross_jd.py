@@ -0,0 +1,80 @@
+"""One CV pool against many job descriptions: per-JD runs vs. the CV x JD matrix.
+
+    python benchmarks/bench_cross_jd.py --cvs 1000 --jds 30
+
+Per-JD is what re-running the app once per role costs after parsing:
+one ``JDMatcher.match_many`` (phrase coverage) and one ``tfidf_scores``
+(document TF-IDF half of the match score) per JD. The matrix path is
+``matching.match_count_matrix`` and ``scoring.tfidf_score_matrix``. The
+embedding half is not timed (it needs the model); the number of texts each
+path would encode is reported instead.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cross_match  # noqa: E402
+import matching  # noqa: E402
+import scoring  # noqa: E402
+from bench_tfidf_match import load_vocabulary, random_phrases  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=1000)
+    parser.add_argument("--jds", type=int, default=30)
+    parser.add_argument("--cv-phrases", type=int, default=150)
+    parser.add_argument("--jd-phrases", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = load_vocabulary()
+    cvs = [random_phrases(rng, vocab, rng.randint(0, args.cv_phrases)) for _ in range(args.cvs)]
+    jds = [random_phrases(rng, vocab[:800], args.jd_phrases) for _ in range(args.jds)]
+    cv_texts = [". ".join(phrases) for phrases in cvs]
+    jd_texts = [". ".join(phrases) for phrases in jds]
+
+    start = time.perf_counter()
+    per_jd_counts = np.column_stack([
+        [len(matched) for matched, _ in matching.JDMatcher(jd).match_many(cvs)] for jd in jds
+    ])
+    per_jd_coverage = time.perf_counter() - start
+    start = time.perf_counter()
+    per_jd_tfidf = np.column_stack([scoring.tfidf_scores(cv_texts, jd) for jd in jd_texts])
+    per_jd_doc = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts = matching.match_count_matrix(cvs, jds)
+    matrix_coverage = time.perf_counter() - start
+    start = time.perf_counter()
+    tfidf = scoring.tfidf_score_matrix(cv_texts, jd_texts)
+    matrix_doc = time.perf_counter() - start
+
+    start = time.perf_counter()
+    coverage = cross_match.coverage_percent(counts, jds)
+    names = [f"cv{i}" for i in range(len(cvs))]
+    roles = [f"jd{j}" for j in range(len(jds))]
+    cross_match.shortlists(coverage, names, roles, top_k=10)
+    cross_match.best_fit(coverage, names, roles)
+    ranking = time.perf_counter() - start
+
+    print(f"{args.cvs} CVs x {args.jds} JDs")
+    print(f"phrase coverage : per-JD {per_jd_coverage:7.2f}s  matrix {matrix_coverage:7.2f}s  "
+          f"({per_jd_coverage / matrix_coverage:.1f}x)")
+    print(f"document TF-IDF : per-JD {per_jd_doc:7.2f}s  matrix {matrix_doc:7.2f}s  "
+          f"({per_jd_doc / matrix_doc:.1f}x)")
+    print(f"shortlists + best fit: {ranking * 1000:.1f} ms")
+    print(f"texts to embed  : per-JD {args.jds * (args.cvs + 1)}  matrix {args.cvs + args.jds}")
+    mismatches = int((counts != per_jd_counts).sum()) + int((~np.isclose(tfidf, per_jd_tfidf)).sum())
+    print(f"mismatching pairs: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
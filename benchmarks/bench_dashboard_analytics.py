@@ -0,0 +1,111 @@
+"""Dashboard aggregates: join/split per render vs. ``analytics.SkillAnalytics``.
+
+    python benchmarks/bench_dashboard_analytics.py --candidates 20000 --added 200
+
+The legacy path is what one dashboard render computed in myapp.py
+(``display_top_skills``, ``display_missing_skills``,
+``display_skill_gap_analysis``) and project.py (top missing, gap
+frequency, score histogram). The new path builds the analytics once,
+folds in ``--added`` more CVs incrementally, and then serves the same
+aggregates from counts. Counts are checked against an explode of the
+per-candidate skill lists, which the legacy code got wrong.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics import SkillAnalytics  # noqa: E402
+
+
+def legacy_render(df):
+    all_skills = " ".join(df['Matched Skills'].dropna())
+    top_matched = pd.Series(all_skills.split(', ')).value_counts().head(5)
+    all_missing_skills = " ".join(df['Missing Skills'].dropna())
+    top_missing = pd.Series(all_missing_skills.split(', ')).value_counts().head(5)
+    skill_gap = df[['Candidate', 'Matched Skills', 'Missing Skills']]
+    skill_gap = skill_gap.explode('Missing Skills').dropna(subset=['Missing Skills'])
+    gap_counts = skill_gap['Missing Skills'].value_counts()
+    project_missing = pd.Series(",".join(df["Missing Skills"].tolist()).split(",")).value_counts()
+    histogram = np.histogram(df["Final Score"], bins=10)
+    return top_matched, top_missing, gap_counts, project_missing, histogram
+
+
+def new_render(stats):
+    return (stats.top("matched", 5), stats.top("missing", 5), stats.coverage("missing"),
+            stats.top("missing", 10), stats.histogram("Final Score"), stats.mean("Final Score"))
+
+
+def make_rows(n, jd_skills, rng, start=0):
+    rows = []
+    for i in range(start, start + n):
+        matched = sorted(rng.sample(jd_skills, rng.randint(0, len(jd_skills) // 2)))
+        missing = sorted(set(jd_skills) - set(matched))
+        rows.append({
+            "Candidate": f"cv{i}.pdf",
+            "Matched Skills": ", ".join(matched) if matched else "No matched skills found.",
+            "Missing Skills": ", ".join(missing) if missing else "No missing skills found.",
+            "Matched Skill List": matched,
+            "Missing Skill List": missing,
+            "Final Score": round(rng.uniform(0, 100), 2),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--added", type=int, default=200)
+    parser.add_argument("--jd-skills", type=int, default=40)
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    jd_skills = [f"skill {i}" for i in range(args.jd_skills)]
+    rows = make_rows(args.candidates, jd_skills, rng)
+    more = make_rows(args.added, jd_skills, rng, start=args.candidates)
+    df = pd.DataFrame(rows + more)
+
+    start = time.perf_counter()
+    for _ in range(args.renders):
+        legacy = legacy_render(df)
+    legacy_ms = (time.perf_counter() - start) / args.renders * 1000
+
+    stats = SkillAnalytics({"matched": "Matched Skill List", "missing": "Missing Skill List"}, ["Final Score"])
+    start = time.perf_counter()
+    stats.update(rows)
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    added = stats.update(rows + more)
+    add_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(args.renders):
+        new = new_render(stats)
+    render_ms = (time.perf_counter() - start) / args.renders * 1000
+
+    expected = df["Missing Skill List"].explode().dropna().value_counts()
+    exploded = stats.exploded("missing")["Skill"].value_counts()
+    same = (new[3].to_dict() == expected.sort_values(ascending=False).head(10).to_dict()
+            and exploded[exploded > 0].to_dict() == expected.to_dict()
+            and new[4][0].tolist() == np.histogram(df["Final Score"], bins=np.linspace(0, 100, 11))[0].tolist())
+    wrong = sum(1 for skill in legacy[2].index if skill not in jd_skills)
+
+    print(f"{len(df)} candidates, {args.jd_skills} JD skills, {added} added incrementally")
+    print(f"legacy join/split per render : {legacy_ms:8.2f} ms")
+    print(f"analytics build (once)       : {build_ms:8.2f} ms")
+    print(f"incremental add              : {add_ms:8.2f} ms")
+    print(f"render from counts           : {render_ms:8.3f} ms")
+    print(f"legacy 'skills' in the skill gap chart that aren't skills: {wrong}")
+    print(f"counts match an explode of the skill lists: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Score parity and throughput of the MiniLM encoder backends.
+
+    python benchmarks/bench_encoder_backends.py --cvs 200 --backends torch torch-int8 onnx
+
+Every backend scores the same synthetic cohort with
+``scoring.score_cohort`` (no embedding cache). Parity is reported against
+the torch backend: the largest absolute match-score delta, Spearman rank
+correlation and top-K overlap. With ``--check`` the script exits non-zero
+when a backend breaks ``--max-delta`` or changes the top-K set, so it can
+gate a backend switch.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scoring  # noqa: E402
+from bench_process_pool import synthetic_cvs  # noqa: E402
+from models import load_bert  # noqa: E402
+
+
+def spearman(a, b):
+    ranks_a = np.argsort(np.argsort(a))
+    ranks_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=200)
+    parser.add_argument("--skills-per-cv", type=int, default=25)
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--max-delta", type=float, default=2.0, help="Allowed match-score delta (points out of 100)")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts = [data.decode("utf-8") for _, data in synthetic_cvs(args.cvs + 1, args.skills_per_cv, args.seed)]
+    jd_text, cv_texts = texts[0], texts[1:]
+
+    reference, failed = None, False
+    print(f"{'backend':<12} {'load s':>7} {'CVs/s':>8} {'max Δ':>7} {'spearman':>9} {'top-K':>6}")
+    for backend in args.backends:
+        start = time.perf_counter()
+        load_bert(backend=backend)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores = scoring.score_cohort(cv_texts, jd_text, batch_size=args.batch_size, backend=backend)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = scores
+        delta = float(np.abs(scores - reference).max())
+        top_ref = set(np.argsort(-reference)[:args.top_k])
+        overlap = len(top_ref & set(np.argsort(-scores)[:args.top_k])) / args.top_k
+        print(f"{backend:<12} {load_time:>7.2f} {len(cv_texts) / elapsed:>8.1f} {delta:>7.2f} "
+              f"{spearman(reference, scores):>9.4f} {overlap:>6.0%}")
+        failed |= delta > args.max_delta or overlap < 1
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
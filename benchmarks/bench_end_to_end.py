@@ -0,0 +1,325 @@
+"""End-to-end timing of the three apps' pipelines on a synthetic corpus.
+
+    python benchmarks/bench_end_to_end.py --cvs 200 --words 600 --pdf-ratio 0.5 --courses 20000
+    python benchmarks/bench_end_to_end.py --json e2e.json --history e2e_history.jsonl
+    python benchmarks/bench_end_to_end.py --profile profiles/ --flamegraph e2e.folded
+
+Generates CVs and a JD (PDF and TXT, skills drawn from ``all_skills.txt``)
+and an ``Online_Courses.csv``, then runs the code behind each app without
+Streamlit:
+
+* myapp.py: ``engine.extract_text`` -> spaCy phrases -> ``JDMatcher`` -> contacts;
+* project.py: ``SkillIndex.find_with_proficiency`` and ``scoring.calculate_match_score``;
+* myapps2.py: ``CourseIndex`` build/load, ``top_courses``, ``render_pdf`` and ``iter_zip``.
+
+Per-item stages report the first call (imports, lazy loads) on its own,
+p50/p90/p99/max latency over the rest, and throughput; every
+stage reports the process peak RSS after it ran (and the Python heap peak
+with ``--tracemalloc``). Stages whose dependency isn't installed (spaCy
+model, sentence-transformers) are reported as skipped with the reason.
+``--profile DIR`` writes one cProfile ``.prof`` per stage; ``--flamegraph``
+samples stacks every ``--sample-ms`` into folded-stack format for
+flamegraph.pl / speedscope.
+"""
+import argparse
+import cProfile
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import contacts  # noqa: E402
+import engine  # noqa: E402
+import scoring  # noqa: E402
+import skill_vocab  # noqa: E402
+import skills  # noqa: E402
+from course_index import CourseIndex  # noqa: E402
+from course_reports import iter_zip, render_pdf  # noqa: E402
+from matching import JDMatcher  # noqa: E402
+
+FILLER = ("delivered", "projects", "across", "teams", "using", "built", "maintained", "services", "with",
+          "data", "platform", "customers", "improved", "reliability", "and", "the", "for", "of")
+CUES = ("expert in", "advanced", "proficient in", "intermediate", "basic", "familiar with", "")
+
+
+# ---------- synthetic corpus ----------
+
+def skill_vocabulary(path, rng, size):
+    usable = [s for s in skill_vocab.read_skills(path) if s.isascii() and any(c.isalpha() for c in s) and len(s) < 30]
+    return rng.sample(usable, min(size, len(usable)))
+
+
+def make_text(rng, vocab, words, n_skills, i=None):
+    # CVs get a contact header; the JD (i=None) doesn't
+    parts = [] if i is None else [f"Candidate {i}", f"candidate{i}@example.com", f"+44 20 7946 {i % 10000:04d}", "Experience"]
+    chosen = rng.sample(vocab, min(n_skills, len(vocab)))
+    while len(parts) < words:
+        if chosen and rng.random() < 0.15:
+            parts.append(f"{rng.choice(CUES)} {chosen.pop()}".strip())
+        else:
+            parts.append(rng.choice(FILLER))
+    parts.extend(chosen)
+    return " ".join(parts)
+
+
+def to_pdf(text, words_per_line=14):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_font("Arial", size=10)
+    pdf.add_page()
+    words = text.split()
+    for start in range(0, len(words), words_per_line):
+        pdf.cell(0, 6, " ".join(words[start:start + words_per_line]), ln=True)
+    return pdf.output(dest="S").encode("latin-1")
+
+
+def make_corpus(args, out_dir):
+    rng = random.Random(args.seed)
+    vocab = skill_vocabulary(os.path.join(ROOT, skills.SKILLS_PATH), rng, args.vocab)
+    jd_text = make_text(rng, vocab, max(args.words // 2, 50), args.jd_skills)
+    documents = []
+    for i in range(args.cvs):
+        text = make_text(rng, vocab, args.words, args.cv_skills, i)
+        if rng.random() < args.pdf_ratio:
+            documents.append((f"cv_{i:05d}.pdf", to_pdf(text)))
+        else:
+            documents.append((f"cv_{i:05d}.txt", text.encode("utf-8")))
+    for name, data in documents:
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(data)
+    rows = []
+    for i in range(args.courses):
+        topic = rng.sample(vocab, 3)
+        rows.append((f"Mastering {topic[0]}", f"Learn {' and '.join(topic)} with hands-on projects.",
+                     f"https://courses.example/{i}"))
+    courses_path = os.path.join(out_dir, "Online_Courses.csv")
+    pd.DataFrame(rows, columns=["Course Title", "Course Short Intro", "Course URL"]).to_csv(courses_path, index=False)
+    return jd_text, documents, courses_path
+
+
+# ---------- measurement ----------
+
+def peak_rss_mb():
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return usage / 1024 if sys.platform != "darwin" else usage / 2**20
+
+
+class StackSampler:
+    """Samples the main thread's stack every ``interval`` seconds into folded-stack counts."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.stage = "setup"
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._main = threading.main_thread().ident
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._main)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join([self.stage] + names[::-1])] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, path):
+        self._stop.set()
+        self._thread.join()
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Harness:
+    def __init__(self, profile_dir=None, trace_memory=False, sampler=None):
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.sampler = sampler
+        self.stages = {}
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+        if trace_memory:
+            tracemalloc.start()
+
+    def skip(self, name, app, reason):
+        self.stages[name] = {"app": app, "skipped": reason}
+        print(f"{name:<22} skipped: {reason}")
+
+    def run(self, name, app, items, fn):
+        """Call ``fn(item)`` for every item, timing each call; returns the results."""
+        items = list(items)
+        if not items:
+            self.skip(name, app, "no items")
+            return []
+        profiler = cProfile.Profile() if self.profile_dir else None
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        if self.sampler:
+            self.sampler.stage = name
+        results, times = [], []
+        start = time.perf_counter()
+        for item in items:
+            t = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            results.append(fn(item))
+            if profiler:
+                profiler.disable()
+            times.append(time.perf_counter() - t)
+        total = time.perf_counter() - start
+        if profiler:
+            profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.prof"))
+        # The first call pays imports and lazy model loads; it's reported on its own
+        first_ms = times[0] * 1000
+        ms = np.array(times[1:] or times) * 1000
+        stage = {
+            "app": app, "items": len(items), "total_s": round(total, 4), "first_ms": round(first_ms, 3),
+            "throughput_per_s": round(len(items) / total, 2) if total else None,
+            "p50_ms": round(float(np.percentile(ms, 50)), 3), "p90_ms": round(float(np.percentile(ms, 90)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3), "max_ms": round(float(ms.max()), 3),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+        if self.trace_memory:
+            stage["heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        self.stages[name] = stage
+        print(f"{name:<22} {len(items):>6} {first_ms:>10.2f} {stage['p50_ms']:>10.2f} {stage['p90_ms']:>10.2f} {stage['p99_ms']:>10.2f}"
+              f" {stage['max_ms']:>10.2f} {stage['throughput_per_s'] or 0:>10.1f} {stage['peak_rss_mb']:>9.1f}")
+        return results
+
+    def once(self, name, app, fn):
+        return self.run(name, app, [None], lambda _: fn())[0]
+
+
+def probe(fn):
+    """``None`` if ``fn()`` works, else why not."""
+    try:
+        fn()
+        return None
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+# ---------- pipelines ----------
+
+def run_pipelines(args, harness, jd_text, documents, courses_path, work_dir):
+    print(f"{'stage':<22} {'items':>6} {'first ms':>10} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'max ms':>10} {'items/s':>10} {'RSS MB':>9}")
+
+    # myapp.py: process_cv
+    pdf_docs = [doc for doc in documents if doc[0].endswith(".pdf")]
+    txt_docs = [doc for doc in documents if not doc[0].endswith(".pdf")]
+    extracted = dict(zip([name for name, _ in pdf_docs],
+                         harness.run("extract_text_pdf", "myapp", pdf_docs, lambda doc: engine.extract_text(*doc))))
+    extracted.update(zip([name for name, _ in txt_docs],
+                         harness.run("extract_text_txt", "myapp", txt_docs, lambda doc: engine.extract_text(*doc))))
+    texts = [extracted[name] for name, _ in documents]
+    harness.run("contacts", "myapp", texts, contacts.extract_contacts)
+    nlp_problem = probe(engine.load_nlp)
+    if nlp_problem:
+        harness.skip("phrases", "myapp", nlp_problem)
+        harness.skip("tfidf_match", "myapp", "needs spaCy phrases")
+    else:
+        jd_phrases = engine.jd_phrases_from_text(jd_text)
+        phrases = harness.run("phrases", "myapp", texts,
+                              lambda text: engine.filter_unwanted_terms(engine.extract_clean_phrases(text)))
+        matcher = JDMatcher(jd_phrases)
+        harness.run("tfidf_match", "myapp", phrases, lambda cv_phrases: matcher.match_many([cv_phrases])[0])
+
+    # project.py: skills + match score
+    index = harness.once("skill_index_build", "project", lambda: skills.SkillIndex.load_or_build(
+        os.path.join(ROOT, skills.SKILLS_PATH), os.path.join(work_dir, "skill_index")))
+    skill_maps = harness.run("skills", "project", texts, index.find_with_proficiency)
+    harness.run("match_score_tfidf", "project", texts, lambda text: float(scoring.tfidf_scores([text], jd_text)[0]))
+    encoder_problem = probe(lambda: scoring.embed_texts(["warm up"], backend=args.backend))
+    if encoder_problem:
+        harness.skip("match_score", "project", encoder_problem)
+    else:
+        harness.run("match_score", "project", texts,
+                    lambda text: scoring.calculate_match_score(text, jd_text, backend=args.backend))
+
+    # myapps2.py: recommender + reports
+    jd_skills = list(index.find(jd_text))
+    missing = [[skill for skill in jd_skills if skill not in skill_map] for skill_map in skill_maps]
+    index_dir = os.path.join(work_dir, "course_index")
+    harness.once("course_index_build", "myapps2", lambda: CourseIndex.load_or_build(courses_path, index_dir))
+    courses = harness.once("course_index_load", "myapps2", lambda: CourseIndex.load_or_build(courses_path, index_dir))
+    unique = sorted({skill for skills_ in missing for skill in skills_})
+    recommended = harness.once("recommend", "myapps2", lambda: courses.top_courses(unique, top_n=1))
+    records = [
+        [(skill, title, url) for skill in skills_ for title, url, _ in recommended.get(skill, [])[:1]]
+        for skills_ in missing
+    ]
+    pdfs = harness.run("render_pdf", "myapps2", records, render_pdf)
+    harness.once("zip", "myapps2", lambda: sum(map(len, iter_zip((f"cv_{i}.pdf", pdf) for i, pdf in enumerate(pdfs)))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=200)
+    parser.add_argument("--words", type=int, default=600, help="words per CV")
+    parser.add_argument("--pdf-ratio", type=float, default=0.5, help="share of CVs written as PDF (rest TXT)")
+    parser.add_argument("--cv-skills", type=int, default=25)
+    parser.add_argument("--jd-skills", type=int, default=30)
+    parser.add_argument("--vocab", type=int, default=400, help="skills sampled from all_skills.txt")
+    parser.add_argument("--courses", type=int, default=20000)
+    parser.add_argument("--backend", default="torch", help="encoder backend for match_score")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--corpus-dir", help="keep the generated corpus here instead of a temp dir")
+    parser.add_argument("--json", help="write the results as JSON to this path ('-' for stdout)")
+    parser.add_argument("--history", help="append the results as one JSON line to this file")
+    parser.add_argument("--profile", help="write one cProfile .prof file per stage into this directory")
+    parser.add_argument("--flamegraph", help="write sampled folded stacks to this file")
+    parser.add_argument("--sample-ms", type=float, default=5.0)
+    parser.add_argument("--tracemalloc", action="store_true", help="also report each stage's Python heap peak")
+    args = parser.parse_args()
+
+    sampler = StackSampler(args.sample_ms / 1000).start() if args.flamegraph else None
+    harness = Harness(args.profile, args.tracemalloc, sampler)
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus_dir or os.path.join(tmp, "corpus")
+        os.makedirs(corpus_dir, exist_ok=True)
+        start = time.perf_counter()
+        jd_text, documents, courses_path = make_corpus(args, corpus_dir)
+        corpus_s = time.perf_counter() - start
+        print(f"corpus: {len(documents)} CVs ({sum(n.endswith('.pdf') for n, _ in documents)} PDF), "
+              f"{args.courses} courses, generated in {corpus_s:.1f} s")
+        run_pipelines(args, harness, jd_text, documents, courses_path, tmp)
+    if sampler:
+        sampler.stop(args.flamegraph)
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "history", "profile", "flamegraph")},
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stages": harness.stages,
+    }
+    if args.json == "-":
+        print(json.dumps(record, indent=2))
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Per-call overhead of ``metrics.timed`` on a stage function.
+
+    python benchmarks/bench_metrics.py --calls 200000 --threads 4
+
+Times a trivial function bare and wrapped, best of ``--repeats`` runs
+(the worst case: the wrapper's cost is all there is), and puts that next
+to one call of a small real stage, ``JDMatcher.match`` on a four-phrase
+CV. Finally ``--threads`` threads hammer one stage and the recorded call
+count and Prometheus histogram are checked against the calls made.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics  # noqa: E402
+from matching import JDMatcher  # noqa: E402
+
+
+def per_call_ns(fn, calls, *args):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn(*args)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def best_of(repeats, fn, calls, *args):
+    return min(per_call_ns(fn, calls, *args) for _ in range(repeats))
+
+
+def noop(value):
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--stage-calls", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    bare_ns = best_of(args.repeats, noop, args.calls // args.repeats, 1)
+    wrapped_ns = best_of(args.repeats, metrics.timed("noop")(noop), args.calls // args.repeats, 1)
+
+    matcher = JDMatcher(["python programming", "machine learning", "data analysis", "project management"])
+    cv = ["python", "deep machine learning", "sql databases", "stakeholder management"]
+    matcher.match(cv)
+    stage_us = best_of(args.repeats, matcher.match, args.stage_calls // args.repeats, cv) / 1000
+
+    metrics.reset()
+    hammered = metrics.timed("hammered")(noop)
+    threads = [threading.Thread(target=per_call_ns, args=(hammered, args.calls // args.threads, 1))
+               for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    expected = args.calls // args.threads * args.threads
+    recorded = metrics.snapshot()["stages"]["hammered"]["calls"]
+    exposition = metrics.to_prometheus()
+    inf_bucket = f'{metrics.PREFIX}_stage_seconds_bucket{{stage="hammered",le="+Inf"}} {expected}'
+    consistent = recorded == expected and inf_bucket in exposition.splitlines()
+
+    overhead_ns = wrapped_ns - bare_ns
+    print(f"trivial function : bare {bare_ns:7.0f} ns, timed {wrapped_ns:7.0f} ns  (+{overhead_ns:.0f} ns per call)")
+    print(f"JDMatcher.match  : {stage_us:7.1f} us per call, so timing it adds {overhead_ns / (stage_us * 10):.3f}%")
+    print(f"{args.threads} threads x {args.calls // args.threads} calls: recorded {recorded}, "
+          f"Prometheus +Inf bucket matches: {consistent}")
+    return 0 if consistent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Per-document ``nlp()`` with the full pipeline vs. batched ``nlp.pipe``.
+
+    python benchmarks/bench_nlp_pipe.py --cvs 300 --batch-sizes 16 64 256 --n-process 1 4
+
+The baseline mirrors the original apps: ``spacy.load("en_core_web_sm")``
+with NER and the lemmatizer enabled, one call per CV. The batched runs use
+``models.load_nlp()`` (noun-chunk components only). Phrase output is
+compared against the baseline.
+"""
+import argparse
+import os
+import sys
+import time
+
+import spacy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import engine  # noqa: E402
+from bench_process_pool import synthetic_cvs  # noqa: E402
+from models import SPACY_MODEL, load_nlp  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=300)
+    parser.add_argument("--skills-per-cv", type=int, default=40)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts = [data.decode("utf-8") for _, data in synthetic_cvs(args.cvs, args.skills_per_cv, args.seed)]
+
+    full_nlp = spacy.load(SPACY_MODEL)
+    start = time.perf_counter()
+    docs = [full_nlp(text.lower()) for text in texts]
+    baseline_time = time.perf_counter() - start
+    expected_phrases = [engine._doc_phrases(doc) for doc in docs]
+    print(f"pipes enabled (baseline): {full_nlp.pipe_names}")
+    print(f"{'mode':<28} {'docs/s':>8} {'speedup':>8}  identical")
+    print(f"{'nlp() per doc, full':<28} {len(texts) / baseline_time:>8.1f} {1:>7.2f}x  -")
+
+    print(f"pipes enabled (batched): {load_nlp().pipe_names}")
+    for n_process in args.n_process:
+        for batch_size in args.batch_sizes:
+            start = time.perf_counter()
+            phrases = engine.extract_phrases_bulk(texts, batch_size=batch_size, n_process=n_process)
+            elapsed = time.perf_counter() - start
+            identical = [sorted(p) for p in phrases] == [sorted(p) for p in expected_phrases]
+            label = f"pipe bs={batch_size} n_proc={n_process}"
+            print(f"{label:<28} {len(texts) / elapsed:>8.1f} {baseline_time / elapsed:>7.2f}x  {identical}")
+
+
+if __name__ == "__main__":
+    main()
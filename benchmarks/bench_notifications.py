@@ -0,0 +1,159 @@
+"""Interview notifications: one SMTP session per email vs. the pooled outbox.
+
+    python benchmarks/bench_notifications.py --emails 500 --connections 4
+    python benchmarks/bench_notifications.py --server localhost:8025   # e.g. python -m aiosmtpd -n
+
+The legacy path is the original ``project.send_email`` loop (connect,
+send, quit, once per email, serially; no STARTTLS/login since the
+stand-in doesn't offer them). The new path is ``notifications.Dispatcher``
+over a temporary ``Outbox``. By default both talk to a local stand-in
+SMTP server that delays its greeting (``--connect-ms``, standing in for
+TCP + TLS + AUTH) and every reply (``--rtt-ms``), and answers ``451`` to
+the first RCPT for every ``--flaky``-th recipient, so retries are
+exercised and every email must arrive exactly once.
+"""
+import argparse
+import os
+import re
+import smtplib
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from notifications import Dispatcher, Outbox  # noqa: E402
+
+SENDER = "hr@example.com"
+MESSAGE_ID = re.compile(rb"^Message-ID: (.+?)\r?$", re.MULTILINE | re.IGNORECASE)
+
+
+class StandInSMTP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_delay, rtt, flaky):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connect_delay, self.rtt, self.flaky = connect_delay, rtt, flaky
+        self.received = []
+        self.refused = set()
+        self.lock = threading.Lock()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        time.sleep(self.server.rtt)
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        time.sleep(server.connect_delay)
+        self.reply("220 stand-in ESMTP")
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 stand-in")
+            elif verb == "RCPT":
+                recipient = command.split(":", 1)[1].strip("<> ")
+                number = int(re.search(r"\d+", recipient).group())
+                with server.lock:
+                    first_try = recipient not in server.refused
+                    server.refused.add(recipient)
+                self.reply("451 try again later" if server.flaky and number % server.flaky == 0 and first_try else "250 OK")
+            elif verb == "DATA":
+                self.reply("354 end with .")
+                lines = []
+                for line in self.rfile:
+                    if line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(line)
+                match = MESSAGE_ID.search(b"".join(lines))
+                with server.lock:
+                    server.received.append(match.group(1) if match else b"")
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+def legacy_send(host, port, messages):
+    for recipient, subject, body in messages:
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = SENDER
+        msg["To"] = recipient
+        try:
+            server = smtplib.SMTP(host, port)
+            server.sendmail(SENDER, recipient, msg.as_string())
+            server.quit()
+        except Exception as e:
+            print(f"Failed to send email: {e}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--connect-ms", type=float, default=40.0)
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--flaky", type=int, default=25, help="every n-th recipient gets one 451 (0 = never)")
+    parser.add_argument("--server", help="host:port of an external SMTP stand-in instead of the built-in one")
+    args = parser.parse_args()
+
+    messages = [(f"candidate{i}@example.com", "Interview Invitation", "You are selected for the interview!")
+                for i in range(args.emails)]
+    stand_in = None
+    if args.server:
+        host, port = args.server.rsplit(":", 1)
+        port = int(port)
+    else:
+        stand_in = StandInSMTP(args.connect_ms / 1000, args.rtt_ms / 1000, args.flaky)
+        host, port = stand_in.server_address
+        threading.Thread(target=stand_in.serve_forever, daemon=True).start()
+
+    start = time.perf_counter()
+    legacy_send(host, port, messages)
+    legacy_time = time.perf_counter() - start
+    legacy_delivered = len(stand_in.received) if stand_in else None
+
+    if stand_in:
+        stand_in.received.clear()
+        stand_in.refused.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = Outbox(os.path.join(tmp, "outbox.sqlite"))
+        dispatcher = Dispatcher(outbox, host, port, SENDER, starttls=False, connections=args.connections,
+                                batch_size=args.batch_size, backoff=0.05, poll_interval=0.01).start()
+        start = time.perf_counter()
+        batch = dispatcher.submit(messages)
+        submit_ms = (time.perf_counter() - start) * 1000
+        while True:
+            progress = outbox.progress(batch)
+            if progress["sent"] + progress["failed"] == progress["total"]:
+                break
+            time.sleep(0.005)
+        pooled_time = time.perf_counter() - start
+        dispatcher.stop()
+
+    print(f"{args.emails} emails, {args.connections} pooled connections, "
+          f"handshake {args.connect_ms:.0f} ms, reply latency {args.rtt_ms:.0f} ms")
+    print(f"legacy connect-per-email : {legacy_time:7.2f} s  ({args.emails / legacy_time:7.1f} emails/s)"
+          + (f", delivered {legacy_delivered}" if stand_in else ""))
+    print(f"UI blocked on submit     : {submit_ms:7.1f} ms")
+    print(f"pooled outbox drained    : {pooled_time:7.2f} s  ({args.emails / pooled_time:7.1f} emails/s), "
+          f"sent {progress['sent']}, failed {progress['failed']}")
+    if not stand_in:
+        return 0
+    expected = progress["sent"] == args.emails
+    exactly_once = len(stand_in.received) == len(set(stand_in.received)) == args.emails
+    print(f"every email delivered exactly once: {expected and exactly_once}")
+    return 0 if expected and exactly_once else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
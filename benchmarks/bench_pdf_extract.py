@@ -0,0 +1,102 @@
+"""Serial pdfplumber vs. the pdf_extract layer on a mixed PDF corpus.
+
+    python benchmarks/bench_pdf_extract.py --small 40 --large 4 --corrupt 2
+    python benchmarks/bench_pdf_extract.py --dir path/to/real/pdfs
+
+The generated corpus (needs fpdf) mixes 1-2 page CVs, 40-page documents
+and truncated files. The legacy path is the original myapp loop: one
+pdfplumber pass per file, in process, with no limits. Quarantined files
+go to a temporary directory.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pdf_extract  # noqa: E402
+
+
+def make_pdf(pages, lines=35):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_font("Arial", size=10)
+    for page in range(pages):
+        pdf.add_page()
+        for line in range(lines):
+            pdf.cell(0, 6, f"Page {page} line {line}: Python, SQL, Docker, Kubernetes and machine learning.", ln=True)
+    return pdf.output(dest="S").encode("latin1")
+
+
+def corpus(args):
+    files = []
+    if args.dir:
+        for name in sorted(os.listdir(args.dir)):
+            if name.lower().endswith(".pdf"):
+                with open(os.path.join(args.dir, name), "rb") as f:
+                    files.append((name, f.read()))
+        return files
+    small, large = make_pdf(2), make_pdf(40)
+    # Vary one byte so every file has its own hash (no quarantine short-cuts)
+    files += [(f"small_{i}.pdf", small + b"%" + str(i).encode()) for i in range(args.small)]
+    files += [(f"large_{i}.pdf", large + b"%" + str(i).encode()) for i in range(args.large)]
+    files += [(f"corrupt_{i}.pdf", large[: len(large) // 3] + str(i).encode()) for i in range(args.corrupt)]
+    return files
+
+
+def legacy(data):
+    import pdfplumber
+    text = ""
+    with pdfplumber.open(BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+
+def run(label, files, extract):
+    times, failed = [], 0
+    start = time.perf_counter()
+    for name, data in files:
+        t = time.perf_counter()
+        try:
+            extract(name, data)
+        except Exception:
+            failed += 1
+        times.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    times.sort()
+    print(f"{label:<26} {total:>8.2f} {times[len(times) // 2] * 1000:>9.1f} {times[-1] * 1000:>9.1f} {failed:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", help="Use real PDFs from this directory instead of generating")
+    parser.add_argument("--small", type=int, default=40)
+    parser.add_argument("--large", type=int, default=4)
+    parser.add_argument("--corrupt", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=pdf_extract.DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+
+    files = corpus(args)
+    quarantine_dir = tempfile.mkdtemp()
+    print(f"{len(files)} PDFs, backends available: {pdf_extract.available_backends()}")
+    print(f"{'path':<26} {'total s':>8} {'p50 ms':>9} {'max ms':>9} {'failed':>7}")
+    try:
+        run("pdfplumber serial (legacy)", files, lambda name, data: legacy(data))
+        run("pdf_extract isolated", files, lambda name, data: pdf_extract.extract_pdf_text(
+            data, name, timeout=args.timeout, quarantine_dir=quarantine_dir))
+        run("pdf_extract in-process", files, lambda name, data: pdf_extract.extract_pdf_text(
+            data, name, isolate=False))
+        quarantined = [n for n in os.listdir(quarantine_dir) if n.endswith(".json")]
+        print(f"quarantined: {len(quarantined)}")
+    finally:
+        shutil.rmtree(quarantine_dir)
+
+
+if __name__ == "__main__":
+    main()
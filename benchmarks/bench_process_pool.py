@@ -0,0 +1,75 @@
+"""Parsing + spaCy throughput for 1..N worker processes.
+
+    python benchmarks/bench_process_pool.py --cvs 400 --workers 1 2 4 8 16
+
+Every run is checked against the serial output; pool start-up (which loads
+en_core_web_sm in each worker) is reported separately from the parse time.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import engine  # noqa: E402
+
+FILLER = [
+    "Worked on", "Responsible for", "Led a project using", "Built services with",
+    "Hands-on experience in", "Delivered dashboards in", "Mentored juniors on",
+]
+
+
+def synthetic_cvs(count, skills_per_cv, seed):
+    rng = random.Random(seed)
+    with open("all_skills.txt", "r", encoding="utf-8") as f:
+        skills = [line.strip() for line in f if len(line.strip()) > 2]
+    documents = []
+    for i in range(count):
+        lines = [f"Candidate {i}", f"candidate{i}@example.com", "+1 555 010 {:04d}".format(i)]
+        for _ in range(skills_per_cv):
+            picked = rng.sample(skills, 2)
+            lines.append(f"{rng.choice(FILLER)} {picked[0]} and {picked[1]} for a client team.")
+        documents.append((f"cv_{i:05d}.txt", "\n".join(lines).encode("utf-8")))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=400)
+    parser.add_argument("--skills-per-cv", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    documents = synthetic_cvs(args.cvs, args.skills_per_cv, args.seed)
+    reference = None
+    print(f"{'workers':>7} {'startup s':>10} {'parse s':>9} {'CVs/s':>8} {'speedup':>8}  identical")
+    for workers in args.workers:
+        start = time.perf_counter()
+        pool = engine.make_pool(workers)
+        if pool is not None:
+            # Force every worker to start and load spaCy before timing
+            list(pool.map(_noop, range(workers * 4)))
+        startup = time.perf_counter() - start
+        if pool is None:
+            engine.load_nlp()
+
+        start = time.perf_counter()
+        parsed = engine.parse_many(documents, pool, chunksize=max(1, len(documents) // (4 * workers)))
+        elapsed = time.perf_counter() - start
+        if pool is not None:
+            pool.shutdown()
+
+        if reference is None:
+            reference, base = parsed, elapsed
+        print(f"{workers:>7} {startup:>10.2f} {elapsed:>9.2f} {len(documents) / elapsed:>8.1f} "
+              f"{base / elapsed:>7.2f}x  {parsed == reference}")
+
+
+def _noop(_):
+    return None
+
+
+if __name__ == "__main__":
+    main()
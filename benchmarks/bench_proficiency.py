@@ -0,0 +1,70 @@
+"""Per-skill substring proficiency lookups vs. the single-pass scan.
+
+    python benchmarks/bench_proficiency.py --cvs 50 --skills-per-cv 150
+
+The legacy path is the original project.py behaviour: lowercase the whole
+CV and run six substring searches for every detected skill.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import skills  # noqa: E402
+from bench_skill_index import planted_corpus  # noqa: E402
+
+def legacy_proficiency(skill, text, cues=skills.PROFICIENCY_CUES):
+    context = text.lower()
+    for level, phrases in cues.items():
+        if any(f"{phrase} {skill}" in context for phrase in phrases):
+            return level
+    return skills.UNKNOWN_PROFICIENCY
+
+
+CUED = ["Expert in {}.", "Advanced {} user.", "Proficient in {}.", "Familiar with {}.", "Basic {} knowledge."]
+
+
+def long_corpus(count, skills_per_cv, seed):
+    rng = random.Random(seed)
+    corpus = []
+    for text, planted in planted_corpus(count, skills_per_cv, seed):
+        cued = " ".join(rng.choice(CUED).format(skill) for skill in rng.sample(sorted(planted), len(planted) // 3))
+        corpus.append(text + " " + cued)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=50)
+    parser.add_argument("--skills-per-cv", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts = long_corpus(args.cvs, args.skills_per_cv, args.seed)
+    index = skills.SkillIndex.load_or_build()
+    found = [index.find(text) for text in texts]
+    print(f"{args.cvs} CVs, avg {sum(map(len, texts)) / len(texts):.0f} chars, "
+          f"avg {sum(map(len, found)) / len(found):.0f} detected skills")
+
+    start = time.perf_counter()
+    legacy = [{skill: legacy_proficiency(skill, text) for skill in detected}
+              for text, detected in zip(texts, found)]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [index.find_with_proficiency(text) for text in texts]
+    single_time = time.perf_counter() - start
+
+    agree = sum(legacy_map[s] == single_map.get(s) for legacy_map, single_map in zip(legacy, single) for s in legacy_map)
+    total = sum(len(legacy_map) for legacy_map in legacy)
+    print(f"per-skill substring : {legacy_time * 1000 / len(texts):8.2f} ms/CV (proficiency only)")
+    print(f"single pass         : {single_time * 1000 / len(texts):8.2f} ms/CV (detection + proficiency)")
+    # Differences come from substring hits inside longer words, e.g.
+    # "advanced javascript" also tagging "java" in the legacy path
+    print(f"agreement           : {agree / total:.1%} of {total} skill levels")
+
+
+if __name__ == "__main__":
+    main()
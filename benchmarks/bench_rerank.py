@@ -0,0 +1,102 @@
+"""Re-ranking on a slider move: per-CV Python loop vs. ``ranking.rerank``.
+
+    python benchmarks/bench_rerank.py --cvs 1000
+
+The legacy path is the original project.py loop body (``custom_score``,
+``skill_gap_penalty`` and the row dict per CV, then a DataFrame and sort)
+given already-computed skill maps and match scores. Before this change
+each rerun also re-extracted, re-matched and re-encoded every CV; that
+part now comes from the cached feature table and isn't timed here.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ranking  # noqa: E402
+from skill_vocab import SkillVocabulary  # noqa: E402
+
+LEVELS = ["⭐⭐⭐ Advanced", "⭐⭐ Intermediate", "⭐ Beginner", "Unknown"]
+
+
+def legacy_rank(names, skill_maps, match_scores, jd_skills, match_weight, common_weight, proficiency_weight):
+    def custom_score(match_score, common_skills, proficiencies):
+        prof_score = sum(
+            1 if p.startswith("⭐⭐⭐") else 0.5 if p.startswith("⭐⭐") else 0.2
+            for p in proficiencies.values()
+        ) / max(len(proficiencies), 1)
+        return (match_score * match_weight) + (len(common_skills) * common_weight) + (prof_score * proficiency_weight * 100)
+
+    cv_data = []
+    for name, cv_skills_map, match_score in zip(names, skill_maps, match_scores):
+        cv_skills = list(cv_skills_map.keys())
+        common_skills = sorted(set(cv_skills) & set(jd_skills))
+        missing_skills = sorted(set(jd_skills) - set(cv_skills))
+        rank_score = custom_score(match_score, common_skills, {k: v for k, v in cv_skills_map.items() if k in common_skills})
+        penalty = len(missing_skills) * 2.5
+        final_score = max(match_score - penalty, 0)
+        cv_data.append({
+            "Candidate": name,
+            "Match Score": match_score,
+            "Rank Score": round(rank_score, 2),
+            "Penalty Score": penalty,
+            "Final Score": round(final_score, 2),
+            "Skills": ", ".join(f"{k.title()} ({v})" for k, v in cv_skills_map.items()),
+            "Common Skills": ", ".join(common_skills),
+            "Missing Skills": ", ".join(missing_skills),
+            "Email": "candidate_email@example.com"
+        })
+    return pd.DataFrame(cv_data).sort_values(by="Rank Score", ascending=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=1000)
+    parser.add_argument("--skills-per-cv", type=int, default=40)
+    parser.add_argument("--moves", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = [f"skill {i}" for i in range(500)]
+    jd_skills = rng.sample(vocab[:100], 30)
+    names = [f"cv{i}.pdf" for i in range(args.cvs)]
+    skill_maps = [{skill: rng.choice(LEVELS) for skill in rng.sample(vocab, args.skills_per_cv)} for _ in names]
+    match_scores = [round(rng.uniform(0, 100), 2) for _ in names]
+    moves = [(rng.random(), rng.random(), rng.random()) for _ in range(args.moves)]
+
+    start = time.perf_counter()
+    for weights in moves:
+        expected = legacy_rank(names, skill_maps, match_scores, jd_skills, *weights)
+    legacy_ms = (time.perf_counter() - start) / len(moves) * 1000
+
+    skill_vocab = SkillVocabulary.build(vocab)
+    cv_skills = [(skill_vocab.ids(skill_map), list(skill_map.values())) for skill_map in skill_maps]
+    jd_ids = skill_vocab.ids(jd_skills)
+    start = time.perf_counter()
+    features = pd.DataFrame([
+        ranking.feature_row(name, skill_ids, score, jd_ids, skill_vocab)
+        for name, skill_ids, score in zip(names, cv_skills, match_scores)
+    ])
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for weights in moves:
+        actual = ranking.rerank(features, *weights)
+    rerank_ms = (time.perf_counter() - start) / len(moves) * 1000
+
+    same = actual.reset_index(drop=True).equals(expected.reset_index(drop=True))
+    print(f"{args.cvs} CVs, {args.moves} slider moves")
+    print(f"legacy loop per move   : {legacy_ms:8.2f} ms")
+    print(f"feature table (once)   : {build_ms:8.2f} ms")
+    print(f"vectorised rerank/move : {rerank_ms:8.2f} ms")
+    print(f"identical ranked table : {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Skill Coverage Search: string-splitting filters vs. the bitmap inverted index.
+
+    python benchmarks/bench_skill_coverage.py --candidates 100000 --selected 3
+
+The legacy path is the original myapp.py code on the comma-joined
+``Matched Skills`` column: rebuild ``available_skills``, filter with
+``has_all_skills`` and count coverage with one ``apply`` per skill.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from skill_search import SkillCoverageIndex  # noqa: E402
+
+
+def legacy_search(df, selected_skills):
+    available_skills = sorted(set(", ".join(df["Matched Skills"]).split(", ")))
+
+    def has_all_skills(row_skills):
+        row_skill_set = set(row_skills.split(", "))
+        return all(skill in row_skill_set for skill in selected_skills)
+
+    filtered = df[df["Matched Skills"].apply(has_all_skills)]
+    counts = {
+        skill: df["Matched Skills"].apply(lambda x: skill in x.split(", ")).sum()
+        for skill in selected_skills
+    }
+    return available_skills, filtered, counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--jd-skills", type=int, default=300)
+    parser.add_argument("--selected", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = [f"skill {i}" for i in range(args.jd_skills)]
+    weights = [1 / (i + 1) for i in range(len(vocab))]  # a few skills are common, most are rare
+    lists = [sorted(set(rng.choices(vocab, weights, k=rng.randint(0, 40)))) for _ in range(args.candidates)]
+    df = pd.DataFrame({"Matched Skills": [", ".join(skills) for skills in lists], "Matched Skill List": lists})
+    selections = [rng.sample(vocab[:20], args.selected) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    legacy = legacy_search(df, selections[0])
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SkillCoverageIndex(df["Matched Skill List"].tolist())
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for selected in selections:
+        rows = index.match_all(selected)
+        counts = index.coverage(selected)
+    query_ms = (time.perf_counter() - start) / len(selections) * 1000
+
+    rows = index.match_all(selections[0])
+    counts = index.coverage(selections[0])
+    same = (list(df.index[rows]) == list(legacy[1].index)
+            and counts == {k: int(v) for k, v in legacy[2].items()})
+    print(f"{args.candidates} candidates, {len(index.skills)} distinct skills, {args.selected} selected")
+    print(f"legacy (one rerun)      : {legacy_time * 1000:9.1f} ms")
+    print(f"index build (once)      : {build_time * 1000:9.1f} ms")
+    print(f"filter + coverage query : {query_ms:9.3f} ms")
+    print(f"same candidates and counts: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Noun-chunk skill detection vs. the precompiled SkillIndex.
+
+    python benchmarks/bench_skill_index.py --cvs 300
+
+Synthetic CVs embed known skills from all_skills.txt inside ordinary
+sentences; recall and precision are measured against those planted
+skills, so everyday words in the sentences ("led", "code reviews")
+reported as skills count against precision. Also reports the one-off
+index build time and the warm load time from disk.
+"""
+import argparse
+import collections
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import skills  # noqa: E402
+import skill_vocab  # noqa: E402
+from models import load_nlp  # noqa: E402
+
+TEMPLATES = [
+    "Built data pipelines with {} for the payments team.",
+    "Expert in {} and code reviews.",
+    "Three years of {} development on client projects.",
+    "Familiar with {}.",
+    "Led the migration to {} across two products.",
+]
+
+
+def noun_chunk_skills(nlp, text, known_skills):
+    # The original project.py detector: noun chunks looked up in a set of lowercase skill lines
+    found = {}
+    for chunk in nlp(text.lower()).noun_chunks:
+        phrase = chunk.text.strip().lower()
+        if phrase in known_skills:
+            found[phrase] = None
+    return found
+
+
+def planted_corpus(count, skills_per_cv, seed):
+    rng = random.Random(seed)
+    vocab = skills.SkillIndex.load_or_build().vocabulary
+    # Canonical names, so every planted skill is reported under the name it was planted as
+    vocabulary = [name for name in vocab.names(range(len(vocab))) if len(skills.tokenize(name)) <= 3]
+    corpus = []
+    for _ in range(count):
+        planted = rng.sample(vocabulary, skills_per_cv)
+        text = " ".join(rng.choice(TEMPLATES).format(skill) for skill in planted)
+        corpus.append((text, set(planted)))
+    return corpus
+
+
+def recall(found_maps, corpus):
+    hits = sum(len(set(found) & planted) for found, (_, planted) in zip(found_maps, corpus))
+    return hits / sum(len(planted) for _, planted in corpus)
+
+
+def precision(found_maps, corpus):
+    hits = sum(len(set(found) & planted) for found, (_, planted) in zip(found_maps, corpus))
+    return hits / max(sum(len(found) for found in found_maps), 1)
+
+
+def unplanted(found_maps, corpus):
+    return collections.Counter(skill for found, (_, planted) in zip(found_maps, corpus) for skill in found
+                               if skill not in planted)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=300)
+    parser.add_argument("--skills-per-cv", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--skip-spacy", action="store_true", help="Only time the index")
+    args = parser.parse_args()
+
+    corpus = planted_corpus(args.cvs, args.skills_per_cv, args.seed)
+    texts = [text for text, _ in corpus]
+
+    index_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        skills.SkillIndex.load_or_build(index_dir=index_dir)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        index = skills.SkillIndex.load_or_build(index_dir=index_dir)
+        load_time = time.perf_counter() - start
+    finally:
+        shutil.rmtree(index_dir)
+    print(f"index: {len(index.vocabulary)} skills, build {build_time * 1000:.0f} ms, load {load_time * 1000:.0f} ms")
+
+    print(f"{'detector':<22} {'CVs/s':>8} {'recall':>7} {'precision':>9}")
+    if not args.skip_spacy:
+        known_skills = set(skill_vocab.read_skills())
+        nlp = load_nlp()
+        start = time.perf_counter()
+        found = [noun_chunk_skills(nlp, text, known_skills) for text in texts]
+        elapsed = time.perf_counter() - start
+        print(f"{'noun chunks (spaCy)':<22} {len(texts) / elapsed:>8.1f} {recall(found, corpus):>7.1%} "
+              f"{precision(found, corpus):>9.1%}")
+
+    start = time.perf_counter()
+    found = [index.find_with_proficiency(text) for text in texts]
+    elapsed = time.perf_counter() - start
+    print(f"{'SkillIndex':<22} {len(texts) / elapsed:>8.1f} {recall(found, corpus):>7.1%} "
+          f"{precision(found, corpus):>9.1%}")
+    extra = unplanted(found, corpus)
+    print(f"SkillIndex unplanted skills: {sum(extra.values())}, most often "
+          f"{', '.join(f'{skill} ({count})' for skill, count in extra.most_common(5))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Skill vocabulary: ``load_skills`` string set vs. the compiled, memory-mapped vocabulary.
+
+    python benchmarks/bench_skill_vocab.py --workers 4
+
+The legacy path is the original ``project.load_skills`` (inlined below):
+read ``all_skills.txt`` line by line into a set of lowercase strings, in
+every process. The new path compiles ``skill_vocab.SkillVocabulary`` once
+and loads it memory-mapped. Each load runs in fresh processes (``--workers``
+at a time) and reports its time and how much of its memory is private
+(``RssAnon``) vs. file pages the OS shares between processes
+(``RssFile``). Also checks that versions are gone and that aliases and
+spelling variants resolve to one ID.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import skill_vocab  # noqa: E402
+import skills  # noqa: E402
+
+SAME_SKILL = [("k8s", "Kubernetes"), ("js", "JavaScript"), ("e-commerce", "ecommerce"), ("ML", "machine learning")]
+
+
+def legacy_load_skills(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return set(line.strip().lower() for line in f if len(line.strip()) > 1)
+
+
+def memory_kb():
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def child(mode, index_dir):
+    before = memory_kb()
+    start = time.perf_counter()
+    if mode == "legacy":
+        vocabulary = legacy_load_skills(os.path.join(ROOT, skills.SKILLS_PATH))
+    else:
+        vocabulary = skill_vocab.SkillVocabulary.load_or_build(os.path.join(ROOT, skills.SKILLS_PATH), index_dir)
+    size = len(vocabulary)
+    load_ms = (time.perf_counter() - start) * 1000
+    if mode != "legacy":
+        vocabulary.lookup(skill_vocab.tokenize("python and machine learning"))  # builds the token dict
+    after = memory_kb()
+    print(json.dumps({"load_ms": load_ms, "size": size, "first_use_ms": (time.perf_counter() - start) * 1000,
+                      "anon_kb": after["RssAnon"] - before["RssAnon"], "file_kb": after["RssFile"] - before["RssFile"]}))
+
+
+def run_children(mode, index_dir, workers):
+    def one(_):
+        out = subprocess.run([sys.executable, __file__, "--child", mode, "--index-dir", index_dir],
+                             check=True, capture_output=True, text=True).stdout
+        return json.loads(out)
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(one, range(workers)))
+    return {key: sum(r[key] for r in results) / len(results) for key in results[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--child")
+    parser.add_argument("--index-dir")
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.index_dir)
+        return 0
+
+    skills_path = os.path.join(ROOT, skills.SKILLS_PATH)
+    raw = legacy_load_skills(skills_path)
+    index_dir = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        vocabulary = skill_vocab.SkillVocabulary.load_or_build(skills_path, index_dir)
+        build_ms = (time.perf_counter() - start) * 1000
+        legacy = run_children("legacy", index_dir, args.workers)
+        compiled = run_children("compiled", index_dir, args.workers)
+        on_disk = sum(entry.stat().st_size for entry in os.scandir(os.path.join(index_dir, f"vocab-{vocabulary.version}")))
+    finally:
+        shutil.rmtree(index_dir)
+
+    junk = sorted(skill for skill in raw if not skill_vocab.is_skill(skill))
+    leaked = [skill for skill in junk if vocabulary.id_of(skill) >= 0]
+    same = all(vocabulary.id_of(a) == vocabulary.id_of(b) >= 0 for a, b in SAME_SKILL)
+    print(f"all_skills.txt: {len(raw)} lowercase lines, {len(junk)} numbers/versions (e.g. {', '.join(junk[:4])})")
+    print(f"compiled: {len(vocabulary)} skills, {int((vocabulary.prefix_skills >= 0).sum())} spellings, "
+          f"{on_disk / 1024:.0f} KB on disk, built once in {build_ms:.0f} ms")
+    for label, result in (("legacy set", legacy), ("compiled mmap", compiled)):
+        print(f"{label:<14}: load {result['load_ms']:6.1f} ms (first use {result['first_use_ms']:6.1f} ms), "
+              f"private {result['anon_kb'] / 1024:5.1f} MB, shared file pages {result['file_kb'] / 1024:5.1f} MB "
+              f"per process ({args.workers} processes)")
+    print(f"versions resolved to a skill: {len(leaked)}; aliases/variants share an ID "
+          f"({', '.join(f'{a}={b}' for a, b in SAME_SKILL)}): {same}")
+    return 0 if same and not leaked else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
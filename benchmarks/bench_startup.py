@@ -0,0 +1,77 @@
+"""Cold and warm start times of the Streamlit apps.
+
+    python benchmarks/bench_startup.py --apps myapp.py project.py --runs 3
+    python benchmarks/bench_startup.py --history startup_history.jsonl
+
+Each run starts a fresh interpreter and drives the script with Streamlit's
+``AppTest`` harness, so no browser is needed. "cold" is the first script
+run in that process (imports + module-level work, i.e. the time before the
+first page render); "warm" is the rerun that follows, which is what every
+widget interaction pays. With ``--history`` the medians are appended as a
+JSON line so start-up regressions can be tracked over time.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+harness = time.perf_counter() - start
+app = AppTest.from_file(sys.argv[1], default_timeout=600)
+start = time.perf_counter()
+app.run()
+cold = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+warm = time.perf_counter() - start
+modules = sorted(m for m in ("torch", "spacy", "sentence_transformers", "matplotlib", "wordcloud", "plotly", "sklearn")
+                 if m in sys.modules)
+print(json.dumps({"cold": cold, "warm": warm, "harness": harness,
+                  "errors": [str(e.value) for e in app.exception], "heavy_modules": modules}))
+"""
+
+
+def measure(app, runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, app], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", nargs="+", default=["myapp.py", "project.py"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--history", help="Append the medians to this JSONL file")
+    args = parser.parse_args()
+
+    record = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "apps": {}}
+    print(f"{'app':<14} {'cold s':>7} {'warm s':>7}  heavy modules loaded at startup")
+    for app in args.apps:
+        results = measure(app, args.runs)
+        cold = statistics.median(r["cold"] for r in results)
+        warm = statistics.median(r["warm"] for r in results)
+        heavy = results[-1]["heavy_modules"]
+        record["apps"][app] = {"cold": round(cold, 3), "warm": round(warm, 3), "heavy_modules": heavy}
+        print(f"{app:<14} {cold:>7.2f} {warm:>7.2f}  {', '.join(heavy) or '-'}")
+        for error in results[-1]["errors"]:
+            print(f"  ! {app} raised: {error}")
+
+    if args.history:
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Per-CV TF-IDF loop vs. the batched JDMatcher.
+
+    python benchmarks/bench_tfidf_match.py --cvs 2000 --jd-phrases 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from matching import JDMatcher  # noqa: E402
+
+
+def legacy_tfidf_match(source_phrases, target_phrases, threshold=0.5):
+    # The original myapp.tfidf_match, kept here as the reference
+    if not source_phrases or not target_phrases:
+        return [], target_phrases
+    vectorizer = TfidfVectorizer().fit(source_phrases + target_phrases)
+    source_vecs = vectorizer.transform(source_phrases)
+    matched, missing = [], []
+    for phrase in target_phrases:
+        phrase_vec = vectorizer.transform([phrase])
+        cos_sim = cosine_similarity(phrase_vec, source_vecs)
+        if cos_sim.max() >= threshold:
+            matched.append(phrase)
+        else:
+            missing.append(phrase)
+    return matched, missing
+
+
+def load_vocabulary(path="all_skills.txt", limit=3000):
+    with open(path, "r", encoding="utf-8") as f:
+        words = [line.strip().lower() for line in f if len(line.strip()) > 2]
+    return words[:limit]
+
+
+def random_phrases(rng, vocab, count):
+    return sorted({" ".join(rng.sample(vocab, rng.randint(1, 3))) for _ in range(count)})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=2000)
+    parser.add_argument("--jd-phrases", type=int, default=200)
+    parser.add_argument("--cv-phrases", type=int, default=150)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = load_vocabulary()
+    jd = random_phrases(rng, vocab[:800], args.jd_phrases)
+    cvs = [random_phrases(rng, vocab, rng.randint(0, args.cv_phrases)) for _ in range(args.cvs)]
+
+    start = time.perf_counter()
+    expected = [legacy_tfidf_match(cv, jd, args.threshold) for cv in cvs]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = JDMatcher(jd, args.threshold).match_many(cvs)
+    batched_time = time.perf_counter() - start
+
+    mismatches = sum(1 for e, a in zip(expected, actual) if list(e[0]) != a[0] or list(e[1]) != a[1])
+    print(f"CVs: {args.cvs}, JD phrases: {len(jd)}")
+    print(f"legacy loop : {legacy_time:8.2f}s")
+    print(f"JDMatcher   : {batched_time:8.2f}s")
+    print(f"speedup     : {legacy_time / batched_time:8.1f}x")
+    print(f"mismatching CVs: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Course recommendations for a candidate CSV export, read in chunks.
+
+myapps2.py loads a CSV with one row per candidate and a comma-separated
+``Missing Skills`` column. The export is read ``CHUNK_ROWS`` rows at a
+time and only those two columns are parsed. Each chunk is exploded to
+one row per (candidate, skill) and then joined against
+:class:`SkillCourseTable`. That table holds the top courses of every
+distinct skill seen so far, scored once in
+:meth:`CourseIndex.course_table`. Between chunks only candidate names,
+skill codes and course IDs are kept.
+
+Each skill gets its best course that an earlier skill of the same
+candidate hasn't already been given. The earlier
+``for skill in skills`` loop did the same, comparing stripped title and
+URL; ``CourseIndex.course_keys`` merges catalogue duplicates the same
+way. A candidate listed more than once keeps the skills of their last
+row, as the dictionary the app used to build did.
+"""
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 20000
+COLUMNS = ["Candidate", "Missing Skills"]
+
+
+def explode_skills(chunk):
+    """``(row, Candidate, skill)`` per missing skill, stripped and in CSV order, blanks dropped."""
+    skills = chunk["Missing Skills"].dropna().astype(str).str.split(",").explode().str.strip()
+    skills = skills[skills.str.len() > 0]
+    return pd.DataFrame({
+        "row": skills.index.to_numpy(np.int64),
+        "Candidate": chunk["Candidate"].reindex(skills.index).to_numpy(),
+        "skill": skills.to_numpy(),
+    })
+
+
+class SkillCourseTable:
+    """Top ``top_n`` course IDs per skill, for every skill seen so far."""
+
+    def __init__(self, course_index, top_n=1):
+        self.course_index = course_index
+        self.top_n = top_n
+        self.skills = []
+        self.codes = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.courses = np.empty(0, dtype=np.int32)
+
+    def codes_of(self, skills):
+        """Skill codes for ``skills`` (a Series), scoring the skills not seen before."""
+        new = [skill for skill in skills.unique() if skill not in self.codes]
+        if new:
+            positions, courses = self.course_index.course_table(new, self.top_n)
+            counts = np.bincount(positions, minlength=len(new))
+            self.offsets = np.concatenate([self.offsets, self.offsets[-1] + np.cumsum(counts)])
+            self.courses = np.concatenate([self.courses, courses])
+            self.codes.update(zip(new, range(len(self.skills), len(self.skills) + len(new))))
+            self.skills.extend(new)
+        return skills.map(self.codes).to_numpy(np.int64)
+
+    def options(self, skill_codes):
+        """``(index into skill_codes, course id)`` per candidate course, best first within each skill."""
+        starts, ends = self.offsets[skill_codes], self.offsets[skill_codes + 1]
+        counts = ends - starts
+        owner = np.repeat(np.arange(len(skill_codes)), counts)
+        # positions within each skill's slice, shifted to where the slice starts
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return owner, self.courses[starts[owner] + within]
+
+
+def assign_courses(rows, owner, courses, n_pairs, course_keys):
+    """Course per (row, skill) pair, or -1: its best course not given to an earlier skill of the row.
+
+    ``rows`` is the CSV row of each pair, pairs in skill order; ``owner``/
+    ``courses`` are the options from :meth:`SkillCourseTable.options`.
+    Starts from every skill's first choice and repeats until nothing
+    changes; after round ``k`` the first ``k`` skills of every row are
+    final, and with one course per skill two rounds settle everything.
+    """
+    if not len(courses):
+        return np.full(n_pairs, -1, dtype=np.int64)  # no skill in the chunk shares a term with any course
+    keys = course_keys[courses].astype(np.int64)
+    option_key = rows[owner] * (len(course_keys) + 1) + keys
+    first_option = np.unique(owner, return_index=True)[1]
+    picks = np.full(n_pairs, -1, dtype=np.int64)
+    picks[owner[first_option]] = first_option
+    while True:
+        taken = picks >= 0
+        picked_keys = option_key[picks[taken]]
+        # earliest pair holding each (row, course); pairs are in order, so the first occurrence
+        held_keys, held_at = np.unique(picked_keys, return_index=True)
+        held_by = np.flatnonzero(taken)[held_at]
+        blocked = np.zeros(len(owner), dtype=bool)
+        if len(held_keys):
+            at = np.minimum(np.searchsorted(held_keys, option_key), len(held_keys) - 1)
+            blocked = (held_keys[at] == option_key) & (held_by[at] < owner)
+        free = np.flatnonzero(~blocked)
+        owners, first_free = np.unique(owner[free], return_index=True)
+        new_picks = np.full(n_pairs, -1, dtype=np.int64)
+        new_picks[owners] = free[first_free]
+        if np.array_equal(new_picks, picks):
+            break
+        picks = new_picks
+    return np.where(picks >= 0, courses[np.maximum(picks, 0)], -1)
+
+
+def recommend(csv_file, course_index, top_n=1, chunk_rows=CHUNK_ROWS, progress=None):
+    """``(summary, records)`` for a candidate CSV.
+
+    ``summary`` has one row per candidate with at least one missing skill
+    (Candidate Name, Missing Skills Count, Recommended Courses Count);
+    ``records`` maps each of them to ``[(skill, title, url), ...]`` for
+    their report. ``progress(rows_read, fraction)`` is called after each
+    chunk when the file's size is known, else with ``fraction=None``.
+    """
+    size = getattr(csv_file, "size", None)
+    table = SkillCourseTable(course_index, top_n)
+    course_keys = course_index.course_keys
+    candidate_codes, candidates = {}, []
+    parts, rows_read = [], 0
+    for chunk in pd.read_csv(csv_file, usecols=COLUMNS, dtype={"Candidate": str}, chunksize=chunk_rows):
+        rows_read += len(chunk)
+        pairs = explode_skills(chunk.dropna(subset=["Candidate"]))
+        for candidate in pairs["Candidate"].unique():
+            if candidate not in candidate_codes:
+                candidate_codes[candidate] = len(candidates)
+                candidates.append(candidate)
+        rows = pairs["row"].to_numpy()
+        skill_codes = table.codes_of(pairs["skill"])
+        owner, courses = table.options(skill_codes)
+        parts.append((
+            pairs["Candidate"].map(candidate_codes).to_numpy(np.int32), rows, skill_codes.astype(np.int32),
+            assign_courses(rows, owner, courses, len(pairs), course_keys).astype(np.int32),
+        ))
+        if progress is not None:
+            progress(rows_read, min(csv_file.tell() / size, 1.0) if size else None)
+
+    if not parts:
+        parts = [(np.empty(0, np.int32), np.empty(0, np.int64), np.empty(0, np.int32), np.empty(0, np.int32))]
+    codes, rows, skill_codes, courses = (np.concatenate(arrays) for arrays in zip(*parts))
+    # Last row per candidate wins; codes follow first appearance, the order the app lists candidates in
+    last_row = np.full(len(candidates), -1, dtype=np.int64)
+    np.maximum.at(last_row, codes, rows)
+    keep = rows == last_row[codes]
+    found = keep & (courses >= 0)
+    summary = pd.DataFrame({
+        "Candidate Name": candidates,
+        "Missing Skills Count": np.bincount(codes[keep], minlength=len(candidates)),
+        "Recommended Courses Count": np.bincount(codes[found], minlength=len(candidates)),
+    })
+
+    course_ids = courses[found]
+    tuples = list(zip(
+        np.asarray(table.skills, dtype=object)[skill_codes[found]],
+        np.asarray(course_index.titles, dtype=object)[course_ids],
+        np.asarray(course_index.urls, dtype=object)[course_ids],
+    ))
+    # A candidate's kept pairs come from one row, so they are contiguous
+    records = {candidate: [] for candidate in candidates}
+    owners = codes[found]
+    bounds = np.flatnonzero(owners[1:] != owners[:-1]) + 1
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(tuples)]):
+        if end > start:
+            records[candidates[owners[start]]] = tuples[start:end]
+    return summary, records
@@ -0,0 +1,102 @@
+"""Contact details and profile features from CV text in one regex pass.
+
+All patterns are alternatives of a single precompiled regex, so a document
+is scanned once no matter how many kinds of feature are pulled out of it.
+Alternatives are ordered so the more specific one wins at a position: a
+LinkedIn URL is not also reported as a portfolio link, and the digits of an
+email or URL are never read as a phone number.
+"""
+import re
+
+EXPERIENCE_HEADINGS = (
+    "experience", "work experience", "internship", "employment history",
+    "professional experience", "roles and responsibilities", "career timeline",
+)
+
+_SCHEME = r"(?:https?://)?(?:www\.)?"
+
+# Digit groups joined by single separators, optionally after a country code
+# and/or a bracketed area code: "+1 (555) 123-4567", "020 7946 0958"; or
+# one unbroken run of 10-15 digits: "9876543210", "+91 9876543210"
+_PHONE = (
+    r"(?:\+\d{1,3}[ .\-]?)?"
+    r"(?:(?:\(\d{1,5}\)[ .\-]?)?\d{1,5}(?:[ .\-]\d{1,5}){1,5}|\d{10,15})"
+    r"(?![\w@]|\.\d)"
+)
+
+# Nothing can start in the middle of a word, which lets the scanner skip
+# most positions after a one-character look-behind
+_PATTERN = re.compile(
+    r"(?<![\w.%+\-])(?:"
+    r"(?P<linkedin>" + _SCHEME + r"linkedin\.com/in/[\w\-%]+)"
+    r"|(?P<github>" + _SCHEME + r"github\.com/[\w\-]+)"
+    r"|(?P<portfolio>(?:https?://|www\.)[^\s\"'<>()\[\]]+)"
+    r"|(?P<email>[\w.%+\-]+@[\w\-]+(?:\.[\w\-]+)*\.[a-z]{2,})"
+    r"|(?P<phone>" + _PHONE + r")"
+    r"|(?P<experience>(?:" + "|".join(
+        r"\s+".join(map(re.escape, h.split())) for h in sorted(EXPERIENCE_HEADINGS, key=len, reverse=True)
+    ) + r")\b))",
+    re.IGNORECASE,
+)
+
+_DIGITS = re.compile(r"\d+")
+_ISO_DATE = re.compile(r"(?:19|20)\d\d-\d\d-\d\d")
+
+MIN_PHONE_DIGITS = 7
+MAX_PHONE_DIGITS = 15
+
+
+def _is_phone(candidate):
+    groups = _DIGITS.findall(candidate)
+    if not MIN_PHONE_DIGITS <= sum(map(len, groups)) <= MAX_PHONE_DIGITS:
+        return False
+    if _ISO_DATE.fullmatch(candidate):
+        return False
+    # Runs of years and counts ("2019 2021 12") are not phone numbers unless
+    # written with a country or area code
+    if candidate[0] not in "+(" and any(len(g) == 4 and g[:2] in ("19", "20") for g in groups):
+        return False
+    return True
+
+
+def _add(found, key, value):
+    if value not in found[key]:
+        found[key].append(value)
+
+
+def extract_contacts(text):
+    """Emails, phones, profile URLs and experience headings found in ``text``.
+
+    Returns a dict of lists in order of first appearance, without
+    duplicates: ``emails``, ``phones``, ``linkedin``, ``github``,
+    ``portfolio`` and ``experience`` (matched headings, lowercased).
+    """
+    found = {"emails": [], "phones": [], "linkedin": [], "github": [], "portfolio": [], "experience": []}
+    for match in _PATTERN.finditer(text or ""):
+        kind, value = match.lastgroup, match.group()
+        if kind == "email":
+            _add(found, "emails", value)
+        elif kind == "phone":
+            if _is_phone(value):
+                _add(found, "phones", value)
+        elif kind == "experience":
+            _add(found, "experience", " ".join(value.lower().split()))
+        else:
+            _add(found, kind, value.rstrip(".,;:"))
+    return found
+
+
+# Feature table column -> extract_contacts key
+FEATURES = {
+    "LinkedIn": "linkedin",
+    "GitHub": "github",
+    "Email": "emails",
+    "Phone": "phones",
+    "Portfolio": "portfolio",
+    "Experience": "experience",
+}
+
+
+def feature_flags(contacts):
+    """The ✅/❌ feature row shown in the Smart Sync features table."""
+    return {name: "✅" if contacts[key] else "❌" for name, key in FEATURES.items()}
@@ -0,0 +1,212 @@
+"""Persisted TF-IDF index over the online course catalogue.
+
+    python course_index.py --courses Online_Courses.csv
+
+Fits the same ``TfidfVectorizer(stop_words='english')`` myapps2.py used to
+refit on every upload, once per catalogue version (SHA-256 of the CSV),
+and stores it under ``.course_index/<version>/``:
+
+* ``data.npy`` / ``indices.npy`` / ``indptr.npy`` - the TF-IDF matrix as
+  term-major CSR (one row per term, one column per course), loaded
+  memory-mapped so startup doesn't read it and a query only touches the
+  rows of the terms it contains;
+* ``vocabulary.json`` and ``idf.npy`` - enough to vectorise skills
+  without unpickling or refitting a vectorizer;
+* ``courses.json`` - title and URL of every indexed course.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+import metrics
+
+INDEX_DIR = ".course_index"
+INDEX_VERSION = 1
+SKILL_BATCH = 512
+
+
+@lru_cache(maxsize=None)
+def _analyzer():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(stop_words="english").build_analyzer()
+
+
+def catalogue_version(courses_path):
+    # Hashed once per (mtime, size), so a Streamlit rerun only pays for a stat
+    stat = os.stat(courses_path)
+    return _catalogue_digest(os.path.abspath(courses_path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=16)
+def _catalogue_digest(courses_path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(courses_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"v{INDEX_VERSION}-{digest.hexdigest()[:16]}"
+
+
+def load_courses(courses_path):
+    """Courses with a title and URL, and the text each one is indexed on."""
+    import pandas as pd
+    courses = pd.read_csv(courses_path, usecols=["Course Title", "Course URL", "Course Short Intro"])
+    courses = courses.dropna(subset=["Course Title", "Course URL"]).reset_index(drop=True)
+    texts = courses["Course Title"].fillna("") + " " + courses["Course Short Intro"].fillna("")
+    return courses, texts.tolist()
+
+
+class CourseIndex:
+    def __init__(self, term_matrix, vocabulary, idf, titles, urls, version="adhoc"):
+        self.term_matrix = term_matrix
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.titles = titles
+        self.urls = urls
+        self.version = version
+
+    def __len__(self):
+        return len(self.titles)
+
+    @classmethod
+    def build(cls, courses_path, version="adhoc"):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        courses, texts = load_courses(courses_path)
+        vectorizer = TfidfVectorizer(stop_words="english")
+        term_matrix = vectorizer.fit_transform(texts).T.tocsr().astype(np.float32)
+        return cls(
+            term_matrix, vectorizer.vocabulary_, vectorizer.idf_.astype(np.float32),
+            courses["Course Title"].astype(str).tolist(), courses["Course URL"].astype(str).tolist(), version,
+        )
+
+    @classmethod
+    def load_or_build(cls, courses_path, index_dir=INDEX_DIR):
+        version = catalogue_version(courses_path)
+        path = os.path.join(index_dir, version)
+        if os.path.exists(os.path.join(path, "courses.json")):
+            return cls.load(path, version)
+        index = cls.build(courses_path, version)
+        index.save(path)
+        return index
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name in ("data", "indices", "indptr"):
+            np.save(os.path.join(tmp, f"{name}.npy"), getattr(self.term_matrix, name))
+        np.save(os.path.join(tmp, "idf.npy"), self.idf)
+        with open(os.path.join(tmp, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump({term: int(i) for term, i in self.vocabulary.items()}, f)
+        with open(os.path.join(tmp, "courses.json"), "w", encoding="utf-8") as f:
+            json.dump({"shape": list(self.term_matrix.shape), "titles": self.titles, "urls": self.urls}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, version="adhoc"):
+        import scipy.sparse as sp
+        with open(os.path.join(path, "courses.json"), "r", encoding="utf-8") as f:
+            courses = json.load(f)
+        with open(os.path.join(path, "vocabulary.json"), "r", encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ("data", "indices", "indptr")]
+        term_matrix = sp.csr_matrix(tuple(arrays), shape=tuple(courses["shape"]), copy=False)
+        idf = np.load(os.path.join(path, "idf.npy"))
+        return cls(term_matrix, vocabulary, idf, courses["titles"], courses["urls"], version)
+
+    def vectorize(self, texts):
+        """L2-normalised TF-IDF rows for ``texts``, as ``TfidfVectorizer.transform`` gives."""
+        import scipy.sparse as sp
+        analyzer = _analyzer()
+        rows, cols, counts = [], [], []
+        for row, text in enumerate(texts):
+            terms = {}
+            for token in analyzer(text):
+                col = self.vocabulary.get(token)
+                if col is not None:
+                    terms[col] = terms.get(col, 0) + 1
+            rows.extend([row] * len(terms))
+            cols.extend(terms)
+            counts.extend(terms.values())
+        cols = np.array(cols, dtype=np.int64)
+        weights = np.array(counts, dtype=np.float32) * self.idf[cols]
+        vectors = sp.csr_matrix((weights, (rows, cols)), shape=(len(texts), len(self.idf)), dtype=np.float32)
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sp.diags(1 / norms) @ vectors
+
+    def _ranked(self, skills, top_n):
+        """``(position in skills, course ids best first, scores)`` for every skill."""
+        for start in range(0, len(skills), SKILL_BATCH):
+            batch = skills[start:start + SKILL_BATCH]
+            sims = (self.vectorize(batch) @ self.term_matrix).tocsr()
+            for i in range(len(batch)):
+                lo, hi = sims.indptr[i], sims.indptr[i + 1]
+                scores, courses = sims.data[lo:hi], sims.indices[lo:hi]
+                keep = scores > 0
+                scores, courses = scores[keep], courses[keep]
+                if top_n < len(scores):
+                    # Keep every course tied with the n-th best so the tie-break below is exact
+                    kth = scores[np.argpartition(-scores, top_n - 1)[top_n - 1]]
+                    keep = scores >= kth
+                    scores, courses = scores[keep], courses[keep]
+                top = np.lexsort((courses, -scores))[:top_n]
+                yield start + i, courses[top], scores[top]
+
+    @metrics.timed("find_top_courses_for_skill", items=lambda self, skills, *args, **kwargs: len(skills))
+    def top_courses(self, skills, top_n=1):
+        """``{skill: [(title, url, score), ...]}``, best course first.
+
+        All skills are scored with one sparse product per batch of
+        ``SKILL_BATCH`` skills, and only courses sharing a term with the
+        skill are ranked, so a skill with no related course gets ``[]``.
+        Ties go to the course listed first in the catalogue.
+        """
+        skills = list(dict.fromkeys(skills))
+        return {
+            skills[i]: [(self.titles[c], self.urls[c], float(score)) for c, score in zip(courses, scores)]
+            for i, courses, scores in self._ranked(skills, top_n)
+        }
+
+    @metrics.timed("find_top_courses_for_skill", items=lambda self, skills, *args, **kwargs: len(skills))
+    def course_table(self, skills, top_n=1):
+        """The :meth:`top_courses` ranking as arrays: ``(skill positions, course ids)``.
+
+        One entry per recommended course, grouped by position in ``skills``
+        and best course first, for joining against large skill lists
+        without building tuples.
+        """
+        ranked = list(self._ranked(list(skills), top_n))
+        positions = np.repeat(
+            np.array([i for i, _, _ in ranked], dtype=np.int64), [len(courses) for _, courses, _ in ranked]
+        )
+        courses = np.concatenate([courses for _, courses, _ in ranked] or [np.empty(0, np.int32)])
+        return positions, courses.astype(np.int32)
+
+    @cached_property
+    def course_keys(self):
+        """Course id -> id of the first course with the same stripped title and URL (catalogue duplicates)."""
+        first = {}
+        pairs = zip(self.titles, self.urls)
+        return np.array([first.setdefault((title.strip(), url.strip()), i) for i, (title, url) in enumerate(pairs)],
+                        dtype=np.int32)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the persisted course TF-IDF index.")
+    parser.add_argument("--courses", required=True, help="Course catalogue CSV (Course Title, Course URL, ...)")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    args = parser.parse_args(argv)
+    index = CourseIndex.load_or_build(args.courses, args.index_dir)
+    print(f"{len(index)} courses, {len(index.vocabulary)} terms -> {os.path.join(args.index_dir, index.version)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
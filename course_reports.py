@@ -0,0 +1,105 @@
+"""Per-candidate course recommendation PDFs, rendered in memory.
+
+Reports are rendered to bytes (no ``pdf_reports/`` files), optionally
+across a process pool, and :func:`iter_zip` streams them into a ZIP one
+report at a time, so neither the PDFs nor the archive are re-read from
+disk and only the compressed archive is ever held whole.
+"""
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from fpdf import FPDF
+
+import metrics
+
+# Below this many reports a process pool costs more than it saves
+MIN_POOL_REPORTS = 64
+
+
+class PDF(FPDF):
+    def header(self):
+        self.set_font('Arial', 'B', 14)
+        self.cell(0, 10, 'Recommended Courses', ln=True, align='C')
+        self.ln(10)
+
+    def course_table(self, records):
+        self.set_font('Arial', 'B', 10)
+        self.cell(50, 10, 'Skill', border=1, align='C')
+        self.cell(80, 10, 'Course Title', border=1, align='C')
+        self.cell(60, 10, 'Link', border=1, align='C')
+        self.ln()
+        self.set_font('Arial', '', 9)
+        for skill, title, url in records:
+            self.cell(50, 10, skill[:20], border=1)
+            self.cell(80, 10, title[:35], border=1)
+            self.set_text_color(0, 0, 255)
+            self.cell(60, 10, 'Click Here', border=1, link=url)
+            self.set_text_color(0, 0, 0)
+            self.ln()
+
+
+def report_filename(candidate_name):
+    return f"{str(candidate_name)[:25].replace('/', '-')}_recommendation.pdf"
+
+
+@metrics.timed("generate_pdf")
+def render_pdf(records):
+    """PDF bytes for one candidate's ``(skill, title, url)`` records."""
+    pdf = PDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.course_table(records)
+    out = pdf.output(dest="S")
+    # fpdf 1.7 returns a latin-1 str, fpdf2 a bytearray
+    return out.encode("latin-1") if isinstance(out, str) else bytes(out)
+
+
+def _render_batch(jobs):
+    return [(report_filename(name), render_pdf(records)) for name, records in jobs]
+
+
+def render_reports(jobs, workers=None, batch_size=32):
+    """Yield ``(filename, pdf_bytes)`` for ``(candidate, records)`` jobs, in order.
+
+    With more than one worker and at least ``MIN_POOL_REPORTS`` jobs the
+    reports are rendered in a process pool, ``batch_size`` per task.
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    if workers <= 1 or len(jobs) < MIN_POOL_REPORTS:
+        for batch in batches:
+            yield from _render_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+        for rendered in pool.map(_render_batch, batches):
+            yield from rendered
+
+
+class _ChunkSink:
+    # Write-only, unseekable file object; zipfile then writes data descriptors
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_zip(reports, compression=zipfile.ZIP_DEFLATED):
+    """Stream a ZIP of ``(filename, data)`` pairs as byte chunks, one per file."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression) as archive:
+        for filename, data in reports:
+            archive.writestr(filename, data)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,69 @@
+"""Ranking helpers for matching one CV pool against several job descriptions.
+
+Both score sources produce an ``(n_cvs, n_jds)`` matrix in a single pass:
+:func:`matching.match_count_matrix` (phrase coverage, myapp.py) and
+:func:`scoring.score_matrix` (TF-IDF + embeddings, project.py). The
+functions here turn such a matrix into a ranked shortlist per role and a
+best-fit role per candidate.
+"""
+import numpy as np
+import pandas as pd
+
+
+def coverage_percent(match_counts, jd_phrase_lists):
+    # Matched phrase counts -> share of each JD's phrases covered, 0-100
+    sizes = np.array([len(phrases) for phrases in jd_phrase_lists], dtype=np.float64)
+    return np.round(np.divide(match_counts * 100.0, sizes, out=np.zeros(match_counts.shape), where=sizes > 0), 2)
+
+
+def _top_rows(column, top_k):
+    # Indices of the top_k highest scores, best first; ties keep input order
+    if top_k < len(column):
+        candidates = np.argpartition(-column, top_k - 1)[:top_k]
+        threshold = column[candidates].min()
+        candidates = np.nonzero(column >= threshold)[0]
+    else:
+        candidates = np.arange(len(column))
+    order = candidates[np.argsort(-column[candidates], kind="stable")]
+    return order[:top_k]
+
+
+def shortlists(scores, cv_names, jd_names, top_k=5):
+    """Top ``top_k`` candidates for every role as a long table.
+
+    Columns: ``Role``, ``Rank``, ``Candidate``, ``Score``.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    rows = []
+    for j, role in enumerate(jd_names):
+        for rank, i in enumerate(_top_rows(scores[:, j], top_k), start=1):
+            rows.append({"Role": role, "Rank": rank, "Candidate": cv_names[i], "Score": scores[i, j]})
+    return pd.DataFrame(rows, columns=["Role", "Rank", "Candidate", "Score"])
+
+
+def best_fit(scores, cv_names, jd_names):
+    """Best and runner-up role for every candidate, best candidates first."""
+    scores = np.asarray(scores, dtype=np.float64)
+    columns = ["Candidate", "Best-Fit Role", "Score", "Runner-Up Role", "Runner-Up Score"]
+    if scores.size == 0:
+        return pd.DataFrame(columns=columns)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    rows = np.arange(len(cv_names))
+    best = order[:, 0]
+    table = pd.DataFrame({
+        "Candidate": list(cv_names),
+        "Best-Fit Role": [jd_names[j] for j in best],
+        "Score": scores[rows, best],
+    })
+    if len(jd_names) > 1:
+        second = order[:, 1]
+        table["Runner-Up Role"] = [jd_names[j] for j in second]
+        table["Runner-Up Score"] = scores[rows, second]
+    else:
+        table["Runner-Up Role"], table["Runner-Up Score"] = None, np.nan
+    return table.sort_values("Score", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def score_table(scores, cv_names, jd_names):
+    """The full CV x role matrix as a DataFrame indexed by candidate."""
+    return pd.DataFrame(np.asarray(scores), index=list(cv_names), columns=list(jd_names))
@@ -0,0 +1,228 @@
+import logging
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+from contacts import extract_contacts
+import metrics
+from matching import JDMatcher
+from models import load_nlp
+from parse_cache import digest
+from pdf_extract import extract_pdf_text
+
+# Bump when extraction output changes so cached parses are not reused
+TEXT_VERSION = "pdf-extract-2"
+PHRASES_VERSION = "noun-chunks-1"
+
+logger = logging.getLogger(__name__)
+
+CV_EXTENSIONS = (".pdf", ".txt")
+
+BLOCKED_TERMS = {
+    "your resume", "job title", "required skills", "related field", "phd", "masters",
+    "collaborate", "responsibilities", "experience", "company", "location", "findings",
+    "engineering", "team", "stakeholders", "role", "job description", "technology", "organization"
+}
+
+
+@metrics.timed()
+def extract_text(name, data):
+    # Raises PdfQuarantined on unreadable or pathological PDFs so callers
+    # decide how to report it
+    if name.lower().endswith(".pdf"):
+        return extract_pdf_text(data, name)
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin1")
+
+
+def _doc_phrases(doc):
+    from spacy.lang.en.stop_words import STOP_WORDS
+    phrases = set()
+    for chunk in doc.noun_chunks:
+        phrase = re.sub(r"[^\w\s\-\+#\.]", "", chunk.text.strip())
+        if (
+            len(phrase.split()) <= 5
+            and not all(token in STOP_WORDS for token in phrase.split())
+        ):
+            phrases.add(phrase)
+    return list(phrases)
+
+
+@metrics.timed()
+def extract_clean_phrases(text):
+    return _doc_phrases(load_nlp()(text.lower()))
+
+
+@metrics.timed("extract_clean_phrases", items=lambda texts, *args, **kwargs: len(texts))
+def extract_phrases_bulk(texts, batch_size=32, n_process=1):
+    """Noun-chunk phrases for many texts via ``nlp.pipe``, in input order."""
+    docs = load_nlp().pipe((text.lower() for text in texts), batch_size=batch_size, n_process=n_process)
+    return [_doc_phrases(doc) for doc in docs]
+
+
+def filter_unwanted_terms(phrases):
+    return sorted(set(p for p in phrases if all(b not in p for b in BLOCKED_TERMS)))
+
+
+def extract_emails(text):
+    return extract_contacts(text)["emails"]
+
+
+def extract_phone_numbers(text):
+    return extract_contacts(text)["phones"]
+
+
+def build_result(name, cv_text, matched, missing):
+    contacts = extract_contacts(cv_text)
+    emails = contacts["emails"]
+    phone_present = "✔️" if contacts["phones"] else "❌"
+
+    return {
+        'Candidate': name,
+        'Email': ", ".join(emails) if emails else "No emails found.",
+        'Matched Skills': ", ".join(matched) if matched else "No matched skills found.",
+        'Missing Skills': ", ".join(missing) if missing else "No missing skills found.",
+        'Matched Count': len(matched),
+        'Phone Present': phone_present
+    }
+
+
+def jd_phrases_from_text(jd_text):
+    return filter_unwanted_terms(extract_clean_phrases(jd_text))
+
+
+# ---------- CV sources ----------
+
+def iter_cv_sources(path):
+    """Yield ``(name, read)`` pairs for every CV in a directory or zip file.
+
+    ``read`` is a zero-argument callable returning the file bytes, so only the
+    CVs of the chunk currently being processed are held in memory.
+    """
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.lower().endswith(CV_EXTENSIONS):
+                    full_path = os.path.join(root, file_name)
+                    name = os.path.relpath(full_path, path).replace(os.sep, "/")
+                    yield name, _file_reader(full_path)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                if not info.is_dir() and info.filename.lower().endswith(CV_EXTENSIONS):
+                    yield info.filename, _zip_reader(archive, info)
+    else:
+        raise ValueError(f"{path} is neither a directory nor a zip file")
+
+
+def _file_reader(path):
+    def read():
+        with open(path, "rb") as f:
+            return f.read()
+    return read
+
+
+def _zip_reader(archive, info):
+    return lambda: archive.read(info)
+
+
+def cached_text(name, data, cache, key=None):
+    """:func:`extract_text` through the parse cache, shared by all three apps.
+
+    Failures raise instead of being stored, so a transient one (e.g. a
+    timeout under load) is retried on the next read.
+    """
+    return cache.get_or_compute("text", TEXT_VERSION, key or digest(data), lambda: extract_text(name, data))
+
+
+def _read_text(name, data, cache=None, key=None):
+    # None when the document can't be read, so nothing derived from it is cached
+    try:
+        return extract_text(name, data) if cache is None else cached_text(name, data, cache, key)
+    except Exception as e:
+        logger.warning("Could not read %s: %s", name, e)
+        return None
+
+
+def parse_document(name, data, cache=None):
+    return _parse_batch([(name, data)], cache=cache)[0]
+
+
+def _parse_batch(documents, batch_size=32, cache=None):
+    if cache is None:
+        texts = [_read_text(name, data) or "" for name, data in documents]
+        phrases = extract_phrases_bulk(texts, batch_size=batch_size)
+        return [(text, filter_unwanted_terms(p)) for text, p in zip(texts, phrases)]
+
+    keys = [digest(data) for _, data in documents]
+    texts = [_read_text(name, data, cache, key) for key, (name, data) in zip(keys, documents)]
+    unread = {i for i, text in enumerate(texts) if text is None}
+    texts = [text or "" for text in texts]
+    phrases = [None if i in unread else cache.get("phrases", PHRASES_VERSION, key) for i, key in enumerate(keys)]
+    todo = [i for i, p in enumerate(phrases) if p is None]
+    for i, raw in zip(todo, extract_phrases_bulk([texts[i] for i in todo], batch_size=batch_size)):
+        phrases[i] = filter_unwanted_terms(raw)
+        if i not in unread:
+            cache.put("phrases", PHRASES_VERSION, keys[i], phrases[i])
+    return list(zip(texts, phrases))
+
+
+def _init_worker():
+    # Load spaCy once per worker process instead of once per task
+    load_nlp()
+
+
+def make_pool(workers):
+    """Process pool whose workers have ``en_core_web_sm`` preloaded.
+
+    Returns ``None`` for ``workers`` <= 1, meaning "parse in this process".
+    """
+    if not workers or workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def parse_many(documents, pool=None, chunksize=4, batch_size=32, cache=None):
+    """Parse ``(name, data)`` pairs into ``(text, phrases)``, in input order.
+
+    Each task is a list of ``chunksize`` documents run through ``nlp.pipe``.
+    With a :class:`parse_cache.ParseCache`, documents whose bytes were
+    parsed before (by any process) skip PDF extraction and spaCy.
+    """
+    documents = list(documents)
+    if pool is None:
+        return _parse_batch(documents, batch_size, cache)
+    batches = [documents[i:i + chunksize] for i in range(0, len(documents), chunksize)]
+    n = len(batches)
+    parsed = pool.map(_parse_batch, batches, [batch_size] * n, [cache] * n)
+    return [item for batch in parsed for item in batch]
+
+
+def iter_results(sources, jd_phrases, threshold=0.5, chunk_size=64, skip=(), workers=1, cache=None):
+    """Stream one result row per CV, matching ``chunk_size`` CVs at a time.
+
+    ``sources`` is an iterable of ``(name, read)`` pairs as produced by
+    :func:`iter_cv_sources`; names in ``skip`` are not processed again.
+    With ``workers`` > 1 parsing and spaCy run in a process pool; matching
+    stays in this process, so the rows are identical to a serial run.
+    """
+    matcher = JDMatcher(jd_phrases, threshold)
+    skip = set(skip)
+    pending = ((name, read) for name, read in sources if name not in skip)
+    pool = make_pool(workers)
+    chunksize = max(1, chunk_size // (4 * workers)) if pool else chunk_size
+    with pool or nullcontext():
+        while True:
+            chunk = [(name, read()) for name, read in islice(pending, chunk_size)]
+            if not chunk:
+                break
+            parsed = parse_many(chunk, pool, chunksize, cache=cache)
+            matches = matcher.match_many([phrases for _, phrases in parsed])
+            for (name, _), (cv_text, _), (matched, missing) in zip(chunk, parsed, matches):
+                yield build_result(name, cv_text, matched, missing)
@@ -0,0 +1,206 @@
+from functools import lru_cache
+
+import numpy as np
+
+import metrics
+
+
+@lru_cache(maxsize=None)
+def _analyzer():
+    # Same tokenisation as the per-CV TfidfVectorizer used by the original
+    # matcher; sklearn is imported on first match, not at app startup
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer().build_analyzer()
+
+
+def _counter():
+    from sklearn.feature_extraction.text import CountVectorizer
+    return CountVectorizer(analyzer=_analyzer())
+
+
+class JDMatcher:
+    """Batched TF-IDF phrase matcher for one job description.
+
+    Gives the same matched/missing split as fitting a ``TfidfVectorizer`` on
+    ``cv_phrases + jd_phrases`` for every CV, but the JD side is tokenised
+    once and every CV in a chunk is scored with a single sparse product
+    followed by a row-wise max per CV.
+    """
+
+    def __init__(self, jd_phrases, threshold=0.5, chunk_rows=20000):
+        self.jd_phrases = [str(p) for p in jd_phrases]
+        self.threshold = threshold
+        self.chunk_rows = chunk_rows
+
+        counter = _counter()
+        try:
+            self._jd_counts = counter.fit_transform(self.jd_phrases).tocsr().astype(np.float64)
+            self._jd_vocab = counter.vocabulary_
+        except ValueError:
+            # No usable tokens in the JD: nothing can ever match
+            self._jd_counts = None
+            self._jd_vocab = {}
+        if self._jd_counts is not None:
+            self._jd_df = np.asarray((self._jd_counts > 0).sum(axis=0)).ravel()
+            self._jd_counts_sq = self._jd_counts.multiply(self._jd_counts).tocsr()
+
+    def match(self, cv_phrases):
+        return self.match_many([cv_phrases])[0]
+
+    @metrics.timed("tfidf_match", items=lambda self, cv_phrase_lists: len(cv_phrase_lists))
+    def match_many(self, cv_phrase_lists):
+        return list(self.iter_match(cv_phrase_lists))
+
+    def iter_match(self, cv_phrase_lists):
+        # Yields (matched, missing) per CV, in input order
+        for chunk in _chunks(cv_phrase_lists, self.chunk_rows):
+            yield from self._match_chunk(chunk)
+
+    def _split(self, mask):
+        matched = [p for p, ok in zip(self.jd_phrases, mask) if ok]
+        missing = [p for p, ok in zip(self.jd_phrases, mask) if not ok]
+        return matched, missing
+
+    def _match_chunk(self, chunk):
+        if not self.jd_phrases:
+            return [([], []) for _ in chunk]
+        tokens = _ChunkTokens(chunk)
+        matched_mask = self._matched_mask(tokens)
+        results = [([], list(self.jd_phrases)) for _ in chunk]
+        if matched_mask is not None:
+            for col, i in enumerate(tokens.non_empty):
+                results[i] = self._split(matched_mask[:, col])
+        return results
+
+    def _matched_mask(self, tokens):
+        # (JD phrases x non-empty CVs) boolean mask, or None when nothing can match
+        if self._jd_counts is None or tokens.counts is None:
+            return None
+        counts, vocab, cv_df = tokens.counts, tokens.vocab, tokens.cv_df
+        sizes, offsets, groups = tokens.sizes, tokens.offsets, tokens.groups
+
+        # JD term index -> chunk vocabulary column (-1 when the chunk lacks it)
+        jd_to_chunk = np.full(len(self._jd_vocab), -1)
+        for term, j in self._jd_vocab.items():
+            jd_to_chunk[j] = vocab.get(term, -1)
+        chunk_to_jd = np.full(len(vocab), -1)
+        present = jd_to_chunk >= 0
+        chunk_to_jd[jd_to_chunk[present]] = np.nonzero(present)[0]
+        jd_df_chunk = np.zeros(len(vocab))
+        jd_df_chunk[jd_to_chunk[present]] = self._jd_df[present]
+
+        import scipy.sparse as sp
+
+        # Smooth IDF of each CV's own corpus (its phrases plus the JD phrases)
+        n_docs = sizes + len(self.jd_phrases)
+        df = tokens.term_cv_df + jd_df_chunk[counts.col]
+        idf = np.log((1 + n_docs[groups]) / (1 + df)) + 1
+        weights = counts.data * idf
+        row_norm = np.sqrt(np.bincount(counts.row, weights=weights ** 2, minlength=tokens.n_phrases))
+
+        # Only terms shared with the JD contribute to the dot product
+        keep = chunk_to_jd[counts.col] >= 0
+        rows = counts.row[keep]
+        values = weights[keep] * idf[keep] / row_norm[rows]
+        cv_mat = sp.csr_matrix(
+            (values, (rows, chunk_to_jd[counts.col[keep]])),
+            shape=(tokens.n_phrases, len(self._jd_vocab)),
+        )
+        raw = (self._jd_counts @ cv_mat.T).toarray()
+        best = np.maximum.reduceat(raw, offsets, axis=1)
+
+        # JD phrase norms under each CV's IDF
+        jd_cv_df = np.zeros((len(sizes), len(self._jd_vocab)))
+        if present.any():
+            jd_cv_df[:, present] = cv_df[:, jd_to_chunk[present]].toarray()
+        jd_idf = np.log((1 + n_docs[:, None]) / (1 + self._jd_df[None, :] + jd_cv_df)) + 1
+        jd_norm = np.sqrt(np.asarray(self._jd_counts_sq @ (jd_idf ** 2).T))
+
+        sims = np.divide(best, jd_norm, out=np.zeros_like(best), where=jd_norm > 0)
+        # Exact ties (e.g. one shared token out of two) land on the threshold;
+        # round away float noise so they count as matches
+        return np.round(sims, 12) >= self.threshold
+
+
+class _ChunkTokens:
+    """The JD-independent half of matching a chunk of CVs: token counts per phrase.
+
+    Built once per chunk and reused by every :class:`JDMatcher` scoring it.
+    ``counts`` is None when no CV phrase in the chunk has a token.
+    """
+
+    def __init__(self, chunk):
+        self.non_empty = [i for i, phrases in enumerate(chunk) if phrases]
+        self.counts = None
+        if not self.non_empty:
+            return
+        flat = [p for i in self.non_empty for p in chunk[i]]
+        self.n_phrases = len(flat)
+        self.sizes = np.array([len(chunk[i]) for i in self.non_empty])
+        self.offsets = np.concatenate(([0], np.cumsum(self.sizes)[:-1]))
+        row_group = np.repeat(np.arange(len(self.non_empty)), self.sizes)
+
+        counter = _counter()
+        try:
+            counts = counter.fit_transform(flat).tocoo()
+        except ValueError:
+            # CV phrases carry no tokens, so every CV vector is zero
+            return
+        self.counts, self.vocab = counts, counter.vocabulary_
+
+        import scipy.sparse as sp
+
+        # Per-CV document frequency: how many phrases of each CV contain a term
+        self.groups = row_group[counts.row]
+        self.cv_df = sp.coo_matrix(
+            (np.ones_like(counts.data, dtype=np.float64), (self.groups, counts.col)),
+            shape=(len(self.non_empty), len(self.vocab)),
+        ).tocsr()
+        self.cv_df.sum_duplicates()
+        self.term_cv_df = np.asarray(self.cv_df[self.groups, counts.col]).ravel()
+
+
+def _chunks(cv_phrase_lists, chunk_rows):
+    chunk, rows = [], 0
+    for phrases in cv_phrase_lists:
+        phrases = [str(p) for p in phrases]
+        chunk.append(phrases)
+        rows += len(phrases)
+        if rows >= chunk_rows:
+            yield chunk
+            chunk, rows = [], 0
+    if chunk:
+        yield chunk
+
+
+def match_count_matrix(cv_phrase_lists, jd_phrase_lists, threshold=0.5, chunk_rows=20000):
+    """Matched JD-phrase counts for every CV x JD pair, as an ``(n_cvs, n_jds)`` array.
+
+    Entry ``[i, j]`` is ``len(tfidf_match(cvs[i], jds[j])[0])``. Each chunk
+    of CVs is tokenised once and then scored against every JD.
+    """
+    cv_phrase_lists = list(cv_phrase_lists)
+    matchers = [JDMatcher(phrases, threshold) for phrases in jd_phrase_lists]
+    counts = np.zeros((len(cv_phrase_lists), len(matchers)), dtype=np.int64)
+    start = 0
+    for chunk in _chunks(cv_phrase_lists, chunk_rows):
+        tokens = _ChunkTokens(chunk)
+        rows = start + np.array(tokens.non_empty, dtype=np.int64)
+        for j, matcher in enumerate(matchers):
+            if not matcher.jd_phrases:
+                continue
+            mask = matcher._matched_mask(tokens)
+            if mask is not None:
+                counts[rows, j] = mask.sum(axis=0)
+        start += len(chunk)
+    return counts
+
+
+def tfidf_match(source_phrases, target_phrases, threshold=0.5):
+    if not source_phrases or not target_phrases:
+        return [], target_phrases
+    return JDMatcher(target_phrases, threshold).match(source_phrases)
+
+
+def tfidf_match_many(cv_phrase_lists, jd_phrases, threshold=0.5):
+    return JDMatcher(jd_phrases, threshold).match_many(cv_phrase_lists)
@@ -0,0 +1,270 @@
+"""Process-wide stage timings, counters and gauges for the apps.
+
+Stage functions are wrapped with :func:`timed` (or a block with
+:func:`stage`); each call costs two ``perf_counter`` reads and a lock-free
+append. Everything lives in this process: work done inside a process pool's
+workers is only seen through the calls that submit it.
+
+Read it back with :func:`summary` (the sidebar panel), :func:`to_json` or
+:func:`to_prometheus`; ``METRICS_PORT=9108`` makes :func:`serve_from_env`
+expose ``/metrics`` and ``/metrics.json`` over HTTP for scraping, on
+localhost unless ``METRICS_HOST`` (e.g. ``0.0.0.0``) says otherwise.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+PREFIX = "cv_app"
+# Upper bounds in seconds of the stage latency histogram, Prometheus style
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, float("inf"))
+# Recorded timings are aggregated in batches of this many (or whenever they are read)
+FOLD_EVERY = 1024
+
+_lock = threading.Lock()
+_pending = deque()
+_stages = {}
+_counters = {}
+_gauges = {}
+_started = time.time()
+_server = None
+
+
+class _Stage:
+    __slots__ = ("calls", "items", "errors", "seconds", "max_seconds", "buckets")
+
+    def __init__(self):
+        self.calls = self.items = self.errors = 0
+        self.seconds = self.max_seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+
+def record(name, seconds, items=1, error=False):
+    # deque.append is atomic, so the hot path takes no lock; readers fold the backlog in
+    _pending.append((name, seconds, items, error))
+    if len(_pending) >= FOLD_EVERY:
+        _fold()
+
+
+def _fold():
+    with _lock:
+        while _pending:
+            name, seconds, items, error = _pending.popleft()
+            stage = _stages.get(name)
+            if stage is None:
+                stage = _stages[name] = _Stage()
+            stage.calls += 1
+            stage.items += items
+            stage.errors += error
+            stage.seconds += seconds
+            if seconds > stage.max_seconds:
+                stage.max_seconds = seconds
+            stage.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+
+def _count_items(items, args, kwargs):
+    if items is None:
+        return 1
+    try:
+        return items(*args, **kwargs)
+    except TypeError:  # e.g. a generator argument has no len()
+        return 1
+
+
+def timed(name=None, items=None):
+    """Decorator timing every call under ``name`` (default: the function's name).
+
+    For batched functions ``items(*args, **kwargs)`` says how many items
+    one call handles, e.g. ``items=lambda texts, *a, **k: len(texts)``.
+    """
+    def decorate(fn):
+        stage_name = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            n = _count_items(items, args, kwargs)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                record(stage_name, time.perf_counter() - start, n, error=True)
+                raise
+            record(stage_name, time.perf_counter() - start, n)
+            return result
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def stage(name, items=1):
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        record(name, time.perf_counter() - start, items, error=True)
+        raise
+    record(name, time.perf_counter() - start, items)
+
+
+def count(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    """``value`` is a number or a zero-argument callable read at export time (e.g. a queue's depth)."""
+    with _lock:
+        _gauges[(name, tuple(sorted(labels.items())))] = value
+
+
+def reset():
+    global _started
+    with _lock:
+        _pending.clear()
+        _stages.clear()
+        _counters.clear()
+        _started = time.time()
+
+
+def _gauge_values():
+    with _lock:
+        gauges = dict(_gauges)
+    values = {}
+    for key, value in gauges.items():
+        try:
+            values[key] = float(value() if callable(value) else value)
+        except Exception:
+            continue  # a gauge whose source is gone isn't worth failing an export
+    return values
+
+
+def snapshot():
+    _fold()
+    with _lock:
+        stages = {
+            name: {
+                "calls": s.calls, "items": s.items, "errors": s.errors,
+                "seconds": s.seconds, "max_seconds": s.max_seconds,
+                "buckets": dict(zip(map(str, BUCKETS), s.buckets)),
+            }
+            for name, s in _stages.items()
+        }
+        counters = [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in _counters.items()]
+    gauges = [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in _gauge_values().items()]
+    return {"uptime_seconds": time.time() - _started, "stages": stages, "counters": counters, "gauges": gauges}
+
+
+def summary():
+    """One row per stage for display, slowest total first."""
+    stages = snapshot()["stages"]
+    total = sum(s["seconds"] for s in stages.values()) or 1.0
+    rows = [
+        {
+            "Stage": name, "Calls": s["calls"], "Items": s["items"], "Errors": s["errors"],
+            "Total s": round(s["seconds"], 3), "Mean ms": round(s["seconds"] / s["calls"] * 1000, 2),
+            "Max ms": round(s["max_seconds"] * 1000, 2), "% of Time": round(s["seconds"] / total * 100, 1),
+        }
+        for name, s in stages.items()
+    ]
+    return sorted(rows, key=lambda row: -row["Total s"])
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")  # noqa: E731
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+
+def to_prometheus():
+    """Prometheus text exposition format (0.0.4)."""
+    data = snapshot()
+    lines = [
+        f"# HELP {PREFIX}_stage_seconds Time spent in each pipeline stage.",
+        f"# TYPE {PREFIX}_stage_seconds histogram",
+    ]
+    for name, s in sorted(data["stages"].items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS, s["buckets"].values()):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{name}"}} {s["seconds"]!r}')
+        lines.append(f'{PREFIX}_stage_seconds_count{{stage="{name}"}} {s["calls"]}')
+    for metric, field in (("stage_items_total", "items"), ("stage_errors_total", "errors")):
+        lines.append(f"# TYPE {PREFIX}_{metric} counter")
+        lines.extend(f'{PREFIX}_{metric}{{stage="{name}"}} {s[field]}' for name, s in sorted(data["stages"].items()))
+    for kind, entries, suffix in (("counter", data["counters"], "_total"), ("gauge", data["gauges"], "")):
+        for name in sorted({entry["name"] for entry in entries}):
+            lines.append(f"# TYPE {PREFIX}_{name}{suffix} {kind}")
+            lines.extend(
+                f"{PREFIX}_{name}{suffix}{_labels(sorted(entry['labels'].items()))} {entry['value']!r}"
+                for entry in entries if entry["name"] == name
+            )
+    lines.append(f"{PREFIX}_uptime_seconds {data['uptime_seconds']!r}")
+    return "\n".join(lines) + "\n"
+
+
+def render_panel(container):
+    """Stage table, counters/gauges and export downloads into a Streamlit container (e.g. a sidebar expander)."""
+    import pandas as pd
+    rows = summary()
+    if not rows:
+        container.caption("No stages timed yet in this server process.")
+        return
+    container.dataframe(pd.DataFrame(rows), hide_index=True)
+    data = snapshot()
+    for entry in data["counters"] + data["gauges"]:
+        labels = ", ".join(f"{k}={v}" for k, v in sorted(entry["labels"].items()))
+        container.caption(f"{entry['name']}{f' ({labels})' if labels else ''}: {entry['value']:g}")
+    container.download_button("⬇️ Prometheus metrics", to_prometheus(), "metrics.prom", "text/plain")
+    container.download_button("⬇️ JSON metrics", to_json(), "metrics.json", "application/json")
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve ``/metrics`` and ``/metrics.json`` from a daemon thread, once per process."""
+    global _server
+    if _server is not None:
+        return _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") == "/metrics.json":
+                body, content_type = to_json(), "application/json"
+            elif self.path.rstrip("/") in ("/metrics", ""):
+                body, content_type = to_prometheus(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    _server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
+
+
+def serve_from_env():
+    port = os.getenv("METRICS_PORT")
+    if port:
+        try:
+            serve(int(port), os.getenv("METRICS_HOST", "127.0.0.1"))
+        except OSError:
+            pass  # another app in this process (or another process) already has the port
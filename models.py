@@ -0,0 +1,101 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Components noun_chunks depends on: POS tags (tagger + attribute_ruler) and
+# the dependency parse. NER and the lemmatizer are never used by the apps.
+NOUN_CHUNK_PIPES = ("tok2vec", "tagger", "attribute_ruler", "parser")
+
+
+@lru_cache(maxsize=None)
+def load_nlp():
+    import spacy
+    nlp = spacy.load(SPACY_MODEL)
+    nlp.select_pipes(enable=[name for name in nlp.pipe_names if name in NOUN_CHUNK_PIPES])
+    return nlp
+
+
+BERT_MODEL = "all-MiniLM-L6-v2"
+ENCODER_BACKENDS = ("torch", "torch-int8", "onnx")
+ONNX_DIR = ".onnx_models"
+
+
+@lru_cache(maxsize=None)
+def load_bert(model_name=BERT_MODEL, backend="torch"):
+    """Sentence encoder for ``model_name`` on CPU.
+
+    ``backend`` picks the inference path: ``"torch"`` (the stock
+    SentenceTransformer), ``"torch-int8"`` (Linear layers dynamically
+    quantized to int8) or ``"onnx"`` (onnxruntime on a locally exported
+    graph). All three expose ``encode(texts, batch_size=...)``.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}; use one of {ENCODER_BACKENDS}")
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device="cpu")
+    if backend == "torch-int8":
+        import torch
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return OnnxEncoder(model, export_onnx(model, model_name))
+    return model
+
+
+def export_onnx(model, model_name=BERT_MODEL, onnx_dir=ONNX_DIR):
+    # Exports the transformer body once; pooling and normalisation stay in numpy
+    import torch
+    path = os.path.join(onnx_dir, model_name.replace("/", "_") + ".onnx")
+    if os.path.exists(path):
+        return path
+    os.makedirs(onnx_dir, exist_ok=True)
+    transformer = model[0].auto_model.eval()
+    dummy = model.tokenizer(["export"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(dummy[name] for name in names), tmp_path,
+            input_names=names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic, opset_version=14,
+        )
+    os.replace(tmp_path, path)
+    return path
+
+
+class OnnxEncoder:
+    """onnxruntime stand-in for ``SentenceTransformer.encode``.
+
+    Reuses the model's tokenizer and max length, then applies the same
+    mean pooling (and normalisation, when the model has it) in numpy.
+    """
+
+    def __init__(self, model, onnx_path):
+        import onnxruntime
+        self.tokenizer = model.tokenizer
+        self.max_seq_length = model.max_seq_length
+        self.normalize = any(type(module).__name__ == "Normalize" for module in model)
+        self.session = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                list(texts[start:start + batch_size]), padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np",
+            )
+            inputs = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, inputs)[0]
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(batches)
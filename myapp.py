@@ -1,130 +1,142 @@
+import os
 import pandas as pd
-import plotly.express as px
-import re
-import spacy
-import pdfplumber
-from io import StringIO
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+import analytics
+import cross_match
+import engine
+import matching
+import metrics
+import parse_cache
+import skill_search
 
 # Set the page config at the very top
 st.set_page_config(page_title="TF-IDF Skill Matcher", layout="wide")
+metrics.serve_from_env()
 
-# Load SpaCy model
-@st.cache_resource
-def load_spacy_model():
-    return spacy.load("en_core_web_sm")
-
-nlp = load_spacy_model()
-
+# spaCy and the TF-IDF code load on first use (see models.load_nlp), not at startup
 @st.cache_data
 def extract_clean_phrases(text):
-    doc = nlp(text.lower())
-    phrases = set()
-    for chunk in doc.noun_chunks:
-        phrase = re.sub(r"[^\w\s\-\+#\.]", "", chunk.text.strip())
-        if (
-            len(phrase.split()) <= 5
-            and not all(token in spacy.lang.en.stop_words.STOP_WORDS for token in phrase.split())
-        ):
-            phrases.add(phrase)
-    return list(phrases)
+    return engine.extract_clean_phrases(text)
 
 def filter_unwanted_terms(phrases):
-    blocked_terms = {
-        "your resume", "job title", "required skills", "related field", "phd", "masters",
-        "collaborate", "responsibilities", "experience", "company", "location", "findings",
-        "engineering", "team", "stakeholders", "role", "job description", "technology", "organization"
-    }
-    return sorted(set(p for p in phrases if all(b not in p for b in blocked_terms)))
+    return engine.filter_unwanted_terms(phrases)
 
 @st.cache_data
 def tfidf_match(source_phrases, target_phrases, threshold=0.5):
-    if not source_phrases or not target_phrases:
-        return [], target_phrases
-
-    source_phrases = [str(p) for p in source_phrases]
-    target_phrases = [str(p) for p in target_phrases]
-
-    vectorizer = TfidfVectorizer().fit(source_phrases + target_phrases)
-    source_vecs = vectorizer.transform(source_phrases)
-    matched, missing = [], []
-    for phrase in target_phrases:
-        phrase_vec = vectorizer.transform([phrase])
-        cos_sim = cosine_similarity(phrase_vec, source_vecs)
-        if cos_sim.max() >= threshold:
-            matched.append(phrase)
-        else:
-            missing.append(phrase)
-    return matched, missing
+    return matching.tfidf_match(source_phrases, target_phrases, threshold)
+
+@st.cache_resource
+def get_parse_cache():
+    return parse_cache.get_cache()
 
-@st.cache_data
 def extract_text(file):
-    if file.name.endswith(".pdf"):
-        try:
-            text = ""
-            with pdfplumber.open(file) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text
-        except Exception as e:
-            st.error(f"❌ Error reading PDF: {e}")
-            return ""
-    else:
-        try:
-            return StringIO(file.getvalue().decode("utf-8")).read()
-        except UnicodeDecodeError:
-            return StringIO(file.getvalue().decode("latin1")).read()
+    # Persistent across restarts and sessions, keyed by the file's bytes; failures are retried next time
+    try:
+        return engine.cached_text(file.name, file.getvalue(), get_parse_cache())
+    except Exception as e:
+        st.error(f"❌ Error reading PDF: {e}")
+        return ""
 
 def extract_emails(text):
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    return re.findall(email_pattern, text)
+    return engine.extract_emails(text)
 
 def extract_phone_numbers(text):
-    phone_pattern = r'\(?\+?[0-9]*\)?[0-9_\- \(\)]*'
-    return re.findall(phone_pattern, text)
+    return engine.extract_phone_numbers(text)
 
 def send_email_quick_silent(email, subject, message):
     pass
 
+def parse_cv(cv_file):
+    return engine.parse_document(cv_file.name, cv_file.getvalue(), cache=get_parse_cache())
+
+def build_result(cv_file, cv_text, matched, missing):
+    result = engine.build_result(cv_file.name, cv_text, matched, missing)
+    # The joined strings are for display/export; filters use the list
+    result['Matched Skill List'] = list(matched)
+    result['Missing Skill List'] = list(missing)
+    return result
+
 def process_cv(cv_file, jd_phrases):
-    cv_text = extract_text(cv_file)
-    cv_phrases_raw = extract_clean_phrases(cv_text)
-    cv_phrases = filter_unwanted_terms(cv_phrases_raw)
-    emails = extract_emails(cv_text)
-    phone_numbers = extract_phone_numbers(cv_text)
+    cv_text, cv_phrases = parse_cv(cv_file)
     if not cv_phrases:
         matched, missing = [], jd_phrases
     else:
         matched, missing = tfidf_match(cv_phrases, jd_phrases)
-    
-    phone_present = "✔️" if phone_numbers else "❌"
-
-    return {
-        'Candidate': cv_file.name,
-        'Email': ", ".join(emails) if emails else "No emails found.",
-        'Matched Skills': ", ".join(matched) if matched else "No matched skills found.",
-        'Missing Skills': ", ".join(missing) if missing else "No missing skills found.",
-        'Matched Count': len(matched),
-        'Phone Present': phone_present
-    }
+    return build_result(cv_file, cv_text, matched, missing)
 
+@st.cache_resource
+def get_parse_pool(workers):
+    return engine.make_pool(workers)
+
+def parse_cvs(cv_files, workers=1):
+    if workers > 1:
+        documents = [(cv_file.name, cv_file.getvalue()) for cv_file in cv_files]
+        return engine.parse_many(documents, get_parse_pool(workers), cache=get_parse_cache())
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(parse_cv, cv_files))
+
+def process_cvs(cv_files, jd_phrases, workers=1):
+    # Parse in parallel, then match every CV against the JD in one batched pass
+    parsed = parse_cvs(cv_files, workers)
+    matches = matching.tfidf_match_many([phrases for _, phrases in parsed], jd_phrases)
+    return [
+        build_result(cv_file, cv_text, matched, missing)
+        for cv_file, (cv_text, _), (matched, missing) in zip(cv_files, parsed, matches)
+    ]
+
+@st.cache_resource(max_entries=4)
+def get_skill_coverage_index(_skill_lists, key):
+    # key identifies the CV set + JD; the lists themselves aren't hashed on every rerun
+    return skill_search.SkillCoverageIndex(_skill_lists)
+
+def get_dashboard_analytics(jd_key):
+    # Per session and JD, so users don't see each other's CVs; a new JD drops the old run
+    runs = st.session_state.setdefault("dashboard_analytics", {})
+    if jd_key not in runs:
+        runs.clear()
+        runs[jd_key] = analytics.SkillAnalytics({"matched": "Matched Skill List", "missing": "Missing Skill List"})
+    return runs[jd_key]
+
+def display_cross_jd_matching(cv_files, jd_files, workers=1):
+    # Every CV and JD is parsed once; all CV x JD pairs are scored together
+    parsed = parse_cvs(cv_files, workers)
+    jd_names = [jd_file.name for jd_file in jd_files]
+    jd_phrase_lists = [filter_unwanted_terms(extract_clean_phrases(extract_text(jd_file))) for jd_file in jd_files]
+    cv_names = [cv_file.name for cv_file in cv_files]
+    counts = matching.match_count_matrix([phrases for _, phrases in parsed], jd_phrase_lists)
+    coverage = cross_match.coverage_percent(counts, jd_phrase_lists)
+
+    st.subheader("🧭 Cross-JD Matching (% of each JD's skills covered)")
+    st.dataframe(cross_match.score_table(coverage, cv_names, jd_names).style.format("{:.1f}").background_gradient(axis=None))
+
+    st.subheader("🏅 Best-Fit Role per Candidate")
+    st.dataframe(cross_match.best_fit(coverage, cv_names, jd_names))
+
+    st.subheader("📋 Shortlist per Role")
+    top_k = st.slider("🎯 Candidates per role", min_value=1, max_value=len(cv_names), value=min(5, len(cv_names)))
+    shortlist = cross_match.shortlists(coverage, cv_names, jd_names, top_k)
+    for role, rows in shortlist.groupby("Role", sort=False):
+        with st.expander(f"💼 {role}"):
+            st.dataframe(rows[["Rank", "Candidate", "Score"]].reset_index(drop=True))
+    st.download_button("Download Shortlists", shortlist.to_csv(index=False), "shortlists.csv", "text/csv")
 
 st.title("🧠 Smart-Sync-QuickHire")
 
+st.sidebar.subheader("⚙️ Processing")
+parse_workers = st.sidebar.number_input("Parsing worker processes (1 = threads)", min_value=1, max_value=os.cpu_count() or 1, value=1)
+
 col1, col2 = st.columns(2)
 with col1:
     cv_files = st.file_uploader("📄 Upload CVs (PDF or TXT)", type=["pdf", "txt"], accept_multiple_files=True)
 with col2:
-    jd_file = st.file_uploader("💼 Upload Job Description (PDF or TXT)", type=["pdf", "txt"])
+    jd_files = st.file_uploader("💼 Upload Job Description(s) (PDF or TXT)", type=["pdf", "txt"], accept_multiple_files=True)
+# One JD: the detailed single-role view below; several: cross-JD matching
+jd_file = jd_files[0] if len(jd_files or []) == 1 else None
+
+if cv_files and jd_files and len(jd_files) > 1:
+    with st.spinner("🔍 Matching every CV against every job description ..."):
+        display_cross_jd_matching(cv_files, jd_files, int(parse_workers))
 
 if cv_files and jd_file:
     with st.spinner("🔍 Matching skills ..."):
@@ -132,11 +144,17 @@ if cv_files and jd_file:
         jd_phrases_raw = extract_clean_phrases(jd_text)
         jd_phrases = filter_unwanted_terms(jd_phrases_raw)
 
-        with ThreadPoolExecutor() as executor:
-            results = list(executor.map(lambda cv_file: process_cv(cv_file, jd_phrases), cv_files))
+        results = process_cvs(cv_files, jd_phrases, int(parse_workers))
+        cache_stats = get_parse_cache().stats()
+        st.sidebar.caption(
+            f"🗄️ Parse cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+            f"· {cache_stats['entries']} entries"
+        )
 
         df = pd.DataFrame(results)
         df_sorted = df.sort_values(by='Matched Count', ascending=False).reset_index(drop=True)
+        skill_stats = get_dashboard_analytics(parse_cache.digest(jd_text.encode("utf-8")))
+        skill_stats.update(results)
 
         st.subheader("📊 Candidate Skill Match Results")
         st.dataframe(df_sorted[['Candidate', 'Email', 'Matched Skills', 'Missing Skills', 'Matched Count', 'Phone Present']])
@@ -193,59 +211,42 @@ if cv_files and jd_file:
             st.write(f"Total Rejected Candidates: {total_rejected}")
             st.write(f"Overall Matching Rate: {overall_matching_rate:.2f}%")
 
-        def display_top_skills(df):
-            all_skills = " ".join(df['Matched Skills'].dropna())
-            all_skills_list = all_skills.split(', ')
-            skill_counts = pd.Series(all_skills_list).value_counts().head(5)
-
+        def display_top_skills(stats):
             st.subheader("🛠️ Top 5 Most Common Skills")
-            st.bar_chart(skill_counts)
-
-        def display_missing_skills(df):
-            all_missing_skills = " ".join(df['Missing Skills'].dropna())
-            missing_skills_list = all_missing_skills.split(', ')
-            missing_skill_counts = pd.Series(missing_skills_list).value_counts().head(5)
+            st.bar_chart(stats.top("matched", 5))
 
+        def display_missing_skills(stats):
             st.subheader("❌ Top 5 Missing Skills")
-            st.bar_chart(missing_skill_counts)
-
-        def display_skill_gap_analysis(df):
-            skill_gap = df[['Candidate', 'Matched Skills', 'Missing Skills']]
-            skill_gap = skill_gap.explode('Missing Skills').dropna(subset=['Missing Skills'])
-            skill_gap_counts = skill_gap['Missing Skills'].value_counts()
+            st.bar_chart(stats.top("missing", 5))
 
+        def display_skill_gap_analysis(stats):
             st.subheader("🔎 Skill Gap Analysis")
-            st.write("This section shows the skill gaps across candidates.")
-            st.bar_chart(skill_gap_counts)
+            st.write("This section shows the skill gaps across candidates (% of CVs missing each JD skill).")
+            st.bar_chart(stats.coverage("missing"))
 
         def display_candidate_performance(df):
+            import plotly.express as px
             fig = px.bar(df, x="Candidate", y="Matched Count", title="Candidate Performance Insights")
             st.plotly_chart(fig)
 
         if st.button("📊 Show Dashboard"):
             display_overall_summary(df_sorted)
-            display_top_skills(df_sorted)
-            display_missing_skills(df_sorted)
-            display_skill_gap_analysis(df_sorted)
+            display_top_skills(skill_stats)
+            display_missing_skills(skill_stats)
+            display_skill_gap_analysis(skill_stats)
             display_candidate_performance(df_sorted)
 
         st.subheader("🔍 Skill Coverage Search")
-        available_skills = sorted(set(", ".join(df_sorted["Matched Skills"]).split(", ")))
-        selected_skills = st.multiselect("✅ Select Skills to Filter Candidates", options=available_skills)
+        coverage_key = parse_cache.digest("\n".join(df_sorted['Candidate'] + "\t" + df_sorted['Matched Skills']).encode("utf-8"))
+        coverage_index = get_skill_coverage_index(df_sorted['Matched Skill List'].tolist(), coverage_key)
+        selected_skills = st.multiselect("✅ Select Skills to Filter Candidates", options=coverage_index.skills)
 
         if selected_skills:
-            def has_all_skills(row_skills):
-                row_skill_set = set(row_skills.split(", "))
-                return all(skill in row_skill_set for skill in selected_skills)
-
-            filtered_df = df_sorted[df_sorted["Matched Skills"].apply(has_all_skills)]
+            filtered_df = df_sorted.iloc[coverage_index.match_all(selected_skills)]
             st.write(f"🎯 Found {len(filtered_df)} candidates matching **all** selected skills: {', '.join(selected_skills)}")
             st.dataframe(filtered_df[['Candidate', 'Email', 'Matched Skills']])
 
-            skill_coverage_counts = {
-                skill: df_sorted['Matched Skills'].apply(lambda x: skill in x.split(", ")).sum()
-                for skill in selected_skills
-            }
+            skill_coverage_counts = coverage_index.coverage(selected_skills)
             skill_coverage_df = pd.DataFrame.from_dict(skill_coverage_counts, orient='index', columns=['Candidate Count'])
             skill_coverage_df['% of CVs'] = (skill_coverage_df['Candidate Count'] / len(df_sorted) * 100).round(2)
 
@@ -267,3 +268,6 @@ if cv_files and jd_file:
         st.download_button("Download Selected Candidates Data", csv, "selected_candidates.csv", "text/csv")
 
 
+# Timings of this server process; the same numbers are served at /metrics when METRICS_PORT is set
+if st.sidebar.checkbox("⏱️ Show Performance Panel", value=False):
+    metrics.render_panel(st.sidebar.expander("⏱️ Performance", expanded=True))
@@ -0,0 +1,285 @@
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from email.mime.text import MIMEText
+from email.utils import make_msgid
+
+OUTBOX_PATH = os.path.join(".outbox", "outbox.sqlite")
+STATUSES = ("pending", "sending", "sent", "failed")
+
+
+class Outbox:
+    """Persisted queue of notification emails.
+
+    Each message is a row moving ``pending -> sending -> sent | failed``.
+    Workers claim pending rows in batches inside one write transaction, so
+    several threads (or processes) never send the same row twice. A claim
+    is a lease per message: while a row is ``sending``, ``next_attempt``
+    holds when its lease runs out, and :meth:`requeue_stale` only returns
+    it to ``pending`` after that, i.e. once its sender crashed rather
+    than still working through the batch. SQLite in WAL mode with one
+    connection per thread, as in :class:`parse_cache.ParseCache`.
+    """
+
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " id INTEGER PRIMARY KEY, batch TEXT, recipient TEXT, subject TEXT, body TEXT,"
+                " message_id TEXT, status TEXT, attempts INTEGER DEFAULT 0, next_attempt REAL,"
+                " error TEXT, updated REAL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS messages_due ON messages (status, next_attempt)")
+            db.execute("CREATE INDEX IF NOT EXISTS messages_batch ON messages (batch, status)")
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None or getattr(self._local, "pid", None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def enqueue(self, messages, batch=None):
+        """Queue ``(recipient, subject, body)`` triples; returns the batch id."""
+        batch = batch or uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT INTO messages (batch, recipient, subject, body, message_id, status, next_attempt, updated)"
+                " VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)",
+                [(batch, recipient, subject, body, make_msgid(), now, now) for recipient, subject, body in messages],
+            )
+        return batch
+
+    def claim(self, limit, lease):
+        """Mark up to ``limit`` due messages as ``sending`` and return them.
+
+        Messages are sent in order, so the ``i``-th one's lease runs
+        ``(i + 1) * lease`` seconds from now.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT * FROM messages WHERE status = 'pending' AND next_attempt <= ? ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            db.executemany(
+                "UPDATE messages SET status = 'sending', next_attempt = ?, updated = ? WHERE id = ?",
+                [(now + (i + 1) * lease, now, row["id"]) for i, row in enumerate(rows)],
+            )
+        return rows
+
+    def mark_sent(self, message_id):
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE messages SET status = 'sent', attempts = attempts + 1, error = NULL, updated = ? WHERE id = ?",
+                (time.time(), message_id),
+            )
+
+    def reschedule(self, message_id, error, delay):
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE messages SET status = 'pending', attempts = attempts + 1, error = ?, next_attempt = ?,"
+                " updated = ? WHERE id = ?",
+                (error, now + delay, now, message_id),
+            )
+
+    def fail(self, message_id, error):
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE messages SET status = 'failed', attempts = attempts + 1, error = ?, updated = ? WHERE id = ?",
+                (error, time.time(), message_id),
+            )
+
+    def requeue_stale(self):
+        """Return ``sending`` rows whose lease has run out to ``pending``, due at once."""
+        with self._transaction() as db:
+            return db.execute(
+                "UPDATE messages SET status = 'pending' WHERE status = 'sending' AND next_attempt < ?",
+                (time.time(),),
+            ).rowcount
+
+    def progress(self, batch):
+        """``{status: count}`` for every status, plus ``total``."""
+        counts = dict.fromkeys(STATUSES, 0)
+        for status, count in self._connect().execute(
+            "SELECT status, COUNT(*) FROM messages WHERE batch = ? GROUP BY status", (batch,)
+        ):
+            counts[status] = count
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def depth(self):
+        """Messages waiting to be sent or being sent, across all batches."""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM messages WHERE status IN ('pending', 'sending')"
+        ).fetchone()[0]
+
+    def failures(self, batch):
+        return [
+            (row["recipient"], row["error"]) for row in self._connect().execute(
+                "SELECT recipient, error FROM messages WHERE batch = ? AND status = 'failed' ORDER BY id", (batch,)
+            )
+        ]
+
+
+def is_transient(error):
+    """4xx replies and dropped connections are retried; 5xx replies are final."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, OSError)
+
+
+class Dispatcher:
+    """Background senders draining an :class:`Outbox` over pooled SMTP connections.
+
+    ``connections`` worker threads each keep one SMTP session open (STARTTLS
+    and login happen once per session, not per email) and reuse it for up
+    to ``messages_per_connection`` messages, closing it after
+    ``idle_timeout`` seconds without work. Each worker claims
+    ``batch_size`` messages at a time. A transient failure is retried with
+    exponential backoff and jitter, up to ``max_attempts`` sends in total;
+    anything else marks the message failed.
+
+    Each message is marked sent as soon as the server accepts it. Every
+    claimed message gets ``lease`` seconds on top of the ones before it
+    in its batch; one still unsent after that is taken to belong to a
+    crashed sender and is requeued, at start and while idle. The default
+    is four times ``timeout``, covering a reconnect and a slow send.
+    """
+
+    def __init__(self, outbox, host, port, sender, username=None, password=None, starttls=True,
+                 connections=4, batch_size=20, max_attempts=5, backoff=2.0, max_backoff=300.0,
+                 messages_per_connection=100, idle_timeout=30.0, poll_interval=1.0, timeout=30, lease=None):
+        self.outbox = outbox
+        self.host, self.port, self.sender = host, port, sender
+        self.username, self.password, self.starttls = username, password, starttls
+        self.connections = connections
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff, self.max_backoff = backoff, max_backoff
+        self.messages_per_connection = messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.lease = lease or 4 * timeout
+        self._next_requeue = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return self
+        self._requeue_expired()
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"smtp-sender-{i}", daemon=True) for i in range(self.connections)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, messages, batch=None):
+        """Queue ``(recipient, subject, body)`` triples and return at once with the batch id."""
+        batch = self.outbox.enqueue(messages, batch)
+        self._wake.set()
+        return batch
+
+    def _requeue_expired(self):
+        # At most once per poll interval across all workers; a race only costs an extra UPDATE
+        now = time.monotonic()
+        if now >= self._next_requeue:
+            self._next_requeue = now + max(self.poll_interval, 1.0)
+            self.outbox.requeue_stale()
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        return server
+
+    def _message(self, row):
+        msg = MIMEText(row["body"])
+        msg["Subject"] = row["subject"]
+        msg["From"] = self.sender
+        msg["To"] = row["recipient"]
+        msg["Message-ID"] = row["message_id"]
+        return msg.as_string()
+
+    def _retry_delay(self, attempts):
+        delay = min(self.max_backoff, self.backoff * 2 ** attempts)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _run(self):
+        server, used, last_sent = None, 0, time.monotonic()
+        while not self._stop.is_set():
+            rows = self.outbox.claim(self.batch_size, self.lease)
+            if not rows:
+                self._requeue_expired()
+                if server is not None and time.monotonic() - last_sent > self.idle_timeout:
+                    server = _close(server)
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            for row in rows:
+                try:
+                    if server is None or used >= self.messages_per_connection:
+                        _close(server)
+                        server, used = self._connect(), 0
+                    server.sendmail(self.sender, row["recipient"], self._message(row))
+                    used += 1
+                    last_sent = time.monotonic()
+                    self.outbox.mark_sent(row["id"])
+                except Exception as e:
+                    if not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused)):
+                        server = _close(server)  # the session may be half-way through a command
+                    if is_transient(e) and row["attempts"] + 1 < self.max_attempts:
+                        self.outbox.reschedule(row["id"], str(e), self._retry_delay(row["attempts"]))
+                    else:
+                        self.outbox.fail(row["id"], str(e))
+        _close(server)
+
+
+def _close(server):
+    if server is not None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    return None
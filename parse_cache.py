@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import metrics
+
+CACHE_PATH = os.path.join(".parse_cache", "parse_cache.sqlite")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+TOUCH_INTERVAL = 60.0  # seconds; LRU order is only kept to this resolution
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ParseCache:
+    """Content-addressed store for extracted CV/JD text, phrases and skills.
+
+    Entries are keyed by ``(kind, version, sha256 of the file bytes)``, so
+    re-uploading the same resume is a hit whatever its file name, and
+    bumping a parser version makes old entries unreachable (they age out
+    through LRU eviction). Values are JSON.
+
+    Backed by SQLite in WAL mode: every thread and process opens its own
+    connection, which makes one cache file safe to share between Streamlit
+    sessions and pool workers. Hit/miss counters are per process.
+
+    Entry count and total size live in a one-row ``totals`` table kept
+    up to date by triggers, so bounding the cache doesn't scan it. A hit
+    only rewrites ``last_access`` once it is ``TOUCH_INTERVAL`` old.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counts = {}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " kind TEXT, version TEXT, digest TEXT, value TEXT,"
+                " size INTEGER, last_access REAL,"
+                " PRIMARY KEY (kind, version, digest))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+            db.execute("CREATE TABLE IF NOT EXISTS totals (entries INTEGER, bytes INTEGER)")
+            # Seeded from the entries of a cache file written before totals were kept
+            db.execute(
+                "INSERT INTO totals SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                " WHERE NOT EXISTS (SELECT 1 FROM totals)"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN"
+                " UPDATE totals SET entries = entries + 1, bytes = bytes + new.size; END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN"
+                " UPDATE totals SET entries = entries - 1, bytes = bytes - old.size; END"
+            )
+            db.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_resize AFTER UPDATE OF size ON entries BEGIN"
+                " UPDATE totals SET bytes = bytes + new.size - old.size; END"
+            )
+
+    def __getstate__(self):
+        # Connections and locks stay behind; workers reopen the same file
+        return {"path": self.path, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_bytes"])
+
+    def _connect(self):
+        db = getattr(self._local, "db", None)
+        if db is None or getattr(self._local, "pid", None) != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def _count(self, kind, outcome):
+        with self._lock:
+            counts = self._counts.setdefault(kind, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+        metrics.count("cache_lookups", cache=f"parse:{kind}", outcome=outcome)
+
+    def get(self, kind, version, key):
+        db = self._connect()
+        row = db.execute(
+            "SELECT value, last_access FROM entries WHERE kind = ? AND version = ? AND digest = ?",
+            (kind, version, key),
+        ).fetchone()
+        if row is None:
+            self._count(kind, "misses")
+            return None
+        now = time.time()
+        if now - row[1] >= TOUCH_INTERVAL:
+            with db:
+                db.execute(
+                    "UPDATE entries SET last_access = ? WHERE kind = ? AND version = ? AND digest = ?",
+                    (now, kind, version, key),
+                )
+        self._count(kind, "hits")
+        return json.loads(row[0])
+
+    def put(self, kind, version, key, value):
+        encoded = json.dumps(value, ensure_ascii=False)
+        db = self._connect()
+        with db:
+            # An upsert rather than INSERT OR REPLACE: REPLACE's implicit delete skips the triggers
+            db.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (kind, version, digest) DO UPDATE"
+                " SET value = excluded.value, size = excluded.size, last_access = excluded.last_access",
+                (kind, version, key, encoded, len(encoded.encode("utf-8")), time.time()),
+            )
+        self._evict(db)
+
+    def get_or_compute(self, kind, version, key, compute):
+        value = self.get(kind, version, key)
+        if value is None:
+            value = compute()
+            self.put(kind, version, key, value)
+        return value
+
+    def _evict(self, db):
+        # Drop least recently used entries until back under 90% of the bound
+        total = db.execute("SELECT bytes FROM totals").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * 0.9)
+        with db:
+            rows = db.execute("SELECT kind, version, digest, size FROM entries ORDER BY last_access")
+            doomed = []
+            for kind, version, key, size in rows:
+                if target <= 0:
+                    break
+                doomed.append((kind, version, key))
+                target -= size
+            db.executemany("DELETE FROM entries WHERE kind = ? AND version = ? AND digest = ?", doomed)
+
+    def stats(self):
+        with self._lock:
+            counts = {kind: dict(c) for kind, c in self._counts.items()}
+        hits = sum(c["hits"] for c in counts.values())
+        misses = sum(c["misses"] for c in counts.values())
+        entries, size = self._connect().execute("SELECT entries, bytes FROM totals").fetchone()
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "by_kind": counts,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        db = self._connect()
+        with db:
+            db.execute("DELETE FROM entries")
+
+
+@lru_cache(maxsize=None)
+def get_cache(path=CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+    return ParseCache(path, max_bytes)
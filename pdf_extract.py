@@ -0,0 +1,360 @@
+"""Pluggable PDF text extraction with per-file limits.
+
+Backends are tried fastest first (pypdfium2, then pypdf/PyPDF2); when the
+fast text looks unusable (almost empty, or full of ``(cid:NN)`` glyph
+codes) the file is re-read with pdfplumber, which copes better with odd
+layouts. Large documents are split into page ranges handled by separate
+processes. Every file runs in a child process with a wall-clock timeout
+and an address-space cap; a file that times out, blows the memory cap or
+crashes its parser is copied to the quarantine directory and raises
+:class:`PdfQuarantined`, so one pathological PDF can't stall a batch.
+
+The child processes are long-lived: each one sets its memory cap once and
+extracts file after file, so a batch doesn't pay a process start per PDF.
+A worker is only replaced after a timeout, a crash or a memory error, and
+after ``MAX_FILES_PER_WORKER`` files to bound what a parser leaks.
+"""
+import atexit
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+FAST_BACKENDS = ("pypdfium2", "pypdf")
+LAYOUT_BACKEND = "pdfplumber"
+DEFAULT_BACKENDS = FAST_BACKENDS + (LAYOUT_BACKEND,)
+
+QUARANTINE_DIR = "quarantine"
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_MEMORY_MB = 1024
+PARALLEL_PAGE_THRESHOLD = 24
+PAGE_WORKERS = 4
+MAX_FILES_PER_WORKER = 200
+MAX_IDLE_WORKERS = 4
+
+# Below this many characters per page the fast backend probably missed the text
+MIN_CHARS_PER_PAGE = 40
+
+
+class PdfQuarantined(Exception):
+    def __init__(self, name, reason):
+        super().__init__(f"{name or 'PDF'} quarantined: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+# ---------- backends ----------
+
+def _open_pypdf(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        from PyPDF2 import PdfReader
+    return PdfReader(BytesIO(data))
+
+
+def _pypdf_count(data):
+    return len(_open_pypdf(data).pages)
+
+
+def _pypdf_pages(data, start, stop):
+    pages = _open_pypdf(data).pages
+    return [pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _pdfium_count(data):
+    import pypdfium2
+    return len(pypdfium2.PdfDocument(data))
+
+
+def _pdfium_pages(data, start, stop):
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(data)
+    texts = []
+    for i in range(start, stop):
+        page = pdf[i]
+        texts.append(page.get_textpage().get_text_range())
+    return texts
+
+
+def _plumber_count(data):
+    import pdfplumber
+    with pdfplumber.open(BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+
+def _plumber_pages(data, start, stop):
+    import pdfplumber
+    with pdfplumber.open(BytesIO(data)) as pdf:
+        return [pdf.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+BACKENDS = {
+    "pypdfium2": (_pdfium_count, _pdfium_pages),
+    "pypdf": (_pypdf_count, _pypdf_pages),
+    "pdfplumber": (_plumber_count, _plumber_pages),
+}
+
+_IMPORT_NAMES = {"pypdfium2": ("pypdfium2",), "pypdf": ("pypdf", "PyPDF2"), "pdfplumber": ("pdfplumber",)}
+
+
+def available_backends(backends=DEFAULT_BACKENDS):
+    found = []
+    for backend in backends:
+        for module in _IMPORT_NAMES[backend]:
+            try:
+                __import__(module)
+            except ImportError:
+                continue
+            found.append(backend)
+            break
+    return found
+
+
+# ---------- extraction (runs inside the limited child) ----------
+
+def _looks_usable(pages):
+    text = "".join(pages)
+    if len(text.strip()) < MIN_CHARS_PER_PAGE * max(len(pages), 1):
+        return False
+    return text.count("(cid:") * 10 < len(text.split()) + 1
+
+
+def _page_range(args):
+    backend, data, start, stop = args
+    return BACKENDS[backend][1](data, start, stop)
+
+
+def _extract_pages(backend, data, parallel_pages, page_workers):
+    count, pages = BACKENDS[backend]
+    n = count(data)
+    if n < parallel_pages or page_workers <= 1:
+        return pages(data, 0, n)
+    step = -(-n // page_workers)
+    ranges = [(backend, data, start, min(start + step, n)) for start in range(0, n, step)]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        return [text for part in pool.map(_page_range, ranges) for text in part]
+
+
+def _extract_document(data, backends, parallel_pages, page_workers):
+    best, best_backend, errors = None, None, []
+    for backend in backends:
+        try:
+            pages = _extract_pages(backend, data, parallel_pages, page_workers)
+        except MemoryError:
+            raise
+        except Exception as e:
+            errors.append(f"{backend}: {e}")
+            continue
+        if best is None or len("".join(pages)) > len("".join(best)):
+            best, best_backend = pages, backend
+        if _looks_usable(pages):
+            break
+    if best is None:
+        raise RuntimeError("; ".join(errors) or "no PDF backend available")
+    return "".join(text + "\n" for text in best if text), best_backend
+
+
+# ---------- per-file isolation ----------
+
+def _current_address_space():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _limit_memory(max_memory_mb):
+    try:
+        import resource
+    except ImportError:
+        return  # Windows: timeout only
+    baseline = _current_address_space()
+    if baseline is None:
+        return
+    limit = baseline + max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _child(conn, max_memory_mb, parent):
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()  # lets the parent kill page workers along with us
+    _limit_memory(max_memory_mb)
+    while True:
+        # Forked siblings keep our parent's end of the pipe open, so watch the parent itself
+        while not conn.poll(1.0):
+            if os.getppid() != parent:
+                return
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        try:
+            conn.send(("ok", _extract_document(*job)))
+        except MemoryError:
+            conn.send(("memory", f"exceeded {max_memory_mb} MB"))
+            return  # the heap may be in a bad state; the parent starts a fresh worker
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def _kill(process):
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    process.kill()
+    process.join()
+
+
+def _context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+
+class _Worker:
+    """One limited child process and the parent's end of its pipe."""
+
+    def __init__(self, max_memory_mb):
+        self.max_memory_mb = max_memory_mb
+        self.files = 0
+        self.conn, child_conn = _context().Pipe()
+        # Not a daemon: daemonic processes can't start the page-range pool
+        self.process = _context().Process(target=_child, args=(child_conn, max_memory_mb, os.getpid()))
+        self.process.start()
+        child_conn.close()
+
+    def extract(self, job, timeout):
+        """``(status, payload)`` for one file; statuses other than ok/error leave the worker unusable."""
+        self.files += 1
+        try:
+            self.conn.send(job)
+            if not self.conn.poll(timeout):
+                return "timeout", f"no result after {timeout}s"
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(5)
+            return "died", f"parser process died (exit code {self.process.exitcode})"
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        self.stop()
+
+    def stop(self):
+        if self.process.is_alive():
+            _kill(self.process)
+        self.conn.close()
+
+
+class _WorkerPool:
+    """Idle workers of this process, reused across calls and threads."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.idle = []
+
+    def acquire(self, max_memory_mb):
+        with self.lock:
+            for i, worker in enumerate(self.idle):
+                if worker.max_memory_mb == max_memory_mb and worker.process.is_alive():
+                    return self.idle.pop(i)
+        return _Worker(max_memory_mb)
+
+    def release(self, worker):
+        with self.lock:
+            if worker.files < MAX_FILES_PER_WORKER and len(self.idle) < MAX_IDLE_WORKERS:
+                self.idle.append(worker)
+                return
+        worker.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for worker in idle:
+            worker.close()
+
+
+_pool = None
+
+
+def _worker_pool():
+    global _pool
+    # A forked child inherits the pool object but not the workers as its own children
+    if _pool is None or _pool.pid != os.getpid():
+        _pool = _WorkerPool()
+    return _pool
+
+
+@atexit.register
+def shutdown_workers():
+    """Stop the idle extraction workers; runs at exit, before multiprocessing joins its children."""
+    if _pool is not None and _pool.pid == os.getpid():
+        _pool.close()
+
+
+def quarantine(data, name, reason, quarantine_dir=QUARANTINE_DIR):
+    key = hashlib.sha256(data).hexdigest()
+    os.makedirs(quarantine_dir, exist_ok=True)
+    with open(os.path.join(quarantine_dir, key + ".pdf"), "wb") as f:
+        f.write(data)
+    with open(os.path.join(quarantine_dir, key + ".json"), "w", encoding="utf-8") as f:
+        json.dump({"name": name, "reason": reason, "time": time.time()}, f)
+    return key
+
+
+def quarantined_reason(data, quarantine_dir=QUARANTINE_DIR):
+    path = os.path.join(quarantine_dir, hashlib.sha256(data).hexdigest() + ".json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["reason"]
+
+
+def extract_pdf_text(
+    data, name="", backends=DEFAULT_BACKENDS, timeout=DEFAULT_TIMEOUT, max_memory_mb=DEFAULT_MAX_MEMORY_MB,
+    parallel_pages=PARALLEL_PAGE_THRESHOLD, page_workers=PAGE_WORKERS, quarantine_dir=QUARANTINE_DIR,
+    isolate=True,
+):
+    """Text of a PDF given its bytes, one ``"\\n"``-terminated block per page.
+
+    Raises :class:`PdfQuarantined` for files that time out, exceed the
+    memory cap or fail in every backend, and immediately for files that
+    were quarantined before. ``isolate=False`` runs in-process without
+    limits, e.g. for debugging.
+    """
+    backends = available_backends(backends)
+    if not isolate:
+        return _extract_document(data, backends, parallel_pages, page_workers)[0]
+
+    reason = quarantined_reason(data, quarantine_dir)
+    if reason is not None:
+        raise PdfQuarantined(name, f"previously quarantined ({reason})")
+
+    pool = _worker_pool()
+    worker = pool.acquire(max_memory_mb)
+    status, payload = worker.extract((data, backends, parallel_pages, page_workers), timeout)
+    if status in ("ok", "error"):
+        pool.release(worker)
+    else:
+        worker.stop()
+
+    if status == "ok":
+        return payload[0]
+    if status == "died":
+        status = "error"
+    quarantine(data, name, f"{status}: {payload}", quarantine_dir)
+    raise PdfQuarantined(name, f"{status}: {payload}")
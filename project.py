@@ -1,104 +1,100 @@
 import streamlit as st
 import pandas as pd
-import re
-import smtplib
-import torch
 import os
-import matplotlib.pyplot as plt
-import spacy
-from email.mime.text import MIMEText
-from PyPDF2 import PdfReader
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sentence_transformers import SentenceTransformer, util
-from wordcloud import WordCloud
-import plotly.express as px
+import analytics
+import contacts
+import cross_match
+import engine
+import metrics
+import notifications
+import parse_cache
+import ranking
+import scoring
+import skills
+import vector_index
+from pdf_extract import PdfQuarantined
+from models import BERT_MODEL, ENCODER_BACKENDS
 
 st.set_page_config(page_title="CV Matching System", page_icon="📁", layout="wide")
+metrics.serve_from_env()
 
-bert_model = SentenceTransformer('all-MiniLM-L6-v2')
-nlp = spacy.load("en_core_web_sm")
+@st.cache_resource
+def load_skill_index():
+    return skills.SkillIndex.load_or_build()
 
-@st.cache_data
-def load_skills():
-    with open("all_skills.txt", "r", encoding="utf-8") as f:
-        return set(line.strip().lower() for line in f if len(line.strip()) > 1)
-
-skill_set = load_skills()
+skill_index = load_skill_index()
 
 SENDER_EMAIL = os.getenv("SENDER_EMAIL")
 SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+
+@st.cache_resource
+def get_parse_cache():
+    return parse_cache.get_cache()
 
 def extract_text_from_pdf(pdf_file):
-    reader = PdfReader(pdf_file)
-    return "\n".join(page.extract_text() for page in reader.pages if page.extract_text()).strip()
-
-def extract_skills_with_proficiency(text, known_skills):
-    doc = nlp(text.lower())
-    found_skills = {}
-    for chunk in doc.noun_chunks:
-        phrase = chunk.text.strip().lower()
-        if phrase in known_skills:
-            found_skills[phrase] = estimate_proficiency(phrase, text)
-    return found_skills
-
-def estimate_proficiency(skill, text):
-    context = text.lower()
-    if f"expert in {skill}" in context or f"advanced {skill}" in context:
-        return "⭐⭐⭐ Advanced"
-    elif f"intermediate {skill}" in context or f"proficient in {skill}" in context:
-        return "⭐⭐ Intermediate"
-    elif f"familiar with {skill}" in context or f"basic {skill}" in context:
-        return "⭐ Beginner"
-    return "Unknown"
+    # Same cached extraction as myapp.py; a quarantined PDF is not cached, so it is retried next time
+    try:
+        return engine.cached_text(pdf_file.name, pdf_file.getvalue(), get_parse_cache()).strip()
+    except PdfQuarantined as e:
+        st.warning(f"⚠️ {e}")
+        return ""
+
+def extract_cv_skills(cv_file, cv_text):
+    # Skill IDs and levels are cached per file and per skill-vocabulary version
+    key = parse_cache.digest(cv_file.getvalue())
+    return get_parse_cache().get_or_compute(
+        "skills", skill_index.version, key, lambda: extract_skills_with_proficiency(cv_text)
+    )
+
+def extract_skills_with_proficiency(text):
+    # (skill IDs, levels) as lists, so the parse cache can store them as JSON
+    ids, levels = skill_index.find_ids_with_proficiency(text)
+    return ids.tolist(), levels
+
+@st.cache_data
+def jd_skill_ids(jd_text, index_version):
+    return skill_index.find_ids(jd_text).tolist()
 
 def detect_features(text):
-    text = text.lower()
-    linkedin_pattern = re.search(r"linkedin\\.com/in/[\\w\\d-]+", text)
-    github_pattern = re.search(r"github\\.com/[\\w\\d-]+", text)
-    email_pattern = re.search(r"\\b[\\w\\.-]+@[\\w\\.-]+\\.\\w{2,4}\\b", text)
-    phone_pattern = re.search(r"(\\+?\\d[\\d\\s().-]{8,}\\d)", text)
-    portfolio_pattern = re.search(r"https?://[^\"\\s]+", text)
-    experience_keywords = ["experience", "work experience", "internship", "employment history", "professional experience", "roles and responsibilities", "career timeline"]
-    has_experience = any(keyword in text for keyword in experience_keywords)
-    return {
-        "LinkedIn": "✅" if linkedin_pattern else "❌",
-        "GitHub": "✅" if github_pattern else "❌",
-        "Email": "✅" if email_pattern else "❌",
-        "Phone": "✅" if phone_pattern else "❌",
-        "Portfolio": "✅" if portfolio_pattern else "❌",
-        "Experience": "✅" if has_experience else "❌"
-    }
-
-def calculate_match_score(cv_text, job_desc):
-    try:
-        vectorizer = TfidfVectorizer()
-        tfidf_matrix = vectorizer.fit_transform([cv_text, job_desc])
-        tfidf_score = (tfidf_matrix[0] @ tfidf_matrix[1].T).toarray()[0][0]
-    except:
-        tfidf_score = 0.0
-    embeddings = bert_model.encode([cv_text, job_desc], convert_to_tensor=True)
-    bert_score = util.pytorch_cos_sim(embeddings[0], embeddings[1]).item()
-    return round(((tfidf_score + bert_score) / 2) * 100, 2)
-
-def send_email(recipient, subject, body):
+    return contacts.feature_flags(contacts.extract_contacts(text))
+
+@st.cache_resource
+def get_embedding_cache(backend="torch"):
+    return scoring.EmbeddingCache(backend=backend)
+
+@st.cache_resource
+def get_candidate_index(backend="torch"):
+    # One talent-pool index per encoder backend; vectors from different backends don't mix
+    model = f"{BERT_MODEL}-{backend}"
+    return vector_index.CandidateIndex.load_or_create(os.path.join(vector_index.INDEX_DIR, model), model=model)
+
+@st.cache_resource
+def get_notifier():
+    # One set of background senders per server process; the outbox outlives restarts
+    outbox = notifications.Outbox()
+    metrics.set_gauge("notification_queue_depth", outbox.depth)
+    return notifications.Dispatcher(outbox, SMTP_HOST, SMTP_PORT, SENDER_EMAIL, SENDER_EMAIL, SENDER_PASSWORD).start()
+
+def queue_emails(messages):
+    """Queue ``(recipient, subject, body)`` triples for background delivery; returns the batch id."""
     if not SENDER_EMAIL or not SENDER_PASSWORD:
         print("Email not sent. Set credentials in environment variables.")
-        return
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = SENDER_EMAIL
-    msg["To"] = recipient
-    try:
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        server.sendmail(SENDER_EMAIL, recipient, msg.as_string())
-        server.quit()
-    except Exception as e:
-        print(f"Failed to send email: {e}")
-
-def skill_gap_penalty(missing_skills):
-    return len(missing_skills) * 2.5
+        return None
+    return get_notifier().submit(messages)
+
+def show_notification_progress(batch):
+    progress = get_notifier().outbox.progress(batch)
+    done = progress["sent"] + progress["failed"]
+    st.progress(done / max(progress["total"], 1), text=(
+        f"📨 {progress['sent']} sent, {progress['failed']} failed, "
+        f"{progress['pending'] + progress['sending']} queued of {progress['total']}"
+    ))
+    for recipient, error in get_notifier().outbox.failures(batch):
+        st.warning(f"❌ {recipient}: {error}")
+    if done < progress["total"]:
+        st.button("🔄 Refresh Email Status")
 
 st.sidebar.title("📂 CV Matching System")
 st.sidebar.image("https://cdn-icons-png.flaticon.com/512/1053/1053244.png", use_column_width=True)
@@ -106,8 +102,7 @@ st.sidebar.image("https://cdn-icons-png.flaticon.com/512/1053/1053244.png", use_
 st.header("📄 Upload Job Description")
 jd_file = st.file_uploader("Upload Job Description (PDF)", type=["pdf"], key="jd")
 jd_text = extract_text_from_pdf(jd_file) if jd_file else ""
-jd_skills_map = extract_skills_with_proficiency(jd_text, skill_set) if jd_file else {}
-jd_skills = list(jd_skills_map.keys())
+jd_skills = jd_skill_ids(jd_text, skill_index.version) if jd_file else []
 st.text_area("Extracted Job Description", jd_text, height=200)
 
 st.header("📂 Upload CVs")
@@ -118,47 +113,77 @@ st.sidebar.subheader("🎯 Ranking Weight Tuning")
 match_weight = st.sidebar.slider("🔢 Match Score Weight", 0.0, 1.0, 0.5)
 common_weight = st.sidebar.slider("🔗 Common Skills Weight", 0.0, 1.0, 0.3)
 proficiency_weight = st.sidebar.slider("🌟 Proficiency Weight", 0.0, 1.0, 0.2)
-
-def custom_score(match_score, common_skills, proficiencies):
-    prof_score = sum(
-        1 if p.startswith("⭐⭐⭐") else 0.5 if p.startswith("⭐⭐") else 0.2
-        for p in proficiencies.values()
-    ) / max(len(proficiencies), 1)
-    return (match_score * match_weight) + (len(common_skills) * common_weight) + (prof_score * proficiency_weight * 100)
+encoder_backend = st.sidebar.selectbox("⚡ Encoder Backend", list(ENCODER_BACKENDS))
+embed_batch_size = st.sidebar.number_input("🧮 Embedding Batch Size", min_value=1, max_value=256, value=32)
+chunked_embedding = st.sidebar.checkbox("📚 Embed Full Documents (overlapping windows)", value=False)
+embed_window = st.sidebar.slider("🪟 Window Size (words)", 32, 180, 160, disabled=not chunked_embedding)
+embed_pooling = st.sidebar.selectbox("🧷 Window Pooling", ["max", "mean"], disabled=not chunked_embedding)
+
+def score_cohort(cv_texts, jd_text):
+    return scoring.score_cohort(
+        cv_texts, jd_text, batch_size=int(embed_batch_size), cache=get_embedding_cache(encoder_backend),
+        window=embed_window if chunked_embedding else None, overlap=embed_window // 5, pooling=embed_pooling,
+        backend=encoder_backend,
+    )
+
+def get_dashboard_analytics(run_key):
+    # Per session and JD + scoring settings, so users don't see each other's CVs;
+    # CVs added to the same run are folded in incrementally, a new run drops the old one
+    runs = st.session_state.setdefault("dashboard_analytics", {})
+    if run_key not in runs:
+        runs.clear()
+        runs[run_key] = analytics.SkillAnalytics(
+            {"skills": "Skill List", "common": "Common Skill List", "missing": "Missing Skill List"},
+            score_columns=["Match Score", "Final Score"],
+        )
+    return runs[run_key]
+
+def rank_candidates(features):
+    return ranking.rerank(features, match_weight, common_weight, proficiency_weight)
+
+def _upload_key(uploaded_file):
+    # Stable across reruns for one upload, so slider moves don't rehash every file
+    return getattr(uploaded_file, "file_id", None) or parse_cache.digest(uploaded_file.getvalue())
+
+@st.cache_data(show_spinner="Scoring CVs ...", max_entries=16)
+def cv_feature_table(upload_keys, jd_text, scoring_settings, _uploaded_cvs):
+    # Everything the ranking sliders don't affect, keyed by files, JD and scoring settings
+    jd_skills = jd_skill_ids(jd_text, skill_index.version)
+    cv_texts = [extract_text_from_pdf(cv_file) for cv_file in _uploaded_cvs]
+    cv_skills_list = [extract_cv_skills(cv_file, cv_text) for cv_file, cv_text in zip(_uploaded_cvs, cv_texts)]
+    match_scores = score_cohort(cv_texts, jd_text)
+    features = pd.DataFrame([
+        ranking.feature_row(cv_file.name, cv_skills, match_score, jd_skills, skill_index.vocabulary)
+        for cv_file, cv_skills, match_score in zip(_uploaded_cvs, cv_skills_list, match_scores)
+    ])
+    flags = pd.DataFrame([
+        dict(detect_features(cv_text), Candidate=cv_file.name) for cv_file, cv_text in zip(_uploaded_cvs, cv_texts)
+    ])
+    return features, flags
 
 if uploaded_cvs and jd_text:
-    feature_rows = []
-    for cv_file in uploaded_cvs:
-        cv_text = extract_text_from_pdf(cv_file)
-        cv_skills_map = extract_skills_with_proficiency(cv_text, skill_set)
-        cv_skills = list(cv_skills_map.keys())
-        match_score = calculate_match_score(cv_text, jd_text)
-        common_skills = sorted(set(cv_skills) & set(jd_skills))
-        missing_skills = sorted(set(jd_skills) - set(cv_skills))
-        rank_score = custom_score(match_score, common_skills, {k: v for k, v in cv_skills_map.items() if k in common_skills})
-        penalty = skill_gap_penalty(missing_skills)
-        final_score = max(match_score - penalty, 0)
-
-        cv_data.append({
-            "Candidate": cv_file.name,
-            "Match Score": match_score,
-            "Rank Score": round(rank_score, 2),
-            "Penalty Score": penalty,
-            "Final Score": round(final_score, 2),
-            "Skills": ", ".join(f"{k.title()} ({v})" for k, v in cv_skills_map.items()),
-            "Common Skills": ", ".join(common_skills),
-            "Missing Skills": ", ".join(missing_skills),
-            "Email": "candidate_email@example.com"
-        })
-
-        features = detect_features(cv_text)
-        features["Candidate"] = cv_file.name
-        feature_rows.append(features)
-
-    df = pd.DataFrame(cv_data).sort_values(by="Rank Score", ascending=False)
+    scoring_settings = (
+        encoder_backend, int(embed_batch_size), chunked_embedding, embed_window, embed_pooling, skill_index.version
+    )
+    features, flags = cv_feature_table(
+        tuple(_upload_key(cv_file) for cv_file in uploaded_cvs), jd_text, scoring_settings, uploaded_cvs
+    )
+    df = rank_candidates(features)
+    cv_data = df.to_dict("records")
+    feature_rows = flags.to_dict("records")
 
     st.session_state["cv_data"] = cv_data
     st.session_state["feature_data"] = feature_rows
+    analytics_key = parse_cache.digest(repr((jd_text, scoring_settings)).encode("utf-8"))
+    # Final Score doesn't depend on the weights; rerank keeps the feature table's index
+    get_dashboard_analytics(analytics_key).update(features.assign(**{"Final Score": df["Final Score"]}).to_dict("records"))
+    st.session_state["analytics_key"] = analytics_key
+
+    cache_stats = get_parse_cache().stats()
+    st.sidebar.caption(
+        f"🗄️ Parse cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"· {cache_stats['entries']} entries"
+    )
 
     st.subheader("📊 Matching Overview")
     col1, col2 = st.columns(2)
@@ -175,6 +200,7 @@ if uploaded_cvs and jd_text:
     rejected_candidates = df.iloc[top_k:]
 
     if st.button("📊 Show Graph"):
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots()
         ax.bar(df["Candidate"], df["Final Score"], color='skyblue')
         ax.set_xlabel("Candidates")
@@ -210,36 +236,119 @@ if uploaded_cvs and jd_text:
     rejected_message = st.text_area("Message for Rejected", "Unfortunately, you are not selected.")
 
     if st.button("Send Interview Notifications"):
-        for _, row in selected_candidates.iterrows():
-            send_email(row["Email"], selected_subject, selected_message)
+        messages = [(row["Email"], selected_subject, selected_message) for _, row in selected_candidates.iterrows()]
         for _, row in rejected_candidates.iterrows():
             suggestion = f"\nRecommended skills to learn: {row['Missing Skills']}" if row["Missing Skills"] else ""
-            send_email(row["Email"], rejected_subject, rejected_message + suggestion)
-        st.success("✅ Emails sent successfully!")
+            messages.append((row["Email"], rejected_subject, rejected_message + suggestion))
+        batch = queue_emails(messages)
+        if batch:
+            st.session_state["notification_batch"] = batch
+            st.success(f"✅ {len(messages)} emails queued for sending.")
+    if st.session_state.get("notification_batch"):
+        show_notification_progress(st.session_state["notification_batch"])
 
     st.subheader("📄 Feature Presence Table")
     st.dataframe(pd.DataFrame(feature_rows))
 
+    if st.button("💾 Add These CVs to the Talent Pool"):
+        pool = get_candidate_index(encoder_backend)
+        added_texts = [extract_text_from_pdf(cv_file) for cv_file in uploaded_cvs]
+        vectors = scoring.embed_texts(
+            added_texts, batch_size=int(embed_batch_size),
+            cache=get_embedding_cache(encoder_backend), backend=encoder_backend,
+        )
+        # The text goes in with the vector so rescoring doesn't depend on the parse cache
+        pool.add([parse_cache.digest(cv_file.getvalue()) for cv_file in uploaded_cvs], vectors,
+                 [cv_file.name for cv_file in uploaded_cvs], added_texts)
+        pool.save(os.path.join(vector_index.INDEX_DIR, pool.model))
+        st.success(f"Talent pool now holds {len(pool)} CVs.")
+
+talent_pool = get_candidate_index(encoder_backend)
+if jd_text and len(talent_pool):
+    st.header("🔎 Search the Talent Pool")
+    shortlist_size = st.slider("Shortlist size (nearest CVs to rescore exactly)", 5, 500, 50)
+    # Approximate search picks the shortlist; only those CVs get the full scoring
+    jd_vector = scoring.embed_texts(
+        [jd_text], cache=get_embedding_cache(encoder_backend), backend=encoder_backend
+    )[0]
+    hits = talent_pool.search(jd_vector, k=shortlist_size)
+    pool_rows, pool_texts, pool_skills, unscored = [], [], [], 0
+    for key, similarity in hits:
+        # Pools saved before texts were stored with the vectors fall back to the parse cache
+        text = talent_pool.text(key) or get_parse_cache().get("text", engine.TEXT_VERSION, key)
+        if text is None:
+            unscored += 1
+            continue
+        text = text.strip()
+        pool_rows.append(talent_pool.info(key) or key)
+        pool_texts.append(text)
+        pool_skills.append(get_parse_cache().get_or_compute(
+            "skills", skill_index.version, key, lambda: extract_skills_with_proficiency(text)
+        ))
+    if pool_texts:
+        pool_df = rank_candidates(pd.DataFrame([
+            ranking.feature_row(name, cv_skills, score, jd_skills, skill_index.vocabulary)
+            for name, cv_skills, score in zip(pool_rows, pool_skills, score_cohort(pool_texts, jd_text))
+        ]))
+        st.caption(f"Rescored {len(pool_texts)} of {len(talent_pool)} pooled CVs.")
+    if unscored:
+        st.warning(f"⚠️ {unscored} shortlisted CVs have no stored text; add them to the talent pool again to rescore them.")
+        st.dataframe(pool_df.style.format({
+            "Match Score": "{:.2f}%", "Rank Score": "{:.2f}", "Penalty Score": "{:.1f}", "Final Score": "{:.2f}%"
+        }))
+
+st.header("🧭 Match Against Multiple Roles")
+role_files = st.file_uploader("Upload Job Descriptions (PDF)", type=["pdf"], accept_multiple_files=True, key="roles")
+if uploaded_cvs and role_files:
+    # Each CV and role is extracted and embedded once for the whole matrix
+    cv_names = [cv_file.name for cv_file in uploaded_cvs]
+    role_names = [role_file.name for role_file in role_files]
+    role_scores = scoring.score_matrix(
+        [extract_text_from_pdf(cv_file) for cv_file in uploaded_cvs],
+        [extract_text_from_pdf(role_file) for role_file in role_files],
+        batch_size=int(embed_batch_size), cache=get_embedding_cache(encoder_backend),
+        window=embed_window if chunked_embedding else None, overlap=embed_window // 5, pooling=embed_pooling,
+        backend=encoder_backend,
+    )
+
+    st.subheader("🗺️ Match Score Matrix")
+    st.dataframe(cross_match.score_table(role_scores, cv_names, role_names).style.format("{:.2f}%").background_gradient(axis=None))
+
+    st.subheader("🏅 Best-Fit Role per Candidate")
+    st.dataframe(cross_match.best_fit(role_scores, cv_names, role_names).style.format(
+        {"Score": "{:.2f}%", "Runner-Up Score": "{:.2f}%"}, na_rep="-"
+    ))
+
+    st.subheader("📋 Shortlist per Role")
+    role_top_k = st.slider("Candidates per role", 1, len(cv_names), min(5, len(cv_names)), key="role_top_k")
+    shortlist = cross_match.shortlists(role_scores, cv_names, role_names, role_top_k)
+    for role, rows in shortlist.groupby("Role", sort=False):
+        with st.expander(f"💼 {role}"):
+            st.dataframe(rows[["Rank", "Candidate", "Score"]].reset_index(drop=True).style.format({"Score": "{:.2f}%"}))
+    st.download_button("Download Shortlists", shortlist.to_csv(index=False), "role_shortlists.csv", "text/csv")
+
 if st.button("📊 Show Summary Dashboard"):
+    # Plotting libraries are only imported once the dashboard is opened
+    import matplotlib.pyplot as plt
+    import plotly.express as px
+    from wordcloud import WordCloud
+
     st.subheader("📌 Overview Stats")
-    total_cvs = len(st.session_state.get("cv_data", []))
+    stats = get_dashboard_analytics(st.session_state["analytics_key"]) if "analytics_key" in st.session_state else None
+    total_cvs = len(stats) if stats else 0
     if total_cvs == 0:
         st.warning("No CVs processed yet.")
     else:
-        df = pd.DataFrame(st.session_state["cv_data"])
-        avg_match = df["Match Score"].mean()
-        avg_final = df["Final Score"].mean()
         st.metric("Total CVs Processed", total_cvs)
-        st.metric("Average Match Score", f"{avg_match:.2f}%")
-        st.metric("Average Final Score", f"{avg_final:.2f}%")
+        st.metric("Average Match Score", f"{stats.mean('Match Score'):.2f}%")
+        st.metric("Average Final Score", f"{stats.mean('Final Score'):.2f}%")
 
-        all_missing = ",".join(df["Missing Skills"].tolist()).split(",")
-        top_missing = pd.Series(all_missing).value_counts().head(5)
-        st.bar_chart(top_missing)
+        st.bar_chart(stats.top("missing", 5))
 
         st.subheader("📈 Final Score Distribution")
         fig1, ax1 = plt.subplots()
-        ax1.hist(df["Final Score"], bins=10, color='skyblue', edgecolor='black')
+        counts, edges = stats.histogram("Final Score")
+        ax1.stairs(counts, edges, fill=True, color='skyblue', edgecolor='black')
         ax1.set_title("Distribution of Final Scores")
         ax1.set_xlabel("Final Score")
         ax1.set_ylabel("Number of Candidates")
@@ -253,13 +362,18 @@ if st.button("📊 Show Summary Dashboard"):
             st.plotly_chart(fig)
 
         st.subheader("🔤 Common Skills Word Cloud")
-        all_skills = ",".join(df["Skills"].tolist()).lower()
-        wc = WordCloud(width=800, height=400, background_color='white').generate(all_skills)
-        fig_wc, ax_wc = plt.subplots()
-        ax_wc.imshow(wc, interpolation='bilinear')
-        ax_wc.axis("off")
-        st.pyplot(fig_wc)
+        if stats.frequencies("skills"):
+            wc = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(stats.frequencies("skills"))
+            fig_wc, ax_wc = plt.subplots()
+            ax_wc.imshow(wc, interpolation='bilinear')
+            ax_wc.axis("off")
+            st.pyplot(fig_wc)
 
         st.subheader("❌ Skill Gap Frequency")
-        gap_skills = pd.Series(",".join(df["Missing Skills"].tolist()).split(",")).value_counts()
-        st.bar_chart(gap_skills.head(10))
+        st.bar_chart(stats.top("missing", 10))
+        st.dataframe(stats.coverage("missing").head(10))
+
+
+# Timings of this server process; the same numbers are served at /metrics when METRICS_PORT is set
+if st.sidebar.checkbox("⏱️ Show Performance Panel", value=False):
+    metrics.render_panel(st.sidebar.expander("⏱️ Performance", expanded=True))
@@ -0,0 +1,83 @@
+"""Weight-independent CV features and the vectorised project.py ranking.
+
+Everything that needs the CV text (match score, skill maps, proficiency)
+goes into a feature table once per CV set and JD. Moving a weight slider
+only reruns :func:`rerank`, which is a handful of column operations.
+"""
+import numpy as np
+
+# custom_score points for a common skill, by proficiency label prefix
+PROFICIENCY_POINTS = (("⭐⭐⭐", 1.0), ("⭐⭐", 0.5))
+DEFAULT_PROFICIENCY_POINTS = 0.2
+PENALTY_PER_MISSING_SKILL = 2.5
+
+RANKED_COLUMNS = [
+    "Candidate", "Match Score", "Rank Score", "Penalty Score", "Final Score",
+    "Skills", "Common Skills", "Missing Skills", "Email",
+]
+
+
+def proficiency_points(level):
+    for prefix, points in PROFICIENCY_POINTS:
+        if level.startswith(prefix):
+            return points
+    return DEFAULT_PROFICIENCY_POINTS
+
+
+def feature_row(name, cv_skills, match_score, jd_skill_ids, vocabulary):
+    """Everything about one CV that the ranking weights don't change.
+
+    ``cv_skills`` is ``(skill IDs, proficiency levels)`` as
+    ``SkillIndex.find_ids_with_proficiency`` gives them; the overlap with
+    ``jd_skill_ids`` is worked out on ID bitsets and only the display
+    columns are turned back into names.
+    """
+    cv_ids, levels = cv_skills
+    cv_ids = np.asarray(cv_ids, dtype=np.int32)
+    jd_ids = np.asarray(jd_skill_ids, dtype=np.int32)
+    common_ids = vocabulary.sort_by_name(cv_ids[vocabulary.bitset(jd_ids)[cv_ids]])
+    missing_ids = vocabulary.sort_by_name(jd_ids[~vocabulary.bitset(cv_ids)[jd_ids]])
+    level_of = dict(zip(cv_ids.tolist(), levels))
+    points = [proficiency_points(level_of[skill]) for skill in common_ids.tolist()]
+    skills = vocabulary.names(cv_ids.tolist())
+    common_skills = vocabulary.names(common_ids.tolist())
+    missing_skills = vocabulary.names(missing_ids.tolist())
+    return {
+        "Candidate": name,
+        "Match Score": float(match_score),
+        "Common Count": len(common_skills),
+        "Missing Count": len(missing_skills),
+        "Proficiency Score": sum(points) / max(len(points), 1),
+        "Skills": ", ".join(f"{k.title()} ({v})" for k, v in zip(skills, levels)),
+        "Common Skills": ", ".join(common_skills),
+        "Missing Skills": ", ".join(missing_skills),
+        "Email": "candidate_email@example.com",
+        # Lists for analytics.SkillAnalytics; the joined strings above are for display
+        "Skill List": skills,
+        "Common Skill List": common_skills,
+        "Missing Skill List": missing_skills,
+    }
+
+
+def skill_gap_penalty(missing_count):
+    return missing_count * PENALTY_PER_MISSING_SKILL
+
+
+def custom_score(match_score, common_count, proficiency_score, match_weight, common_weight, proficiency_weight):
+    return (match_score * match_weight) + (common_count * common_weight) + (proficiency_score * proficiency_weight * 100)
+
+
+def rerank(features, match_weight, common_weight, proficiency_weight):
+    """Ranked table (``RANKED_COLUMNS``) for the given weights, best Rank Score first."""
+    match = features["Match Score"].to_numpy(dtype=np.float64)
+    rank_score = custom_score(
+        match, features["Common Count"].to_numpy(), features["Proficiency Score"].to_numpy(),
+        match_weight, common_weight, proficiency_weight,
+    )
+    penalty = skill_gap_penalty(features["Missing Count"].to_numpy(dtype=np.float64))
+    ranked = features[[c for c in RANKED_COLUMNS if c in features.columns]].assign(**{
+        "Rank Score": np.round(rank_score, 2),
+        "Penalty Score": penalty,
+        "Final Score": np.round(np.maximum(match - penalty, 0), 2),
+    })
+    return ranked[RANKED_COLUMNS].sort_values(by="Rank Score", ascending=False)
@@ -0,0 +1,219 @@
+import hashlib
+import math
+import os
+
+import numpy as np
+
+import metrics
+from models import BERT_MODEL, load_bert
+
+CACHE_DIR = ".embedding_cache"
+
+# IDF of a term found in only one of two documents under TfidfVectorizer's
+# smoothing: ln((1 + 2) / (1 + 1)) + 1. Shared terms get exactly 1.
+_SINGLE_DOC_IDF = math.log(1.5) + 1
+
+
+class EmbeddingCache:
+    """On-disk embedding store keyed by SHA-256 of model, backend and text.
+
+    One ``.npy`` file per text under ``<cache_dir>/<model>-<backend>/ab/abcdef...``;
+    writes go through a temp file and ``os.replace`` so concurrent sessions
+    never see a partial vector.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, model_name=BERT_MODEL, backend="torch"):
+        self.model_name = model_name
+        self.backend = backend
+        self.root = os.path.join(cache_dir, f"{model_name.replace('/', '_')}-{backend}")
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{self.backend}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".npy")
+
+    def get(self, key):
+        try:
+            return np.load(self._path(key))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, vector):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, vector)
+        os.replace(tmp_path, path)
+
+
+def embed_texts(texts, batch_size=32, cache=None, model_name=BERT_MODEL, backend="torch"):
+    """Embeddings for ``texts`` as a float32 ``(n, dim)`` array.
+
+    Cached vectors are reused; the rest are encoded on CPU in one
+    ``encode`` call with ``batch_size`` and written back to the cache.
+    Duplicate texts are encoded once. A cache built for another backend
+    is ignored rather than mixed in.
+    """
+    if cache and (cache.model_name, cache.backend) != (model_name, backend):
+        cache = None
+    texts = list(texts)
+    keys = [cache.key(text) for text in texts] if cache else list(range(len(texts)))
+    vectors = {}
+    if cache:
+        for key in set(keys):
+            vector = cache.get(key)
+            if vector is not None:
+                vectors[key] = vector
+        metrics.count("cache_lookups", len(vectors), cache="embedding", outcome="hits")
+        metrics.count("cache_lookups", len(set(keys)) - len(vectors), cache="embedding", outcome="misses")
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            missing.setdefault(key, text)
+    if missing:
+        encoded = load_bert(model_name, backend).encode(
+            list(missing.values()), batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+        )
+        for key, vector in zip(missing, encoded):
+            vectors[key] = vector
+            if cache:
+                cache.put(key, vector)
+
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack([vectors[key] for key in keys]).astype(np.float32)
+
+
+def tfidf_score_matrix(cv_texts, jd_texts):
+    """Cosine of every CV with every JD under a TfidfVectorizer fitted on just that pair.
+
+    Same numbers as refitting ``TfidfVectorizer`` on ``[cv_text, jd_text]``
+    per pair: with two documents every term's IDF is either 1 (shared) or
+    ``_SINGLE_DOC_IDF``, so all pairs are scored with a few sparse products.
+    Returns an ``(n_cvs, n_jds)`` array.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    cv_texts, jd_texts = list(cv_texts), list(jd_texts)
+    counter = CountVectorizer()
+    try:
+        counts = counter.fit_transform(cv_texts + jd_texts).tocsr().astype(np.float64)
+    except ValueError:
+        return np.zeros((len(cv_texts), len(jd_texts)))
+    cv_counts, jd_counts = counts[:len(cv_texts)], counts[len(cv_texts):]
+    k2 = _SINGLE_DOC_IDF ** 2
+
+    shared_dot = (cv_counts @ jd_counts.T).toarray()
+    cv_sq = cv_counts.multiply(cv_counts)
+    jd_sq = jd_counts.multiply(jd_counts)
+    jd_present = (jd_counts > 0).astype(np.float64)
+    cv_present = (cv_counts > 0).astype(np.float64)
+    cv_norm_sq = k2 * np.asarray(cv_sq.sum(axis=1)) - (k2 - 1) * (cv_sq @ jd_present.T).toarray()
+    jd_norm_sq = k2 * np.asarray(jd_sq.sum(axis=1)).T - (k2 - 1) * (cv_present @ jd_sq.T).toarray()
+
+    denominator = np.sqrt(cv_norm_sq * jd_norm_sq)
+    return np.divide(shared_dot, denominator, out=np.zeros_like(shared_dot), where=denominator > 0)
+
+
+def tfidf_scores(cv_texts, jd_text):
+    return tfidf_score_matrix(cv_texts, [jd_text])[:, 0]
+
+
+def _normalize(embeddings):
+    norms = np.linalg.norm(embeddings, axis=1)
+    norms[norms == 0] = 1
+    return embeddings / norms[:, None]
+
+
+def bert_score_matrix(cv_texts, jd_texts, batch_size=32, cache=None, backend="torch"):
+    jd_texts = list(jd_texts)
+    embeddings = _normalize(embed_texts(jd_texts + list(cv_texts), batch_size=batch_size, cache=cache, backend=backend))
+    return embeddings[len(jd_texts):] @ embeddings[:len(jd_texts)].T
+
+
+def bert_scores(cv_texts, jd_text, batch_size=32, cache=None, backend="torch"):
+    return bert_score_matrix(cv_texts, [jd_text], batch_size, cache, backend)[:, 0]
+
+
+def chunk_text(text, window=160, overlap=32):
+    """Split ``text`` into overlapping windows of ``window`` words.
+
+    MiniLM truncates at 256 word pieces, which is roughly 180 English
+    words, so the default window stays inside the model limit.
+    """
+    if not 0 <= overlap < window:
+        raise ValueError(f"overlap must be at least 0 and less than window ({window}), not {overlap}")
+    words = text.split()
+    if len(words) <= window:
+        return [" ".join(words)]
+    starts = range(0, len(words) - overlap, window - overlap)
+    return [" ".join(words[start:start + window]) for start in starts]
+
+
+def chunked_bert_score_matrix(cv_texts, jd_texts, window=160, overlap=32, pooling="max", batch_size=32,
+                              cache=None, backend="torch"):
+    """BERT scores over every window of every document, encoded in one batch.
+
+    ``pooling="max"`` takes the best CV window / JD window pair;
+    ``pooling="mean"`` averages, over JD windows, the best CV window for
+    each, i.e. how much of the JD the CV covers somewhere. Returns an
+    ``(n_cvs, n_jds)`` array.
+    """
+    if pooling not in ("max", "mean"):
+        raise ValueError(f"pooling must be 'max' or 'mean', not {pooling!r}")
+    jd_windows = [chunk_text(text, window, overlap) for text in jd_texts]
+    cv_windows = [chunk_text(text, window, overlap) for text in cv_texts]
+    flat_jd = [w for windows in jd_windows for w in windows]
+    flat = flat_jd + [w for windows in cv_windows for w in windows]
+    normalized = _normalize(embed_texts(flat, batch_size=batch_size, cache=cache, backend=backend))
+
+    sims = normalized[len(flat_jd):] @ normalized[:len(flat_jd)].T
+    best_per_jd_window = np.maximum.reduceat(sims, _offsets(cv_windows), axis=0)
+    jd_offsets = _offsets(jd_windows)
+    if pooling == "max":
+        return np.maximum.reduceat(best_per_jd_window, jd_offsets, axis=1)
+    sizes = np.array([len(windows) for windows in jd_windows])
+    return np.add.reduceat(best_per_jd_window, jd_offsets, axis=1) / sizes
+
+
+def _offsets(groups):
+    sizes = np.array([len(group) for group in groups])
+    return np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+
+def chunked_bert_scores(cv_texts, jd_text, window=160, overlap=32, pooling="max", batch_size=32, cache=None,
+                        backend="torch"):
+    return chunked_bert_score_matrix(cv_texts, [jd_text], window, overlap, pooling, batch_size, cache, backend)[:, 0]
+
+
+@metrics.timed("calculate_match_score", items=lambda cv_texts, *args, **kwargs: len(cv_texts))
+def score_matrix(cv_texts, jd_texts, batch_size=32, cache=None, window=None, overlap=32, pooling="max",
+                 backend="torch"):
+    """Match scores (0-100) for every CV x JD pair, as ``calculate_match_score`` would give.
+
+    Every CV and JD is embedded once, so scoring N CVs against M roles
+    costs N + M encodings rather than N x M. With ``window`` set, the BERT
+    half uses :func:`chunked_bert_score_matrix` so text past the model's
+    256 word-piece limit counts too.
+    """
+    cv_texts, jd_texts = list(cv_texts), list(jd_texts)
+    if not cv_texts or not jd_texts:
+        return np.zeros((len(cv_texts), len(jd_texts)))
+    if window:
+        semantic = chunked_bert_score_matrix(cv_texts, jd_texts, window, overlap, pooling, batch_size, cache, backend)
+    else:
+        semantic = bert_score_matrix(cv_texts, jd_texts, batch_size, cache, backend)
+    combined = (tfidf_score_matrix(cv_texts, jd_texts) + semantic) / 2
+    return np.round(combined * 100, 2)
+
+
+def score_cohort(cv_texts, jd_text, batch_size=32, cache=None, window=None, overlap=32, pooling="max",
+                 backend="torch"):
+    """Match scores (0-100) for every CV against one JD; see :func:`score_matrix`."""
+    return score_matrix(cv_texts, [jd_text], batch_size, cache, window, overlap, pooling, backend)[:, 0]
+
+
+def calculate_match_score(cv_text, job_desc, cache=None, backend="torch"):
+    return float(score_cohort([cv_text], job_desc, cache=cache, backend=backend)[0])
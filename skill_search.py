@@ -0,0 +1,58 @@
+from itertools import chain
+
+import numpy as np
+
+
+class SkillCoverageIndex:
+    """Skill -> candidate inverted index stored as one bitmap per skill.
+
+    Candidates are rows ``0..n-1`` in the order given. Skills are interned
+    to integer ids; bit ``i`` of a skill's bitmap is set when candidate
+    ``i`` has that skill. A multi-skill filter is an AND of a few bitmaps
+    (``n / 64`` words each), and per-skill counts are precomputed, so
+    queries don't touch the per-candidate skill lists at all.
+    """
+
+    def __init__(self, skill_lists):
+        skill_lists = [list(skills) for skills in skill_lists]
+        self.n_candidates = len(skill_lists)
+        self.skills = sorted({skill for skills in skill_lists for skill in skills})
+        self.ids = {skill: i for i, skill in enumerate(self.skills)}
+        words = (self.n_candidates + 63) // 64
+
+        sizes = np.fromiter(map(len, skill_lists), dtype=np.int64, count=self.n_candidates)
+        candidates = np.repeat(np.arange(self.n_candidates, dtype=np.int64), sizes)
+        skill_ids = np.array(list(map(self.ids.__getitem__, chain.from_iterable(skill_lists))), dtype=np.int64)
+
+        # Little-endian words so bit i of a bitmap is byte i // 8, bit i % 8
+        self.bitmaps = np.zeros((len(self.skills), words), dtype="<u8")
+        bits = np.left_shift(np.uint64(1), (candidates & 63).astype(np.uint64))
+        np.bitwise_or.at(self.bitmaps.reshape(-1), skill_ids * words + (candidates >> 6), bits)
+        self.counts = _popcount(self.bitmaps.reshape(-1)).reshape(self.bitmaps.shape).sum(axis=1)
+
+    def __len__(self):
+        return self.n_candidates
+
+    def _rows(self, skills):
+        return [self.ids[skill] for skill in skills if skill in self.ids]
+
+    def match_all(self, skills):
+        """Positions of the candidates that have every skill in ``skills``."""
+        skills = list(skills)
+        rows = self._rows(skills)
+        if len(rows) < len(skills):
+            return np.zeros(0, dtype=np.int64)  # a skill nobody has
+        if not rows:
+            return np.arange(self.n_candidates)
+        mask = np.bitwise_and.reduce(self.bitmaps[rows], axis=0)
+        bits = np.unpackbits(mask.view(np.uint8), bitorder="little")[:self.n_candidates]
+        return np.flatnonzero(bits)
+
+    def coverage(self, skills):
+        """``{skill: number of candidates with it}`` for each skill in ``skills``."""
+        return {skill: int(self.counts[self.ids[skill]]) if skill in self.ids else 0 for skill in skills}
+
+
+def _popcount(words):
+    # Set bits per uint64 word
+    return np.unpackbits(words.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
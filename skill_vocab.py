@@ -0,0 +1,351 @@
+"""Compiled skill vocabulary: ``all_skills.txt`` normalised, with aliases and integer IDs.
+
+    python skill_vocab.py --skills all_skills.txt
+
+Skills are lowercased and split with :func:`tokenize`, as CV text is.
+Bare numbers and versions ("0.10.24", "10.x") are dropped, spellings that
+only differ in spaces, hyphens or underscores ("e-commerce", "e commerce",
+"ecommerce") share one ID, and ``SKILL_ALIASES`` folds common synonyms
+("k8s", "js", "ml") into their skill. IDs are dense, in file order.
+
+It is compiled once per skills file and alias table and stored under
+``.skill_index/vocab-<version>/`` as ``.npy`` arrays loaded memory-mapped,
+so loading takes milliseconds and worker processes share the pages:
+
+* ``names.npy`` / ``name_offsets.npy`` - canonical names as one UTF-8 blob;
+* ``name_ranks.npy`` - each ID's position in alphabetical order;
+* ``tokens.npy`` - every token of every spelling, sorted; a token's ID is
+  its position;
+* ``prefix_keys.npy`` - a sorted 64-bit rolling key over the token IDs of
+  every spelling and every prefix of one (a hashed trie), with
+  ``prefix_skills.npy`` (the skill ID it spells, or -1) and
+  ``prefix_extends.npy`` (whether a longer spelling starts with it);
+  ``prefix_tokens.npy`` / ``prefix_offsets.npy`` keep the token IDs so a
+  key collision can't produce a false match;
+* ``meta.json`` - version, sizes and the longest spelling in tokens.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from functools import cached_property
+
+import numpy as np
+
+SKILLS_PATH = "all_skills.txt"
+INDEX_DIR = ".skill_index"
+VOCAB_VERSION = 1
+
+_TOKEN = re.compile(r"[a-z0-9+#.\-_]+")
+_TOKEN_ANY_CASE = re.compile(_TOKEN.pattern, re.IGNORECASE)
+
+# alias -> skill it stands for; an alias is only used if its skill is in the skills file
+SKILL_ALIASES = {
+    "js": "javascript",
+    "nodejs": "node.js",
+    "react": "react.js",
+    "reactjs": "react.js",
+    "vuejs": "vue.js",
+    "k8s": "kubernetes",
+    "golang": "go",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "cpp": "c++",
+    "csharp": "c#",
+    "py": "python",
+    "sklearn": "scikit-learn",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "nlp": "natural language processing",
+    "oop": "object-oriented programming",
+    "ux": "user experience",
+    "bi": "business intelligence",
+    "amazon web services": "aws",
+    "microsoft azure": "azure",
+    "gcp": "google cloud platform",
+    "ms excel": "microsoft excel",
+    "ms office": "microsoft office",
+}
+
+# Version numbers and their wildcards: "'05", ".10", "0.10.24", "10.x", "1.4x", "3.0+", "100-105"
+_VERSION = re.compile(r"^['.]?\d[\d.\-]*x?\+?$")
+_KEY_MULTIPLIER = np.uint64(0x100000001B3)
+_KEY_MASK = (1 << 64) - 1
+
+
+def tokenize(text):
+    """Lowercase word tokens, keeping skill punctuation (c++, c#, .net, node.js)."""
+    tokens = (_trim(token) if token[0] in "-." or token[-1] in "-." else token for token in _TOKEN.findall(text.lower()))
+    return [token for token in tokens if token]
+
+
+def token_spans(text):
+    """``(start, end)`` in ``text`` of each token :func:`tokenize` returns.
+
+    Only lines up with :func:`tokenize` when lowercasing doesn't change
+    where tokens start ("İ" does); compare the lengths before relying on it.
+    """
+    spans = []
+    for match in _TOKEN_ANY_CASE.finditer(text):
+        start, end = match.span()
+        if text[start] in "-." or text[end - 1] in "-.":
+            token = match.group().lower()
+            trimmed = _trim(token)
+            if not trimmed:
+                continue
+            start += token.find(trimmed)
+            end = start + len(trimmed)
+        spans.append((start, end))
+    return spans
+
+
+def _trim(token):
+    # Sentence punctuation and dashes around a token; a single leading dot stays (.net)
+    token = token.rstrip(".-").lstrip("-")
+    return token.lstrip(".") if token.startswith("..") else token
+
+
+def read_skills(path=SKILLS_PATH):
+    """Lowercased lines of a skills file, deduplicated, in file order."""
+    with open(path, "r", encoding="utf-8") as f:
+        return list(dict.fromkeys(line.strip().lower() for line in f if len(line.strip()) > 1))
+
+
+def skills_version(path=SKILLS_PATH, aliases=SKILL_ALIASES):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    digest.update(json.dumps(aliases, sort_keys=True).encode("utf-8"))
+    return f"v{VOCAB_VERSION}-{digest.hexdigest()[:16]}"
+
+
+def is_skill(skill):
+    # Bare numbers and versions ("06", "0.10.24", "10.x") are not skills
+    return bool(re.search("[a-z]", skill)) and not _VERSION.match(skill)
+
+
+def _loose(tokens):
+    return "".join(tokens).replace("-", "").replace("_", "")
+
+
+def _prefix_key(token_ids):
+    # Same as the uint64 arithmetic in SkillVocabulary.lookup, wrapping at 2**64
+    key = 0
+    for token_id in token_ids:
+        key = (key * int(_KEY_MULTIPLIER) + token_id + 1) & _KEY_MASK
+    return key
+
+
+class SkillVocabulary:
+    """Skill IDs and spellings, looked up by token n-gram (see :meth:`lookup`)."""
+
+    def __init__(self, arrays, meta):
+        self.names_blob = arrays["names"]
+        self.name_offsets = arrays["name_offsets"]
+        self.name_ranks = arrays["name_ranks"]
+        self.tokens = arrays["tokens"]
+        self.prefix_keys = arrays["prefix_keys"]
+        self.prefix_skills = arrays["prefix_skills"]
+        self.prefix_extends = arrays["prefix_extends"]
+        self.prefix_tokens = arrays["prefix_tokens"]
+        self.prefix_offsets = arrays["prefix_offsets"]
+        self.max_len = meta["max_len"]
+        self.version = meta["version"]
+        self._names = {}  # decoded on demand
+
+    def __len__(self):
+        return len(self.name_offsets) - 1
+
+    @classmethod
+    def build(cls, skills, aliases=SKILL_ALIASES, version="adhoc"):
+        groups = {}  # loose key -> {token tuple: spelling}, first spelling is the canonical name
+        for skill in skills:
+            tokens = tuple(tokenize(skill)) if is_skill(skill) else ()
+            if tokens:
+                groups.setdefault(_loose(tokens), {}).setdefault(tokens, skill)
+        for alias, skill in aliases.items():
+            alias_tokens, target = tuple(tokenize(alias)), _loose(tokenize(skill))
+            if target not in groups or _loose(alias_tokens) == target:
+                continue
+            groups[target].setdefault(alias_tokens, alias)
+            for tokens, spelling in groups.pop(_loose(alias_tokens), {}).items():
+                groups[target].setdefault(tokens, spelling)
+
+        names, patterns = [], {}
+        for spellings in groups.values():
+            for tokens in spellings:
+                patterns.setdefault(tokens, len(names))
+            names.append(next(iter(spellings.values())))
+        token_list = sorted({token for tokens in patterns for token in tokens})
+        token_ids = {token: i for i, token in enumerate(token_list)}
+
+        prefixes = {}  # token ID tuple -> [skill it spells or -1, whether a longer spelling continues it]
+        for tokens, skill_id in patterns.items():
+            ids = tuple(token_ids[token] for token in tokens)
+            for length in range(1, len(ids)):
+                prefixes.setdefault(ids[:length], [-1, False])[1] = True
+            prefixes.setdefault(ids, [-1, False])[0] = skill_id
+        keys = np.array([_prefix_key(ids) for ids in prefixes], dtype=np.uint64)
+        if len(np.unique(keys)) != len(keys):
+            raise ValueError("skill prefix key collision; change _KEY_MULTIPLIER")
+        order = np.argsort(keys, kind="stable")
+        prefix_ids = list(prefixes)
+        prefix_ids = [prefix_ids[i] for i in order]
+        flags = np.array(list(prefixes.values()), dtype=np.int32).reshape(-1, 2)[order]
+
+        encoded = [name.encode("utf-8") for name in names]
+        ranks = np.empty(len(names), dtype=np.int32)
+        ranks[sorted(range(len(names)), key=names.__getitem__)] = np.arange(len(names), dtype=np.int32)
+        arrays = {
+            "names": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "name_offsets": np.cumsum([0] + [len(name) for name in encoded], dtype=np.int64),
+            "name_ranks": ranks,
+            "tokens": np.array(token_list, dtype=str) if token_list else np.zeros(0, dtype="<U1"),
+            "prefix_keys": keys[order],
+            "prefix_skills": flags[:, 0].copy(),
+            "prefix_extends": flags[:, 1].astype(bool),
+            "prefix_tokens": np.array([i for ids in prefix_ids for i in ids], dtype=np.int32),
+            "prefix_offsets": np.cumsum([0] + [len(ids) for ids in prefix_ids], dtype=np.int64),
+        }
+        return cls(arrays, {"version": version, "max_len": max(map(len, patterns), default=0)})
+
+    @classmethod
+    def load_or_build(cls, path=SKILLS_PATH, index_dir=INDEX_DIR, aliases=SKILL_ALIASES):
+        version = skills_version(path, aliases)
+        vocab_path = os.path.join(index_dir, f"vocab-{version}")
+        if os.path.exists(os.path.join(vocab_path, "meta.json")):
+            return cls.load(vocab_path)
+        vocabulary = cls.build(read_skills(path), aliases, version)
+        vocabulary.save(vocab_path)
+        return vocabulary
+
+    def _arrays(self):
+        return {
+            "names": self.names_blob, "name_offsets": self.name_offsets, "name_ranks": self.name_ranks,
+            "tokens": self.tokens, "prefix_keys": self.prefix_keys, "prefix_skills": self.prefix_skills,
+            "prefix_extends": self.prefix_extends, "prefix_tokens": self.prefix_tokens,
+            "prefix_offsets": self.prefix_offsets,
+        }
+
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, array in self._arrays().items():
+            np.save(os.path.join(tmp, f"{name}.npy"), array)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "max_len": self.max_len, "skills": len(self)}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        names = ("names", "name_offsets", "name_ranks", "tokens", "prefix_keys", "prefix_skills",
+                 "prefix_extends", "prefix_tokens", "prefix_offsets")
+        # Plain ndarray views of the maps; slicing np.memmap objects is several times slower
+        return cls({name: np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")) for name in names}, meta)
+
+    def name(self, skill_id):
+        name = self._names.get(skill_id)
+        if name is None:
+            name = self._names[skill_id] = bytes(
+                self.names_blob[self.name_offsets[skill_id]:self.name_offsets[skill_id + 1]]
+            ).decode("utf-8")
+        return name
+
+    def names(self, skill_ids):
+        names = self._names
+        return [names[skill_id] if skill_id in names else self.name(skill_id) for skill_id in skill_ids]
+
+    def bitset(self, skill_ids):
+        """Boolean mask over all skill IDs with ``skill_ids`` set."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[np.asarray(skill_ids, dtype=np.int64)] = True
+        return mask
+
+    def sort_by_name(self, skill_ids):
+        skill_ids = np.asarray(skill_ids, dtype=np.int32)
+        return skill_ids[np.argsort(self.name_ranks[skill_ids], kind="stable")]
+
+    @cached_property
+    def _token_ids(self):
+        # Built on first use (a few ms); per text, dict lookups beat searchsorted over strings
+        return {token: i for i, token in enumerate(self.tokens.tolist())}
+
+    def token_ids(self, tokens):
+        """Token ID of each token, ``-1`` for tokens no skill uses."""
+        get = self._token_ids.get
+        return np.array([get(token, -1) for token in tokens], dtype=np.int64)
+
+    def lookup(self, tokens):
+        """``(max_len, n)`` skill IDs: row ``k`` holds the skill spelled by ``tokens[i:i + k + 1]``, else ``-1``.
+
+        Walks all start positions at once, one token further per step, and
+        drops a position as soon as its n-gram is no spelling's prefix, so
+        the work follows the skills in the text rather than ``max_len``.
+        """
+        n = len(tokens)
+        table = np.full((self.max_len, n), -1, dtype=np.int32)
+        if not n or not len(self.prefix_keys):
+            return table
+        token_ids = self.token_ids(tokens)
+        starts = np.flatnonzero(token_ids >= 0)
+        keys = (token_ids[starts] + 1).astype(np.uint64)
+        last = len(self.prefix_keys) - 1
+        for length in range(1, self.max_len + 1):
+            slots = np.minimum(np.searchsorted(self.prefix_keys, keys), last)
+            known = self.prefix_keys[slots] == keys
+            starts, keys, slots = starts[known], keys[known], slots[known]
+            skills = self.prefix_skills[slots]
+            hits = np.flatnonzero(skills >= 0)
+            if len(hits):
+                # Confirm the token IDs behind each hit, so a key collision can't name a skill
+                offsets = self.prefix_offsets[slots[hits]]
+                span = np.arange(length)
+                spelled = np.take(self.prefix_tokens, offsets[:, None] + span, mode="clip")
+                exact = (self.prefix_offsets[slots[hits] + 1] - offsets == length) & (
+                    spelled == token_ids[starts[hits, None] + span]
+                ).all(axis=1)
+                table[length - 1, starts[hits[exact]]] = skills[hits[exact]]
+            grow = self.prefix_extends[slots] & (starts + length < n)
+            starts, keys = starts[grow], keys[grow]
+            following = token_ids[starts + length]
+            known = following >= 0
+            if not known.any():
+                break
+            starts = starts[known]
+            keys = keys[known] * _KEY_MULTIPLIER + (following[known] + 1).astype(np.uint64)
+        return table
+
+    def id_of(self, skill):
+        """ID of a skill name, spelling variant or alias; ``-1`` if it isn't one."""
+        tokens = tokenize(skill)
+        if not tokens or len(tokens) > self.max_len:
+            return -1
+        return int(self.lookup(tokens)[len(tokens) - 1, 0])
+
+    def ids(self, skills):
+        """IDs of known skills among ``skills``, first occurrence order; unknown ones are left out."""
+        ids = (self.id_of(skill) for skill in skills)
+        return np.array(list(dict.fromkeys(i for i in ids if i >= 0)), dtype=np.int32)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the skill vocabulary.")
+    parser.add_argument("--skills", default=SKILLS_PATH)
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    args = parser.parse_args(argv)
+    vocabulary = SkillVocabulary.load_or_build(args.skills, args.index_dir)
+    print(f"{len(vocabulary)} skills, {int((vocabulary.prefix_skills >= 0).sum())} spellings, "
+          f"{len(vocabulary.tokens)} tokens "
+          f"-> {os.path.join(args.index_dir, f'vocab-{vocabulary.version}')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
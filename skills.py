@@ -0,0 +1,193 @@
+import hashlib
+
+import numpy as np
+
+from skill_vocab import INDEX_DIR, SKILL_ALIASES, SKILLS_PATH, SkillVocabulary, token_spans, tokenize
+
+# Proficiency level -> phrases that, placed right before a skill, signal it.
+# Checked in order, so the first level listed wins when several cues apply.
+PROFICIENCY_CUES = {
+    "⭐⭐⭐ Advanced": ("expert in", "advanced"),
+    "⭐⭐ Intermediate": ("intermediate", "proficient in"),
+    "⭐ Beginner": ("familiar with", "basic"),
+}
+UNKNOWN_PROFICIENCY = "Unknown"
+
+# Skills that are also everyday words. Written as one lowercase token in
+# running text ("it", "led the team", "go through") they are prose, so they
+# only count with evidence: a proficiency cue right before them, capitals
+# other than at the start of a sentence ("Go", "IT", "Spring"), or a list
+# separator between them and another skill ("python, go").
+COMMON_WORD_SKILLS = frozenset({
+    "access", "air", "basic", "case", "code", "crystal", "dart", "data", "draw", "drive", "elm", "english",
+    "excel", "express", "fact", "family", "flask", "form", "go", "her", "him", "his", "hive", "ice", "indeed",
+    "it", "jade", "led", "less", "listen", "live", "man", "maya", "meteor", "money", "office", "one", "other",
+    "outlook", "pay", "payments", "pipelines", "project", "projects", "puppet", "reach", "reason", "rest",
+    "reviews", "ruby", "rust", "sage", "salt", "scheme", "sit", "sketch", "snow", "soap", "spark", "spring",
+    "story", "stylus", "swift", "turn", "unity", "water", "word", "yarn",
+})
+_LIST_SEPARATORS = frozenset(",/|&;")
+_SENTENCE_BREAKS = frozenset(".!?\n\r•▪●*")
+_COMMON_WORDS_KEY = hashlib.sha256(" ".join(sorted(COMMON_WORD_SKILLS)).encode("utf-8")).hexdigest()[:8]
+
+
+def compile_cues(cues=PROFICIENCY_CUES):
+    """Token-tuple lookup for a cue table: ``(cue tokens -> rank, levels, max cue length)``."""
+    table = {}
+    for rank, phrases in enumerate(cues.values()):
+        for phrase in phrases:
+            table.setdefault(tuple(tokenize(phrase)), rank)
+    return table, list(cues), max((len(cue) for cue in table), default=0)
+
+
+_DEFAULT_CUES = compile_cues()
+
+
+class SkillIndex:
+    """Multi-token skill scanner over a compiled :class:`skill_vocab.SkillVocabulary`.
+
+    Every spelling of every skill is looked up at every position of the
+    text in one vectorised pass; the scan then visits only positions with
+    a skill or a proficiency cue. The longest skill starting at a position
+    wins and the scan jumps past it, so embedded skills ("python" inside
+    "python scripting experience") are found without a spaCy parse.
+    Skills come back as vocabulary IDs, so aliases and spelling variants
+    ("k8s", "e-commerce") count as their canonical skill. Everyday words in
+    ``COMMON_WORD_SKILLS`` need evidence that they name the skill.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = vocabulary
+        # Identifies the skills file, aliases, vocabulary format and common words, e.g. for cache keys
+        self.version = f"{vocabulary.version}-{_COMMON_WORDS_KEY}"
+
+    @classmethod
+    def from_skills(cls, skills, aliases=SKILL_ALIASES):
+        return cls(SkillVocabulary.build(skills, aliases))
+
+    @classmethod
+    def load_or_build(cls, path=SKILLS_PATH, index_dir=INDEX_DIR):
+        return cls(SkillVocabulary.load_or_build(path, index_dir))
+
+    def find(self, text):
+        """Skills mentioned in ``text``, in order of first appearance."""
+        return self.vocabulary.names(self.find_ids(text))
+
+    def find_ids(self, text):
+        return self.find_ids_with_proficiency(text)[0]
+
+    def find_with_proficiency(self, text, cues=None):
+        """Map each skill in ``text`` to its proficiency level."""
+        ids, levels = self.find_ids_with_proficiency(text, cues)
+        return dict(zip(self.vocabulary.names(ids), levels))
+
+    def find_ids_with_proficiency(self, text, cues=None):
+        """``(skill IDs, proficiency levels)`` for the skills in ``text``, in order of first appearance.
+
+        A cue ("expert in", "basic", ...) tags all skills starting right
+        after it, and the lowest-ranked cue wins for a skill tagged twice.
+        ``cues`` is a table shaped like ``PROFICIENCY_CUES``.
+        """
+        cue_table, levels, cue_len = _DEFAULT_CUES if cues is None else compile_cues(cues)
+        tokens = tokenize(text)
+        table = self.vocabulary.lookup(tokens)
+        cues_at = _cue_positions(tokens, cue_table, cue_len)
+        longest = _longest_lengths(table)
+        starts = np.flatnonzero(longest)
+        skills_at = dict(zip(starts.tolist(), zip(longest[starts].tolist(), table[longest[starts] - 1, starts].tolist())))
+        occurrences, best, cue_ends = [], {}, set()
+        next_free = 0
+        for i in sorted(skills_at.keys() | cues_at.keys()):
+            if i in cues_at:
+                rank, end = cues_at[i]
+                column = table[:, end]
+                tagged = column[column >= 0].tolist()
+                if tagged:
+                    # "basic sql": the cue is a modifier, not the BASIC skill
+                    next_free = max(next_free, end)
+                    cue_ends.add(end)
+                for skill in tagged:
+                    best[skill] = min(best.get(skill, rank), rank)
+            if i >= next_free and i in skills_at:
+                length, skill = skills_at[i]
+                occurrences.append((i, length, skill))
+                next_free = i + length
+        found = dict.fromkeys(skill for _, _, skill in _plausible(text, tokens, occurrences, cue_ends))
+        levels = [levels[best[skill]] if skill in best else UNKNOWN_PROFICIENCY for skill in found]
+        return np.fromiter(found, dtype=np.int32, count=len(found)), levels
+
+
+def _longest_lengths(table):
+    # Token length of the longest skill starting at each position, 0 where none does
+    hit = table >= 0
+    if not len(hit):
+        return np.zeros(table.shape[1], dtype=np.int64)
+    return np.where(hit.any(axis=0), len(hit) - np.argmax(hit[::-1], axis=0), 0)
+
+
+def _is_common_word(tokens, occurrence):
+    i, length, _ = occurrence
+    return length == 1 and tokens[i] in COMMON_WORD_SKILLS
+
+
+def _plausible(text, tokens, occurrences, cue_ends):
+    # The (position, length, skill) occurrences minus everyday words without evidence
+    common = [k for k, occurrence in enumerate(occurrences) if _is_common_word(tokens, occurrence)]
+    if not common:
+        return occurrences
+    spans = token_spans(text)
+    if len(spans) != len(tokens):
+        spans = None  # lowercasing moved the tokens; only cues count
+    dropped = set()
+    for k in common:
+        i = occurrences[k][0]
+        if i in cue_ends or spans is not None and (
+            _capitalised(text, spans, i) or _listed(text, tokens, spans, occurrences, k)
+        ):
+            continue
+        dropped.add(k)
+    return [occurrence for k, occurrence in enumerate(occurrences) if k not in dropped]
+
+
+def _capitalised(text, spans, i):
+    # "IT", "LED" anywhere; "Go", "Spring" unless capitalised only because a sentence or line starts
+    start, end = spans[i]
+    written = text[start:end]
+    if written == written.lower():
+        return False
+    if len(written) > 1 and written.isupper():
+        return True
+    before = text[spans[i - 1][1]:start] if i else "\n"
+    return not _SENTENCE_BREAKS.intersection(before)
+
+
+def _listed(text, tokens, spans, occurrences, k):
+    # Next to a skill that isn't itself an everyday word, with a list separator in between
+    i = occurrences[k][0]
+    for other in (k - 1, k + 1):
+        if not 0 <= other < len(occurrences) or _is_common_word(tokens, occurrences[other]):
+            continue
+        j, length, _ = occurrences[other]
+        if j + length == i:
+            gap = text[spans[i - 1][1]:spans[i][0]]
+        elif j == i + 1:
+            gap = text[spans[i][1]:spans[j][0]]
+        else:
+            continue
+        if _LIST_SEPARATORS.intersection(gap):
+            return True
+    return False
+
+
+def _cue_positions(tokens, cue_table, cue_len):
+    # {position: (rank, end)} of the longest cue starting there; a cue only counts if a token follows it
+    first_tokens = {cue[0] for cue in cue_table}
+    n = len(tokens)
+    cues_at = {}
+    for i in [i for i, token in enumerate(tokens) if token in first_tokens]:
+        for length in range(min(cue_len, n - i - 1), 0, -1):
+            rank = cue_table.get(tuple(tokens[i:i + length]))
+            if rank is not None:
+                cues_at[i] = (rank, i + length)
+                break
+    return cues_at
@@ -0,0 +1,360 @@
+"""Persistent approximate nearest-neighbour index over CV embeddings.
+
+An IVF (inverted file) index in plain numpy: vectors are L2-normalised,
+clustered with spherical k-means, and a query only scans the ``nprobe``
+clusters whose centroids are closest to it. Below ``min_train`` vectors,
+and for ``nprobe >= nlist``, search is an exact brute-force scan.
+
+Inserts go to the nearest existing centroid, so no retraining is needed
+per CV. Deletes are tombstones that are dropped when the index is saved.
+Once the pool has grown to ``retrain_factor`` times the size the clusters
+were trained on, the next search retrains them.
+
+The CV text behind each vector is stored with it, so a shortlist can be
+rescored without the parse cache. On disk an index is a base segment plus
+delta segments: saving to the directory an index came from only appends
+the rows added and ids removed since, and a retrain or ``MAX_DELTAS``
+deltas rewrite it as a single base.
+"""
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+
+INDEX_DIR = ".candidate_index"
+INDEX_VERSION = 1
+MIN_TRAIN = 4096
+RETRAIN_FACTOR = 4
+KMEANS_ITERATIONS = 12
+ASSIGN_BATCH = 16384
+MAX_DELTAS = 8
+DELTA_NAME = re.compile(r"delta-\d{4}")
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def _assign(vectors, centroids):
+    # Index of the most similar centroid for every row, in bounded-memory batches
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BATCH):
+        labels[start:start + ASSIGN_BATCH] = np.argmax(vectors[start:start + ASSIGN_BATCH] @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, nlist, iterations=KMEANS_ITERATIONS, sample=64, seed=0):
+    """Unit-norm centroids for ``vectors``, trained on at most ``sample * nlist`` rows."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample * nlist:
+        vectors = vectors[rng.choice(len(vectors), sample * nlist, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(vectors, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=nlist)
+        empty = counts == 0
+        sums = np.zeros_like(centroids)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        sums[~empty] = np.add.reduceat(vectors[order], starts[~empty], axis=0)
+        # Re-seed empty clusters with random points so every list stays in use
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class CandidateIndex:
+    """Top-K cosine search over CV embeddings, keyed by string ids.
+
+    ``ids`` are typically the SHA-256 of the CV file (the parse-cache key),
+    so the same resume uploaded twice is stored once.
+    """
+
+    def __init__(self, dim, nlist=None, nprobe=16, min_train=MIN_TRAIN, model=""):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.model = model
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+        self._ids = []
+        self._rows = {}
+        self._info = {}
+        self._texts = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._labels = np.zeros(0, dtype=np.int32)
+        self._centroids = None
+        self._trained_on = 0
+        self._lists = None
+        self._saved_to = None  # directory whose segments hold this index, None after a retrain
+        self._persisted = set()  # ids stored there
+        self._removed = []  # persisted ids removed since the last save
+        self._saved_size = 0  # rows below this are stored there or dead
+        self._deltas = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    @property
+    def trained(self):
+        return self._centroids is not None
+
+    # ---------- updates ----------
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+        capacity = max(needed, 2 * len(self._vectors), 1024)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+        labels = np.zeros(capacity, dtype=np.int32)
+        labels[:self._size] = self._labels[:self._size]
+        self._labels = labels
+
+    def info(self, key):
+        """Metadata stored with ``key`` (e.g. the CV file name), or None."""
+        return self._info.get(key)
+
+    def text(self, key):
+        """CV text stored with ``key``, or None."""
+        return self._texts.get(key)
+
+    def add(self, ids, vectors, info=None, texts=None):
+        """Insert or replace the vectors for ``ids``, with optional per-id metadata and text."""
+        ids = list(ids)
+        if len(set(ids)) != len(ids):
+            raise ValueError("duplicate ids in one add() call")
+        vectors = _normalize(vectors)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"expected {len(ids)} vectors of dimension {self.dim}, got {vectors.shape}")
+        self.remove([key for key in ids if key in self._rows])
+        self._reserve(len(ids))
+        rows = np.arange(self._size, self._size + len(ids))
+        self._vectors[rows] = vectors
+        self._alive[rows] = True
+        if self.trained:
+            self._labels[rows] = _assign(vectors, self._centroids)
+        for key, row in zip(ids, rows):
+            self._ids.append(key)
+            self._rows[key] = int(row)
+        if info is not None:
+            self._info.update(zip(ids, info))
+        if texts is not None:
+            self._texts.update(zip(ids, texts))
+        self._size += len(ids)
+        self._lists = None
+
+    def remove(self, ids):
+        for key in ids:
+            row = self._rows.pop(key, None)
+            if row is not None:
+                self._alive[row] = False
+                self._info.pop(key, None)
+                self._texts.pop(key, None)
+            if key in self._persisted:
+                self._persisted.discard(key)
+                self._removed.append(key)
+        self._lists = None
+
+    def train(self):
+        """(Re)cluster the live vectors; called automatically by :meth:`search`."""
+        live = np.nonzero(self._alive[:self._size])[0]
+        nlist = self.nlist or max(1, int(np.sqrt(len(live))))
+        nlist = min(nlist, len(live))
+        if nlist == 0:
+            return
+        self._centroids = spherical_kmeans(self._vectors[live], nlist)
+        self._labels[:self._size] = _assign(self._vectors[:self._size], self._centroids)
+        self._trained_on = len(live)
+        self._lists = None
+        self._saved_to = None  # every stored label changed
+
+    def _needs_training(self):
+        n = len(self)
+        if n < self.min_train:
+            return False
+        return not self.trained or n > RETRAIN_FACTOR * self._trained_on
+
+    def _inverted_lists(self):
+        # Live rows grouped by cluster: rows[offsets[c]:offsets[c + 1]] belong to cluster c
+        if self._lists is None:
+            live = np.nonzero(self._alive[:self._size])[0]
+            order = live[np.argsort(self._labels[live], kind="stable")]
+            counts = np.bincount(self._labels[live], minlength=len(self._centroids))
+            self._lists = (order, np.concatenate(([0], np.cumsum(counts))))
+        return self._lists
+
+    # ---------- search ----------
+
+    def search(self, query, k=10, nprobe=None):
+        """``[(id, cosine), ...]`` for the ``k`` stored vectors closest to ``query``."""
+        return self.search_many([query], k, nprobe)[0]
+
+    def search_many(self, queries, k=10, nprobe=None):
+        if self._needs_training():
+            self.train()
+        queries = _normalize(queries)
+        nprobe = nprobe or self.nprobe
+        results = []
+        for query in queries:
+            rows = self._candidate_rows(query, nprobe)
+            if rows is None:
+                # Exact scan straight over the stored block, without gathering rows
+                scores = self._vectors[:self._size] @ query
+                rows = np.nonzero(self._alive[:self._size])[0]
+                if len(rows) < self._size:
+                    scores = scores[rows]
+            else:
+                scores = self._vectors[rows] @ query
+            if len(rows) == 0:
+                results.append([])
+                continue
+            if k < len(rows):
+                top = np.argpartition(-scores, k - 1)[:k]
+            else:
+                top = np.arange(len(rows))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results.append([(self._ids[rows[i]], float(scores[i])) for i in top])
+        return results
+
+    def _candidate_rows(self, query, nprobe):
+        if not self.trained or len(self) < self.min_train or nprobe >= len(self._centroids):
+            return None
+        order, offsets = self._inverted_lists()
+        centroid_scores = self._centroids @ query
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        return np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe])
+
+    # ---------- persistence ----------
+
+    def save(self, path=INDEX_DIR):
+        """Write the index to ``path``.
+
+        If ``path`` holds this index from an earlier save or load, only the
+        changes since then are written, as a new delta segment. Otherwise,
+        and after a retrain or ``MAX_DELTAS`` deltas, the live vectors are
+        written as a new base, replacing any previous index there.
+        """
+        path = path.rstrip("/\\")
+        if self._saved_to == os.path.abspath(path) and self._deltas < MAX_DELTAS and os.path.isdir(path):
+            self._save_delta(path)
+        else:
+            self._save_base(path)
+
+    def _write_segment(self, directory, rows, meta):
+        ids = [self._ids[row] for row in rows]
+        np.save(os.path.join(directory, "vectors.npy"), self._vectors[rows])
+        np.save(os.path.join(directory, "labels.npy"), self._labels[rows])
+        with open(os.path.join(directory, "texts.json"), "w", encoding="utf-8") as f:
+            json.dump({key: self._texts[key] for key in ids if key in self._texts}, f, ensure_ascii=False)
+        meta = dict(meta, ids=ids, info={key: self._info[key] for key in ids if key in self._info})
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _save_base(self, path):
+        if isinstance(self._vectors, np.memmap):
+            # Release the mapped file before it is replaced (required on Windows)
+            self._vectors = np.array(self._vectors)
+        live = np.nonzero(self._alive[:self._size])[0]
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        if self.trained:
+            np.save(os.path.join(tmp, "centroids.npy"), self._centroids)
+        self._write_segment(tmp, live, {
+            "version": INDEX_VERSION, "dim": self.dim, "model": self.model, "nlist": self.nlist,
+            "nprobe": self.nprobe, "min_train": self.min_train, "trained_on": self._trained_on,
+        })
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+        self._mark_saved(path, 0)
+
+    def _save_delta(self, path):
+        new = np.arange(self._saved_size, self._size)
+        new = new[self._alive[new]]
+        if len(new) or self._removed:
+            name = f"delta-{self._deltas + 1:04d}"
+            tmp = os.path.join(path, name + ".tmp")
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+            self._write_segment(tmp, new, {"removed": self._removed})
+            os.replace(tmp, os.path.join(path, name))
+            self._deltas += 1
+        self._mark_saved(path, self._deltas)
+
+    def _mark_saved(self, path, deltas):
+        self._saved_to = os.path.abspath(path)
+        self._persisted = set(self._rows)
+        self._removed = []
+        self._saved_size = self._size
+        self._deltas = deltas
+
+    @classmethod
+    def load(cls, path=INDEX_DIR, mmap=True):
+        """Index saved by :meth:`save`.
+
+        Vectors are memory-mapped until the first insert; delta segments
+        are applied on top, which copies them into memory.
+        """
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["version"] != INDEX_VERSION:
+            raise ValueError(f"{path} was written by index version {meta['version']}, expected {INDEX_VERSION}")
+        index = cls(meta["dim"], meta["nlist"], meta["nprobe"], meta["min_train"], meta["model"])
+        index._vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+        index._size = len(index._vectors)
+        index._ids = list(meta["ids"])
+        index._rows = {key: row for row, key in enumerate(index._ids)}
+        index._info = meta["info"]
+        index._texts = _read_texts(path)
+        index._alive = np.ones(index._size, dtype=bool)
+        index._labels = np.load(os.path.join(path, "labels.npy"))
+        centroids = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids):
+            index._centroids = np.load(centroids)
+        index._trained_on = meta["trained_on"]
+        deltas = sorted(name for name in os.listdir(path) if DELTA_NAME.fullmatch(name))
+        for name in deltas:
+            segment = os.path.join(path, name)
+            with open(os.path.join(segment, "meta.json"), "r", encoding="utf-8") as f:
+                delta = json.load(f)
+            index.remove(delta["removed"])
+            if delta["ids"]:
+                index.add(delta["ids"], np.load(os.path.join(segment, "vectors.npy")))
+            index._info.update(delta["info"])
+            index._texts.update(_read_texts(segment))
+        index._mark_saved(path, len(deltas))
+        return index
+
+    @classmethod
+    def load_or_create(cls, path=INDEX_DIR, dim=384, model="", **kwargs):
+        if os.path.exists(os.path.join(path, "meta.json")):
+            index = cls.load(path)
+            if index.dim == dim and index.model == model:
+                return index
+        return cls(dim, model=model, **kwargs)
+
+
+def _read_texts(directory):
+    # Indexes saved before texts were kept have no texts.json
+    path = os.path.join(directory, "texts.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)